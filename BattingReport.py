@@ -5,33 +5,71 @@ import matplotlib.gridspec as gridspec
 import matplotlib.colors as mcolors
 from matplotlib.patches import Rectangle, Polygon
 from matplotlib.axes import Axes
-import seaborn as sns
-import pybaseball as pyb
-import requests
-from scipy.interpolate import Rbf
-from pybaseball.plotting import plot_stadium
 from Report import Report
+from tables import cell_table
+from streaming import BattingStream, Histogram, RollingStats
+from reportdata import BattingData
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict
 
 class BattingReport(Report):
 
-    def construct_batting_summary(self, batter_ids: Dict, start_date='2025-03-27', end_date='2025-10-01', season: int = None):
+    # how batting_panels are laid out, row by row, when shown one at a time
+    PANEL_ROWS = [['header'], ['stat_line'], ['xwoba_vs_lhp', 'spray_chart', 'xwoba_vs_rhp'], ['pitch_table'], ['rolling_xwoba']]
 
-        mlbam_batter_id = batter_ids["mlbam_id"]
-        fangraphs_batter_id = batter_ids["fangraphs_id"]
+    # the batted ball events on the spray chart and their labels
+    HIT_EVENTS = {'single': '1B', 'double': '2B', 'triple': '3B', 'home_run': 'HR'}
+
+    def construct_batting_summary(self, batter_ids: Dict, start_date='2025-03-27', end_date='2025-10-01', season: int = None,
+                                  refresh: bool = False):
+        """assembles the entire batting summary; concurrent identical requests share one build and one figure.
+        the data is cached (see batting_data), refresh fetches it again"""
+        key = ('batting', int(batter_ids['mlbam_id']), start_date, end_date, season)
+        fig, _ = self._inflight.do(key, self._construct_batting_summary, batter_ids, start_date, end_date, season, refresh)
+        return fig
 
-        df_player = pyb.statcast_batter(start_date, end_date, mlbam_batter_id)
-        df_player = self.process_df(df_player)
+    def _construct_batting_summary(self, batter_ids: Dict, start_date: str, end_date: str, season: int = None,
+                                   refresh: bool = False):
+        return self.draw_batting_summary(self.batting_data(batter_ids, start_date, end_date, season, refresh))
+
+    def batting_data(self, batter_ids: Dict, start_date: str, end_date: str, season: int = None, refresh: bool = False):
+        """the BattingData behind a summary, from the cache unless refresh; the header, stat line and statcast
+        requests go out together, and the heatmap grids are interpolated here rather than when drawing"""
+        mlbam_batter_id = int(batter_ids["mlbam_id"])
+        key = ('batting', mlbam_batter_id, start_date, end_date, season)
+
+        def compute():
+            date_span = {} if season is not None else {'start_date': start_date, 'end_date': end_date}
+            stat_season = season if season is not None else int(start_date[:4])
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                header = pool.submit(self.get_header, mlbam_batter_id)
+                stat_line = pool.submit(self.get_fangraphs_batting_stats, batter_ids["fangraphs_id"], stat_season, **date_span)
+                df_player, totals, ev90, rolling = self.get_player_data(mlbam_batter_id, start_date, end_date)
+                if totals is None:
+                    totals = self.get_pitch_type_totals(df_player)
+                    ev90 = df_player.groupby('pitch_type')['launch_speed'].quantile(0.9)
+                    rolling = RollingStats()
+                    rolling.add(df_player)
+                heatmaps = {p_throws: self.get_xwoba_grid(df_player, p_throws) for p_throws in ['L', 'R']}
+                hits = df_player[df_player['events'].isin(self.HIT_EVENTS) & df_player['hc_x'].notna() & df_player['hc_y'].notna()]
+                header = header.result()
+                return BattingData(totals, ev90, heatmaps, hits, rolling,
+                                   self.TEAM_ABB_TO_STADIUM.get(header['team_abb'], 'generic'), mlbam_id=mlbam_batter_id,
+                                   start_date=start_date, end_date=end_date, season=season, header=header,
+                                   stat_line=stat_line.result())
+
+        return self.report_data(key, compute, refresh)
+
+    def draw_batting_summary(self, data: BattingData):
+        """lays out the batting summary from its data alone"""
+        is_season_mode = data.season is not None
+        season = data.season if is_season_mode else int(data.start_date[:4])
 
-        is_season_mode = season is not None
-        if season is None:
-            season = int(start_date[:4])
-        
         fig = plt.figure(figsize=(8.5, 11), dpi=300)
 
-
         stat_line_height = 12 if is_season_mode else 5
         remaining = 32 - stat_line_height + 12
+        layout = ('batting', stat_line_height)
         gs = gridspec.GridSpec(7, 4,
                             height_ratios=[0.25, 12, stat_line_height, 20, remaining, 20, 3],
                             width_ratios=[0.25, 41.5, 41.5, 0.25],
@@ -43,10 +81,9 @@ class BattingReport(Report):
         ax_right = fig.add_subplot(gs[:, -1])
         ax_footer = fig.add_subplot(gs[-1, 1:3])
 
-        # turn axis values off
         for ax in [ax_header, ax_left, ax_right, ax_footer]:
             ax.axis('off')
-        
+
         ax_header = fig.add_subplot(gs[1, 1:3])
         ax_stat_line = fig.add_subplot(gs[2, 1:3])
         gs_row3 = gridspec.GridSpecFromSubplotSpec(1, 3, subplot_spec=gs[3, 1:3], wspace=0.3)
@@ -58,31 +95,170 @@ class BattingReport(Report):
 
         # assign the axis values to their plots
         if is_season_mode:
-            self.plot_header(mlbam_batter_id, ax_header, report_type='batting', season=season)
+            self.plot_header(data.mlbam_id, ax_header, report_type='batting', season=season, header=data.header)
         else:
-            self.plot_header(mlbam_batter_id, ax_header, report_type='batting', start_date=start_date, end_date=end_date)
-        if is_season_mode:
-            self.plot_stat_line(fangraphs_batter_id, season, ax_stat_line)
-        else:
-            self.plot_stat_line(fangraphs_batter_id, season, ax_stat_line, start_date=start_date, end_date=end_date)
-        bio = self.get_bio(mlbam_batter_id)
-        _, team_abb = self.get_team_info(bio['team_link'])
-        team_stadium = self.TEAM_ABB_TO_STADIUM.get(team_abb, 'generic')
+            self.plot_header(data.mlbam_id, ax_header, report_type='batting', start_date=data.start_date,
+                             end_date=data.end_date, header=data.header)
+        self.plot_stat_line(None, season, ax_stat_line, stat_line=data.stat_line)
+
+        self.plot_xwoba_heatmap(None, ax_xwoba_vs_lhp, p_throws='L', grid=data.heatmaps['L'])
+        self.plot_spray_chart(data.hits, ax_batted_ball_grid, data.stadium)
+        self.plot_xwoba_heatmap(None, ax_xwoba_vs_rhp, p_throws='R', grid=data.heatmaps['R'])
+        self.plot_pitch_table(None, ax_pitch_table, data.totals, data.ev90)
+        self.plot_xwoba_by_month(None, ax_monthly_xwoba, data.rolling)
+
+        # add footer text
+        ax_footer.text(0.25, 0.5, 'Made by Anthony Ciardelli', ha='center', va='center', fontsize=10)
+        ax_footer.text(0.75, 0.5, 'Data from MLB and Fangraphs', ha='center', va='center', fontsize=10)
+
+        self.layout_figure(fig, layout)
+
+        return fig
+
+    def get_player_data(self, mlbam_batter_id: int, start_date: str, end_date: str):
+        """(processed pitches, totals, ev90, rolling stats); for long ranges the pitches are streamed in chunks, the
+        frame is a uniform sample of batted balls and the aggregates come from the stream, otherwise they are None
+        and the panels compute them from the frame"""
+        if self.streams(start_date, end_date):
+            stream = BattingStream(self)
+            for chunk in self.source.statcast_chunks('batter', mlbam_batter_id, start_date, end_date):
+                stream.add(self.process_df(chunk))
+            return stream.sample(), stream.totals, stream.ev90(), stream.rolling
+        df_player = self.process_df(self.source.statcast_batter(start_date, end_date, mlbam_batter_id))
+        return df_player, None, None, None
+
+    def batting_panels(self, batter_ids: Dict, start_date: str, end_date: str, season: int = None):
+        """yields (panel, png) for each panel of the batting summary as soon as it is drawn; the panels draw from
+        batting_data, so the full report built after them finds its data in the cache and only draws"""
+        header_span = {'season': season} if season is not None else {'start_date': start_date, 'end_date': end_date}
+        stat_season = season if season is not None else int(start_date[:4])
+        # same proportions as the composite, whose season stat line carries the L/R splits
+        stat_line_height = 1.3 if season is not None else 0.55
+
+        with ThreadPoolExecutor(max_workers=self.PANEL_WORKERS) as pool:
+            data = pool.submit(self.batting_data, batter_ids, start_date, end_date, season)
+
+            def with_data(figsize, plot):
+                return lambda: self.draw_panel(figsize, lambda ax: plot(data.result(), ax))
+
+            panels = {
+                'header': with_data((8.5, 1.3), lambda d, ax: self.plot_header(d.mlbam_id, ax, report_type='batting', header=d.header, **header_span)),
+                'stat_line': with_data((8.5, stat_line_height), lambda d, ax: self.plot_stat_line(None, stat_season, ax, stat_line=d.stat_line)),
+                'xwoba_vs_lhp': with_data((2.8, 2.2), lambda d, ax: self.plot_xwoba_heatmap(None, ax, p_throws='L', grid=d.heatmaps['L'])),
+                'spray_chart': with_data((2.8, 2.2), lambda d, ax: self.plot_spray_chart(d.hits, ax, d.stadium)),
+                'xwoba_vs_rhp': with_data((2.8, 2.2), lambda d, ax: self.plot_xwoba_heatmap(None, ax, p_throws='R', grid=d.heatmaps['R'])),
+                'pitch_table': with_data((8.5, 4.85 - stat_line_height), lambda d, ax: self.plot_pitch_table(None, ax, d.totals, d.ev90)),
+                'rolling_xwoba': with_data((8.5, 2.2), lambda d, ax: self.plot_xwoba_by_month(None, ax, d.rolling)),
+            }
+            yield from self.stream_panels(pool, panels)
+
+    def construct_batting_career(self, batter_ids: Dict, seasons):
+        """assembles a season-by-season report over several seasons; concurrent identical requests share one build"""
+        seasons = sorted(seasons)
+        key = ('batting-career', int(batter_ids['mlbam_id']), seasons[0], seasons[-1])
+        fig, _ = self._inflight.do(key, self._construct_batting_career, batter_ids, seasons)
+        return fig
+
+    def _construct_batting_career(self, batter_ids: Dict, seasons: list):
+
+        mlbam_batter_id = batter_ids["mlbam_id"]
+        fangraphs_batter_id = batter_ids["fangraphs_id"]
+
+        season_totals = self.season_aggregates('batter', mlbam_batter_id, seasons, self.get_season_totals)
+        df_seasons = self.get_fangraphs_seasons(self.get_fangraphs_batting_stats, fangraphs_batter_id, seasons)
+
+        fig = plt.figure(figsize=(8.5, 11), dpi=300)
+        layout = ('batting-career', len(seasons))
+
+        season_lines_height = 3 + 2 * len(seasons)
+        gs = gridspec.GridSpec(7, 4,
+                            height_ratios=[0.25, 12, season_lines_height, 20, 14, 3, 0.25],
+                            width_ratios=[0.25, 41.5, 41.5, 0.25],
+        )
+
+        # create margins along the side
+        ax_left = fig.add_subplot(gs[:, 0])
+        ax_right = fig.add_subplot(gs[:, -1])
+        ax_footer = fig.add_subplot(gs[5, 1:3])
+        for ax in [ax_left, ax_right, ax_footer]:
+            ax.axis('off')
+
+        ax_header = fig.add_subplot(gs[1, 1:3])
+        ax_season_lines = fig.add_subplot(gs[2, 1:3])
+        ax_xwoba = fig.add_subplot(gs[3, 1])
+        ax_whiff = fig.add_subplot(gs[3, 2])
+        ax_pitch_table = fig.add_subplot(gs[4, 1:3])
 
-        self.plot_xwoba_heatmap(df_player, ax_xwoba_vs_lhp, p_throws='L')
-        self.plot_spray_chart(df_player, ax_batted_ball_grid, team_stadium)
-        self.plot_xwoba_heatmap(df_player, ax_xwoba_vs_rhp, p_throws='R')
-        self.plot_pitch_table(df_player, ax_pitch_table)
-        self.plot_xwoba_by_month(df_player, ax_monthly_xwoba)
+        self.plot_header(mlbam_batter_id, ax_header, report_type='batting', start_date=str(seasons[0]), end_date=str(seasons[-1]))
+        self.plot_batting_season_lines(df_seasons, ax_season_lines)
+        if season_totals:
+            trends = self.get_pitch_trends(season_totals)
+            self.plot_pitch_trends(trends, ax_xwoba, 'xwoba', 'xwOBA by Season')
+            self.plot_pitch_trends(trends, ax_whiff, 'whiff_rate', 'Whiff % by Season')
+
+            totals = pd.concat([t['totals'] for t in season_totals.values()]).groupby(level=0).sum()
+            exit_velo = {}
+            for t in season_totals.values():
+                for pitch_type, hist in t['exit_velo'].items():
+                    exit_velo.setdefault(pitch_type, Histogram()).merge(hist)
+            ev90 = pd.Series({pitch_type: hist.quantile(0.9) for pitch_type, hist in exit_velo.items()}, dtype=float)
+            self.plot_pitch_table(None, ax_pitch_table, totals, ev90)
 
         # add footer text
         ax_footer.text(0.25, 0.5, 'Made by Anthony Ciardelli', ha='center', va='center', fontsize=10)
         ax_footer.text(0.75, 0.5, 'Data from MLB and Fangraphs', ha='center', va='center', fontsize=10)
 
-        fig.tight_layout()
+        self.layout_figure(fig, layout)
 
         return fig
 
+    def get_season_totals(self, df: pd.DataFrame):
+        """the per-season aggregate career reports cache: pitch type totals plus exit velocity histograms for EV90"""
+        exit_velo = {}
+        for pitch_type, speeds in df.groupby('pitch_type')['launch_speed']:
+            exit_velo.setdefault(pitch_type, Histogram()).add(speeds.to_numpy())
+        return {'totals': self.get_pitch_type_totals(df), 'exit_velo': exit_velo}
+
+    def get_pitch_trends(self, season_totals: Dict[int, dict]):
+        """xwOBA and whiff rate against the main pitch types for every season, one row per (season, pitch_type)"""
+        EXPLICIT_PITCHES = ['FF', 'SI', 'FC', 'SL', 'ST', 'CU', 'CH', 'FS']
+
+        trends = []
+        for season, aggregate in season_totals.items():
+            totals = aggregate['totals']
+            totals = totals[totals.index.isin(EXPLICIT_PITCHES)]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                trends.append(pd.DataFrame({
+                    'season': season,
+                    'pitch_type': totals.index,
+                    'xwoba': np.where(totals['xwoba_n'] > 0, totals['xwoba_sum'] / totals['xwoba_n'], np.nan),
+                    'whiff_rate': np.where(totals['swing'] > 0, totals['whiff'] / totals['swing'] * 100, np.nan),
+                }))
+        return pd.concat(trends, ignore_index=True)
+
+    def plot_batting_season_lines(self, df_seasons: pd.DataFrame, ax: Axes):
+        """plots one fangraphs stat line per season"""
+        stats = ['PA', 'AVG', 'OBP', 'SLG', 'OPS', 'K%', 'BB%', 'wRC+', 'HR']
+        format_specs = {
+            'PA' : '.0f',
+            'AVG' : '.3f',
+            'OBP' : '.3f',
+            'SLG' : '.3f',
+            'OPS' : '.3f',
+            'K%' : '.1f',
+            'BB%' : '.1f',
+            'wRC+' : '.0f',
+            'HR' : '.0f',
+        }
+        # season mode also pulls the vs L and vs R splits, only the combined line (or a missing season's blank
+        # row) goes in the table
+        if 'Split' in df_seasons.columns:
+            df_seasons = df_seasons[~df_seasons['Split'].isin(['vs L', 'vs R'])]
+        df_seasons = df_seasons.reindex(columns=['Season'] + stats)
+        df_seasons[['K%', 'BB%']] *= 100
+        self.plot_season_lines(df_seasons, ax, stats, format_specs, self.FANGRAPHS_BATTING_STATS,
+                               invert_colors=['K%'])
+
     def process_df(self, df: pd.DataFrame):
         df = self.process_df_base(df)
 
@@ -106,7 +282,16 @@ class BattingReport(Report):
 
         return df
 
-    def get_fangraphs_batting_stats(self, fangraphs_batter_id: int, season: int, start_date: str = None, end_date: str = None):
+    def get_fangraphs_batting_stats(self, fangraphs_batter_id: int, season: int, start_date: str = None, end_date: str = None,
+                                    bulk: bool = True):
+        """fangraphs batting stats as a df with a Split column: one All row for a date range, vs L, vs R and All
+        rows for a season, which come from the shared season leaderboards unless bulk is off"""
+        if not (start_date and end_date) and bulk:
+            splits = [self.leaderboards.player('bat', season, fangraphs_batter_id, split).assign(Split=split)
+                      for split in ['vs L', 'vs R', 'All']]
+            splits = [df for df in splits if not df.empty]
+            return pd.concat(splits, axis=0) if splits else pd.DataFrame(columns=['Split'])
+
         if start_date and end_date:
             date_params = f"&month=1000&startdate={start_date}&enddate={end_date}"
         else:
@@ -117,7 +302,7 @@ class BattingReport(Report):
 
         if start_date and end_date:
             url_all = base_url + date_params
-            data = requests.get(url_all).json()
+            data = self.source.get_json(url_all)
             df_all = pd.DataFrame(data=data['data'])
             df_all['Split'] = 'All'
             df_left = pd.DataFrame()
@@ -125,28 +310,36 @@ class BattingReport(Report):
         else:
             # month = 13 is vs lhp
             url = base_url + "&month=13"
-            data = requests.get(url).json()
+            data = self.source.get_json(url)
             df_left = pd.DataFrame(data=data['data'])
             df_left['Split'] = 'vs L'
 
             # month = 14 is vs rhp
             url = base_url + "&month=14"
-            data = requests.get(url).json()
+            data = self.source.get_json(url)
             df_right = pd.DataFrame(data=data['data'])
             df_right['Split'] = 'vs R'
 
             url = base_url + "&month=0"
-            data = requests.get(url).json()
+            data = self.source.get_json(url)
             df_all = pd.DataFrame(data=data['data'])
             df_all['Split'] = 'All'
 
-        df_fangraphs_batter = pd.concat((df for df in [df_left, df_right, df_all] if not df.empty), axis=0)
+        # no plate appearances in the season or range: fangraphs returns no rows for any split
+        splits = [df for df in [df_left, df_right, df_all] if not df.empty]
+        if not splits:
+            return pd.DataFrame(columns=['Split'])
+        df_fangraphs_batter = pd.concat(splits, axis=0)
         
         return df_fangraphs_batter
 
-    def plot_stat_line(self, fangraphs_batter_id: int, season: int, ax: Axes, start_date: str = None, end_date: str = None):
+    def plot_stat_line(self, fangraphs_batter_id: int, season: int, ax: Axes, start_date: str = None, end_date: str = None,
+                       stat_line: pd.DataFrame = None):
+        """plots the statline pulled from fangraphs for the given date range, or the stat_line already pulled"""
         stats = ['Split', 'PA', 'AVG', 'OBP', 'SLG', 'OPS', 'K%', 'BB%', 'wRC+', 'HR']
-        df_fangraphs_batter = self.get_fangraphs_batting_stats(fangraphs_batter_id, season=season, start_date=start_date, end_date=end_date)
+        if stat_line is None:
+            stat_line = self.get_fangraphs_batting_stats(fangraphs_batter_id, season=season, start_date=start_date, end_date=end_date)
+        df_fangraphs_batter = stat_line.copy()
 
         df_fangraphs_batter['K%'] *= 100
         df_fangraphs_batter['BB%'] *= 100
@@ -172,8 +365,8 @@ class BattingReport(Report):
                 
         colWidths = [1] * (len(df_formatted.columns))
 
-        table_fg = ax.table(cellText=df_formatted[stats].values, colLabels=stats, cellLoc='center',
-                    bbox=[0.00, 0.0, 1, 1], colWidths=colWidths)
+        table_fg = cell_table(ax, cellText=df_formatted[stats].values, colLabels=stats, cellLoc='center',
+                         bbox=[0.00, 0.0, 1, 1], colWidths=colWidths)
         
         # apply color to the combined row
         invert_colors = ['K%']
@@ -206,49 +399,64 @@ class BattingReport(Report):
         
         ax.axis('off')
 
-    def plot_xwoba_heatmap(self, df: pd.DataFrame, ax: Axes, p_throws: str = 'R'):
-        """Plots a Savant-style xwOBA heatmap with heart/shadow/chase zones"""
-        zone_width = 17 / 12
-        zone_left = -zone_width / 2
-        zone_right = zone_width / 2
-        zone_bot = 1.5
-        zone_top = 3.5
+    # the heatmap's strike zone in feet, and how far the heatmap reaches past it
+    ZONE_WIDTH = 17 / 12
+    ZONE_BOT = 1.5
+    ZONE_TOP = 3.5
+    HEATMAP_PAD = 0.25
+
+    def get_xwoba_grid(self, df: pd.DataFrame, p_throws: str = 'R'):
+        """(grid_x, grid_z, xwoba) smoothed over the zone from the batted balls against p_throws pitchers,
+        or None when there are too few near the zone"""
+        zone_left = -self.ZONE_WIDTH / 2
+        zone_right = self.ZONE_WIDTH / 2
         influence_buffer = 0.5
 
-        df_hand = df[(df['p_throws'] == p_throws) & (df['estimated_woba_using_speedangle'].notna())].copy()
-
+        df_hand = df[(df['p_throws'] == p_throws) & (df['estimated_woba_using_speedangle'].notna())]
         if len(df_hand) < 15:
-            ax.set_title(f"xwOBA vs {p_throws}HP", fontweight='bold', fontsize=9)
-            ax.text(0.5, 0.5, 'Not enough data', ha='center', va='center', transform=ax.transAxes, fontsize=8)
-            ax.set_aspect('equal')
-            ax.axis('off')
-            return
+            return None
 
         # Filter to pitches within influence distance of the zone
         mask = (
             (df_hand['plate_x'] >= zone_left - influence_buffer) &
             (df_hand['plate_x'] <= zone_right + influence_buffer) &
-            (df_hand['plate_z'] >= zone_bot - influence_buffer) &
-            (df_hand['plate_z'] <= zone_top + influence_buffer)
+            (df_hand['plate_z'] >= self.ZONE_BOT - influence_buffer) &
+            (df_hand['plate_z'] <= self.ZONE_TOP + influence_buffer)
         )
         df_local = df_hand[mask]
-
         if len(df_local) < 15:
-            ax.set_title(f"xwOBA vs {p_throws}HP", fontweight='bold', fontsize=9)
-            ax.text(0.5, 0.5, 'Not enough data', ha='center', va='center', transform=ax.transAxes, fontsize=8)
-            ax.set_aspect('equal')
-            ax.axis('off')
-            return
+            return None
 
         x = df_local['plate_x'].values
         z = df_local['plate_z'].values
         v = df_local['estimated_woba_using_speedangle'].values
 
-        render_pad = 0.25
-        grid_x, grid_z = np.mgrid[zone_left-render_pad:zone_right+render_pad:50j, zone_bot-render_pad:zone_top+render_pad:50j]
+        render_pad = self.HEATMAP_PAD
+        grid_x, grid_z = np.mgrid[zone_left-render_pad:zone_right+render_pad:50j, self.ZONE_BOT-render_pad:self.ZONE_TOP+render_pad:50j]
 
+        from scipy.interpolate import Rbf
         rbf = Rbf(x, z, v, function='multiquadric', smooth=2)
-        v_smooth = rbf(grid_x, grid_z)
+        return grid_x, grid_z, rbf(grid_x, grid_z)
+
+    def plot_xwoba_heatmap(self, df: pd.DataFrame, ax: Axes, p_throws: str = 'R', grid: tuple = None):
+        """Plots a Savant-style xwOBA heatmap with heart/shadow/chase zones; from df, or from get_xwoba_grid's
+        grid when df is None"""
+        zone_width = self.ZONE_WIDTH
+        zone_left = -zone_width / 2
+        zone_right = zone_width / 2
+        zone_bot = self.ZONE_BOT
+        zone_top = self.ZONE_TOP
+        render_pad = self.HEATMAP_PAD
+
+        if df is not None:
+            grid = self.get_xwoba_grid(df, p_throws)
+        if grid is None:
+            ax.set_title(f"xwOBA vs {p_throws}HP", fontweight='bold', fontsize=9)
+            ax.text(0.5, 0.5, 'Not enough data', ha='center', va='center', transform=ax.transAxes, fontsize=8)
+            ax.set_aspect('equal')
+            ax.axis('off')
+            return
+        grid_x, grid_z, v_smooth = grid
 
         norm = mcolors.Normalize(vmin=0.150, vmax=0.450)
         levels = np.linspace(0.150, 0.450, 20)
@@ -279,12 +487,7 @@ class BattingReport(Report):
 
     def plot_spray_chart(self, df: pd.DataFrame, ax: Axes, team_stadium: str = 'generic'):
         """Plots a spray chart of hits (1B, 2B, 3B, HR) on the player's home stadium"""
-        hit_events = {
-            'single': '1B',
-            'double': '2B',
-            'triple': '3B',
-            'home_run': 'HR',
-        }
+        hit_events = self.HIT_EVENTS
         hit_colors = {
             '1B': '#FE6100',
             '2B': '#785EF0',
@@ -300,12 +503,21 @@ class BattingReport(Report):
             ax.text(0.5, 0.5, 'Not enough data', ha='center', va='center', transform=ax.transAxes, fontsize=8)
             return
 
+        from pybaseball.plotting import plot_stadium
         plot_stadium(team_stadium, title='', axis=ax)
 
         draw_order = ['1B', '2B', '3B', 'HR']
+        # past DENSITY_THRESHOLD hits (long ranges) each hit type is drawn as a density
+        density = len(df_hits) > self.DENSITY_THRESHOLD
         for hit_type in draw_order:
             subset = df_hits[df_hits['hit_type'] == hit_type]
-            if len(subset) > 0:
+            if len(subset) == 0:
+                continue
+            if density:
+                self.plot_density(ax, subset['hc_x'].to_numpy(), -subset['hc_y'].to_numpy(), hit_colors[hit_type],
+                                  (0, 250, -250, 0), smooth=3, zorder=5)
+                ax.scatter([], [], s=25, c=hit_colors[hit_type], label=hit_type, edgecolors='black', linewidths=0.3)
+            else:
                 ax.scatter(subset['hc_x'], subset['hc_y'].mul(-1),
                            s=25, c=hit_colors[hit_type], label=hit_type,
                            alpha=1.0, edgecolors='black', linewidths=0.3, zorder=5)
@@ -320,10 +532,10 @@ class BattingReport(Report):
         ax.set_title('')
         ax.legend(loc='lower left', fontsize=6, framealpha=0.8, markerscale=1.5)
 
-    def get_pitch_groupings(self, df: pd.DataFrame):
-        EXPLICIT_PITCHES = ['FF', 'SI', 'FC', 'SL', 'ST', 'CU', 'CH', 'FS']
-
-        df_group = df.groupby(['pitch_type']).agg(
+    def get_pitch_type_totals(self, df: pd.DataFrame, by: list = None):
+        """per pitch type counts and sums; unlike means these add up across date chunks. by adds leading
+        group keys, e.g. one set of totals per player"""
+        return df.groupby((by or []) + ['pitch_type']).agg(
             pitch_count = ('pitch_type', 'count'),
             whiff = ('whiff', 'sum'),
             zone_whiff = ('zone_whiff', 'sum'),
@@ -332,13 +544,28 @@ class BattingReport(Report):
             in_zone = ('in_zone', 'sum'),
             out_zone = ('out_zone', 'sum'),
             chase = ('chase', 'sum'),
-            exit_velo = ('launch_speed', 'mean'),
-            ev90 = ('launch_speed', lambda x: x.quantile(0.9)),
-            xwoba = ('estimated_woba_using_speedangle', 'mean'),
+            exit_velo_sum = ('launch_speed', 'sum'),
+            exit_velo_n = ('launch_speed', 'count'),
+            xwoba_sum = ('estimated_woba_using_speedangle', 'sum'),
+            xwoba_n = ('estimated_woba_using_speedangle', 'count'),
             hard_hit = ('hard_hit', 'sum'),
             batted_ball = ('batted_ball', 'sum')
         )
 
+    def get_pitch_groupings(self, df: pd.DataFrame, totals: pd.DataFrame = None, ev90: pd.Series = None):
+        """per pitch type plate discipline and contact quality; streamed reports pass in their running totals and ev90"""
+        EXPLICIT_PITCHES = ['FF', 'SI', 'FC', 'SL', 'ST', 'CU', 'CH', 'FS']
+
+        if totals is None:
+            totals = self.get_pitch_type_totals(df)
+        if ev90 is None:
+            ev90 = df.groupby('pitch_type')['launch_speed'].quantile(0.9)
+
+        df_group = totals.drop(columns=['exit_velo_sum', 'exit_velo_n', 'xwoba_sum', 'xwoba_n'])
+        df_group['exit_velo'] = totals['exit_velo_sum'] / totals['exit_velo_n'].where(totals['exit_velo_n'] > 0)
+        df_group['ev90'] = ev90.reindex(df_group.index)
+        df_group['xwoba'] = totals['xwoba_sum'] / totals['xwoba_n'].where(totals['xwoba_n'] > 0)
+
         total_pitches = df_group['pitch_count'].sum()
 
         # only want certain pitches
@@ -386,8 +613,8 @@ class BattingReport(Report):
 
         return df_formatted
 
-    def plot_pitch_table(self, df: pd.DataFrame, ax: Axes):
-        df = self.get_pitch_groupings(df)
+    def plot_pitch_table(self, df: pd.DataFrame, ax: Axes, totals: pd.DataFrame = None, ev90: pd.Series = None):
+        df = self.get_pitch_groupings(df, totals, ev90)
 
         column_mapping = {
             'pitch_type': 'Pitch',
@@ -408,10 +635,10 @@ class BattingReport(Report):
         display_df.columns = [column_mapping.get(col, col) for col in display_df.columns]
         display_df = display_df[[col for _, col in column_mapping.items() if col in display_df.columns]]
 
-        table_plot = ax.table(cellText=display_df.values,
-                             colLabels=display_df.columns,
-                             cellLoc='center', 
-                             bbox=[0, 0, 1, 1])
+        table_plot = cell_table(ax, cellText=display_df.values,
+                                colLabels=display_df.columns,
+                                cellLoc='center',
+                                bbox=[0, 0, 1, 1])
         
         # add colors to pitch type cells
         for idx, pitch in enumerate(df['pitch_type']):
@@ -430,30 +657,35 @@ class BattingReport(Report):
 
         ax.axis('off')
 
-    def plot_xwoba_by_month(self, df: pd.DataFrame, ax: Axes):
+    def plot_xwoba_by_month(self, df: pd.DataFrame, ax: Axes, rolling: RollingStats = None, color='steelblue',
+                            label: str = None, reference: bool = True):
+        """rolling xwOBA line; streamed reports pass in the rolling stats they accumulated, and comparisons
+        overlay several players by drawing the reference lines and legend only with the last one"""
         ROLLING_WINDOW = 50
 
-        df_pa = df[df['estimated_woba_using_speedangle'].notna()].copy()
-        df_pa = df_pa.sort_values('game_date').reset_index(drop=True)
+        if rolling is None:
+            rolling = RollingStats()
+            rolling.add(df)
+        rolling = rolling.values('xwoba', ROLLING_WINDOW)
 
-        if len(df_pa) < ROLLING_WINDOW:
+        if len(rolling) == 0:
             ax.set_title(f"Rolling xwOBA ({ROLLING_WINDOW} PA)", fontweight='bold')
             ax.text(0.5, 0.5, 'Not enough PAs', ha='center', va='center', transform=ax.transAxes)
             return
 
-        df_pa['rolling_xwoba'] = df_pa['estimated_woba_using_speedangle'].rolling(window=ROLLING_WINDOW, min_periods=ROLLING_WINDOW).mean()
-        df_pa = df_pa.dropna(subset=['rolling_xwoba']).reset_index(drop=True)
+        x = range(ROLLING_WINDOW, ROLLING_WINDOW + len(rolling))
+        ax.plot(x, rolling, linewidth=2, color=color, label=label)
+        ax.fill_between(x, rolling, alpha=0.15, color=color)
 
-        x = range(ROLLING_WINDOW, ROLLING_WINDOW + len(df_pa))
-        ax.plot(x, df_pa['rolling_xwoba'], linewidth=2, color='steelblue')
-        ax.fill_between(x, df_pa['rolling_xwoba'], alpha=0.15, color='steelblue')
+        if not reference:
+            return
 
         ax.axhline(y=0.250, color='#d9534f', linestyle='--', linewidth=2, alpha=0.6, label='Poor (.250)')
         ax.axhline(y=0.315, color='gray', linestyle='--', linewidth=2, alpha=0.6, label='Lg Avg (.315)')
         ax.axhline(y=0.400, color='#5cb85c', linestyle='--', linewidth=2, alpha=0.6, label='Great (.400)')
 
         ax.set_ylim(0, 0.6)
-        ax.set_xlim(ROLLING_WINDOW, ROLLING_WINDOW + len(df_pa) - 1)
+        ax.set_xlim(ROLLING_WINDOW, ROLLING_WINDOW + len(rolling) - 1)
         ax.set_title(f"Rolling xwOBA ({ROLLING_WINDOW} PA)", fontweight='bold')
         ax.set(xlabel=None, ylabel=None, yticklabels=[])
         ax.legend(loc='upper right', fontsize=7)
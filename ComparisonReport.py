@@ -0,0 +1,205 @@
+import pandas as pd
+import matplotlib.pyplot as plt
+import matplotlib.gridspec as gridspec
+from matplotlib.axes import Axes
+from matplotlib.lines import Line2D
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from Report import Report
+from PitchingReport import PitchingReport
+from BattingReport import BattingReport
+from PitchGroups import PitchGroups
+
+
+class ComparisonReport(Report):
+    """two to four players side by side: aligned stat lines and pitch tables, overlaid movement, location and
+    rolling xwOBA plots. the panels are the single player ones from PitchingReport and BattingReport"""
+
+    MAX_PLAYERS = 4
+
+    # (marker, linestyle, line color) telling the players apart on the overlaid plots
+    PLAYER_STYLES = [('o', '-', 'steelblue'), ('^', '--', '#d95f02'), ('s', ':', '#7570b3'), ('D', '-.', '#1b9e77')]
+
+    def __init__(self, source=None, aggregates=None):
+        super().__init__(source, aggregates)
+        self.pitching = PitchingReport(self.source, self.aggregates)
+        self.batting = BattingReport(self.source, self.aggregates)
+
+    def construct_pitching_comparison(self, pitcher_ids: List[Dict], start_date='2025-03-27', end_date='2025-10-01', season: int = None):
+        """assembles the pitching comparison; concurrent identical requests share one build"""
+        key = ('pitching-comparison', tuple(int(ids['mlbam_id']) for ids in pitcher_ids), start_date, end_date, season)
+        fig, _ = self._inflight.do(key, self._construct_pitching_comparison, pitcher_ids, start_date, end_date, season)
+        return fig
+
+    def construct_batting_comparison(self, batter_ids: List[Dict], start_date='2025-03-27', end_date='2025-10-01', season: int = None):
+        """assembles the batting comparison; concurrent identical requests share one build"""
+        key = ('batting-comparison', tuple(int(ids['mlbam_id']) for ids in batter_ids), start_date, end_date, season)
+        fig, _ = self._inflight.do(key, self._construct_batting_comparison, batter_ids, start_date, end_date, season)
+        return fig
+
+    def fetch_players(self, report: Report, player_type: str, player_ids: List[Dict], start_date: str, end_date: str):
+        """every player's processed pitches in one frame with a player column, plus {mlbam_id: name};
+        the players' statcast and bios are fetched concurrently"""
+        if not 2 <= len(player_ids) <= self.MAX_PLAYERS:
+            raise ValueError(f'a comparison takes 2 to {self.MAX_PLAYERS} players, got {len(player_ids)}')
+
+        def load(ids):
+            mlbam_id = int(ids['mlbam_id'])
+            df = self.source.statcast(player_type, mlbam_id, start_date, end_date)
+            return report.process_df(df).assign(player=mlbam_id)
+
+        with ThreadPoolExecutor(max_workers=len(player_ids) + 1) as pool:
+            frames = pool.map(load, player_ids)
+            # every player's bio in one people request
+            bios = pool.submit(self.people.bios, [ids['mlbam_id'] for ids in player_ids])
+            df = pd.concat(list(frames), ignore_index=True)
+            bios.result()
+        names = {int(ids['mlbam_id']): self.get_bio(ids['mlbam_id'])['player_name'] for ids in player_ids}
+        return df, names
+
+    def _layout(self, report_type: str, n_players: int, stat_rows: int, table_rows: list, plot_height: float):
+        """figure, grid and layout key (see Report.layout_figure) for the comparison: header, one stat line per
+        player, one pitch table per player (heights follow their row counts so every table row is the same
+        height) and a row of plots"""
+        fig = plt.figure(figsize=(8.5, 11), dpi=300)
+        height_ratios = [0.25, 8] + [2 * (stat_rows + 1)] * n_players + [2 * (rows + 1) for rows in table_rows] + [plot_height, 3]
+        layout = (f'{report_type}-comparison', tuple(height_ratios))
+        gs = gridspec.GridSpec(len(height_ratios), 5, height_ratios=height_ratios,
+                               width_ratios=[0.25, 10, 36.5, 36.5, 0.25])
+
+        for ax in [fig.add_subplot(gs[:, 0]), fig.add_subplot(gs[:, -1]), fig.add_subplot(gs[0, 1:4])]:
+            ax.axis('off')
+        return fig, gs, layout
+
+    def plot_comparison_header(self, names: Dict[int, str], ax: Axes, report_type: str, season: int = None,
+                               start_date: str = None, end_date: str = None):
+        """title, the names of the players compared and the season/date label"""
+        ax.set_facecolor(self.COL_HEADING_COLOR)
+        ax.text(0.5, 0.8, f'{report_type.title()} Comparison', va='center', ha='center', fontsize=18,
+                fontweight='bold', color='white', transform=ax.transAxes)
+        ax.text(0.5, 0.45, '  vs  '.join(names.values()), va='center', ha='center', fontsize=11, color='white',
+                transform=ax.transAxes)
+
+        date_label = f'{season} MLB Season' if season is not None else f'{start_date} to {end_date}'
+        ax.text(0.5, 0.12, date_label, va='center', ha='center', fontsize=10, fontstyle='italic', color='white',
+                transform=ax.transAxes)
+        ax.set_xticks([])
+        ax.set_yticks([])
+
+    def plot_player_label(self, name: str, i: int, ax: Axes):
+        marker, _, color = self.PLAYER_STYLES[i]
+        ax.plot([0.08], [0.5], marker=marker, color=color, markersize=6, transform=ax.transAxes)
+        ax.text(0.18, 0.5, name, va='center', ha='left', fontsize=7, fontweight='bold', wrap=True, transform=ax.transAxes)
+        ax.axis('off')
+
+    def _construct_pitching_comparison(self, pitcher_ids: List[Dict], start_date: str, end_date: str, season: int = None):
+
+        df, names = self.fetch_players(self.pitching, 'pitcher', pitcher_ids, start_date, end_date)
+        # one grouped pass over every player's pitches, split per player afterwards
+        groups = PitchGroups.split_by(df, 'player')
+        players = [player for player in names if player in groups]
+
+        table_rows = [len(groups[player].by_pitch()) for player in players]
+        fig, gs, layout = self._layout('pitching', len(players), 1, table_rows, 30)
+
+        is_season_mode = season is not None
+        if season is None:
+            season = int(start_date[:4])
+        if is_season_mode:
+            self.plot_comparison_header(names, fig.add_subplot(gs[1, 1:4]), 'pitching', season=season)
+        else:
+            self.plot_comparison_header(names, fig.add_subplot(gs[1, 1:4]), 'pitching', start_date=start_date, end_date=end_date)
+
+        fangraphs_ids = {int(ids['mlbam_id']): ids['fangraphs_id'] for ids in pitcher_ids}
+        n = len(players)
+        for i, player in enumerate(players):
+            self.plot_player_label(names[player], i, fig.add_subplot(gs[2 + i, 1]))
+            ax_stat_line = fig.add_subplot(gs[2 + i, 2:4])
+            if is_season_mode:
+                self.pitching.plot_stat_line(fangraphs_ids[player], season, ax_stat_line)
+            else:
+                self.pitching.plot_stat_line(fangraphs_ids[player], season, ax_stat_line, start_date=start_date, end_date=end_date)
+
+            self.plot_player_label(names[player], i, fig.add_subplot(gs[2 + n + i, 1]))
+            self.pitching.plot_pitch_table(None, fig.add_subplot(gs[2 + n + i, 2:4]), groups[player])
+
+        gs_plots = gridspec.GridSpecFromSubplotSpec(1, 3, subplot_spec=gs[2 + 2 * n, 1:4], wspace=0.15)
+        ax_movement = fig.add_subplot(gs_plots[0, 0])
+        ax_loc_left = fig.add_subplot(gs_plots[0, 1])
+        ax_loc_right = fig.add_subplot(gs_plots[0, 2])
+
+        same_hand = len({groups[player].handedness for player in players}) == 1
+        # every player is drawn the same way, outlined densities once anyone passes the threshold
+        density = bool((df['player'].value_counts() > self.DENSITY_THRESHOLD).any())
+        for i, player in enumerate(players):
+            marker, linestyle, _ = self.PLAYER_STYLES[i]
+            df_player = df[df['player'] == player]
+            self.pitching.plot_short_form(df_player, ax_movement, groups[player], marker=marker, linestyle=linestyle,
+                                          side_labels=same_hand and i == 0, density=density, filled=False)
+            self.pitching.plot_pitch_locations(df_player, ax_loc_left, 'L', groups[player], linestyle=linestyle)
+            self.pitching.plot_pitch_locations(df_player, ax_loc_right, 'R', groups[player], linestyle=linestyle)
+
+        handles = [Line2D([], [], marker=self.PLAYER_STYLES[i][0], linestyle=self.PLAYER_STYLES[i][1], color='black',
+                          markersize=4, label=names[player]) for i, player in enumerate(players)]
+        ax_movement.legend(handles=handles, loc='lower left', fontsize=5)
+        ax_loc_left.set_title('vs LHB', fontsize=10)
+        ax_loc_right.set_title('vs RHB', fontsize=10)
+
+        self.plot_footer(fig.add_subplot(gs[-1, 1:4]))
+        self.layout_figure(fig, layout)
+
+        return fig
+
+    def _construct_batting_comparison(self, batter_ids: List[Dict], start_date: str, end_date: str, season: int = None):
+
+        df, names = self.fetch_players(self.batting, 'batter', batter_ids, start_date, end_date)
+        # one grouped pass over every player's pitches, split per player afterwards
+        totals = self.batting.get_pitch_type_totals(df, by=['player'])
+        ev90 = df.groupby(['player', 'pitch_type'])['launch_speed'].quantile(0.9)
+        players = [player for player in names if player in totals.index.get_level_values('player')]
+
+        EXPLICIT_PITCHES = ['FF', 'SI', 'FC', 'SL', 'ST', 'CU', 'CH', 'FS']
+        table_rows = [totals.loc[player].index.isin(EXPLICIT_PITCHES).sum() for player in players]
+        # season stat lines carry the vs L and vs R splits
+        stat_rows = 3 if season is not None else 1
+        fig, gs, layout = self._layout('batting', len(players), stat_rows, table_rows, 18)
+
+        is_season_mode = season is not None
+        if season is None:
+            season = int(start_date[:4])
+        if is_season_mode:
+            self.plot_comparison_header(names, fig.add_subplot(gs[1, 1:4]), 'batting', season=season)
+        else:
+            self.plot_comparison_header(names, fig.add_subplot(gs[1, 1:4]), 'batting', start_date=start_date, end_date=end_date)
+
+        fangraphs_ids = {int(ids['mlbam_id']): ids['fangraphs_id'] for ids in batter_ids}
+        n = len(players)
+        for i, player in enumerate(players):
+            self.plot_player_label(names[player], i, fig.add_subplot(gs[2 + i, 1]))
+            ax_stat_line = fig.add_subplot(gs[2 + i, 2:4])
+            if is_season_mode:
+                self.batting.plot_stat_line(fangraphs_ids[player], season, ax_stat_line)
+            else:
+                self.batting.plot_stat_line(fangraphs_ids[player], season, ax_stat_line, start_date=start_date, end_date=end_date)
+
+            self.plot_player_label(names[player], i, fig.add_subplot(gs[2 + n + i, 1]))
+            self.batting.plot_pitch_table(None, fig.add_subplot(gs[2 + n + i, 2:4]), totals.loc[player], ev90.loc[player])
+
+        # the longest line goes last, it sets the x range and draws the reference lines and legend
+        ax_rolling = fig.add_subplot(gs[2 + 2 * n, 1:4])
+        pa_counts = df[df['estimated_woba_using_speedangle'].notna()].groupby('player').size()
+        by_length = sorted(range(n), key=lambda i: pa_counts.get(players[i], 0))
+        for rank, i in enumerate(by_length):
+            _, _, color = self.PLAYER_STYLES[i]
+            self.batting.plot_xwoba_by_month(df[df['player'] == players[i]], ax_rolling, color=color,
+                                             label=names[players[i]], reference=rank == n - 1)
+
+        self.plot_footer(fig.add_subplot(gs[-1, 1:4]))
+        self.layout_figure(fig, layout)
+
+        return fig
+
+    def plot_footer(self, ax: Axes):
+        ax.text(0.25, 0.5, 'Made by Anthony Ciardelli', ha='center', va='center', fontsize=10)
+        ax.text(0.75, 0.5, 'Data from MLB and Fangraphs', ha='center', va='center', fontsize=10)
+        ax.axis('off')
@@ -0,0 +1,174 @@
+import pandas as pd
+import requests
+from datetime import date, timedelta
+from PIL import Image
+from io import BytesIO, StringIO
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import config
+from singleflight import SingleFlight
+from PitchStore import PitchStore
+from ratelimit import RateLimiter
+from streaming import date_chunks
+
+
+class DataSource():
+    """every external fetch the reports make goes through here, so they can be pointed at a stand-in server"""
+
+    STATCAST_URL = ('https://baseballsavant.mlb.com/statcast_search/csv?all=true&type=details'
+                    '&player_type={player_type}&{lookup}%5B%5D={player_id}&game_date_gt={start_date}&game_date_lt={end_date}')
+    LEAGUE_STATCAST_URL = ('https://baseballsavant.mlb.com/statcast_search/csv?all=true&type=details'
+                           '&game_date_gt={game_date}&game_date_lt={game_date}')
+
+    # shared by every instance so concurrent sessions asking for the same url or statcast range make one request
+    _inflight = SingleFlight()
+
+    def __init__(self, replay_url: str = None, timeout: float = None, store: PitchStore = None,
+                 limiter: RateLimiter = None, priority: str = 'interactive'):
+        self.replay_url = replay_url.rstrip('/') if replay_url else None
+        self.timeout = timeout
+        self.store = store
+        self.limiter = limiter
+        # where this process's requests queue behind the limited hosts; batch and prefetch runs lower it
+        self.priority = priority
+
+    @classmethod
+    def from_config(cls):
+        """live sources unless config.replay_url points at a replay server"""
+        # replayed data must never end up in the pitch store, and the replay server needs no rate limits
+        store = None if config.replay_url else PitchStore.from_config()
+        limiter = None if config.replay_url else RateLimiter.from_config()
+        return cls(replay_url=config.replay_url, timeout=config.request_timeout, store=store, limiter=limiter)
+
+    def resolve(self, url: str):
+        """maps a live url onto the replay server as {replay_url}/{host}{path}?{query}"""
+        if self.replay_url is None:
+            return url
+        parts = urlsplit(url)
+        resolved = f'{self.replay_url}/{parts.netloc}{parts.path}'
+        return f'{resolved}?{parts.query}' if parts.query else resolved
+
+    def get(self, url: str):
+        host = urlsplit(url).netloc
+        url = self.resolve(url)
+        response, _ = self._inflight.do(('get', url), self._get, url, host)
+        return response
+
+    def _get(self, url: str, host: str = None):
+        if self.limiter is not None:
+            self.limiter.acquire(host or urlsplit(url).netloc, self.priority)
+        response = requests.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    def get_json(self, url: str):
+        return self.get(url).json()
+
+    def get_image(self, url: str):
+        return Image.open(BytesIO(self.get(url).content))
+
+    def statcast(self, player_type: str, player_id: int, start_date: str, end_date: str):
+        """pitch-level statcast data for a pitcher or batter"""
+        key = ('statcast', self.replay_url, player_type, int(player_id), start_date, end_date)
+        fetch = self._statcast_cached if self.store is not None else self._statcast
+        # the report pipeline never modifies the frame it gets, so a shared result is handed out as is
+        df, _ = self._inflight.do(key, fetch, player_type, player_id, start_date, end_date)
+        return df
+
+    def _statcast(self, player_type: str, player_id: int, start_date: str, end_date: str):
+        if self.replay_url is None:
+            # pybaseball takes about a second to import, so only pay for it when statcast is actually fetched
+            import pybaseball as pyb
+            if player_type == 'pitcher':
+                return pyb.statcast_pitcher(start_date, end_date, player_id)
+            return pyb.statcast_batter(start_date, end_date, player_id)
+
+        lookup = 'pitchers_lookup' if player_type == 'pitcher' else 'batters_lookup'
+        url = self.STATCAST_URL.format(player_type=player_type, lookup=lookup, player_id=player_id,
+                                       start_date=start_date, end_date=end_date)
+        return pd.read_csv(StringIO(self.get(url).text))
+
+    def _statcast_cached(self, player_type: str, player_id: int, start_date: str, end_date: str):
+        """statcast through the pitch store: completed days come from the store and only the days since
+        the player's last pull are fetched; today's (possibly unfinished) games are never stored"""
+        today = date.today().isoformat()
+        for year in range(int(start_date[:4]), int(end_date[:4]) + 1):
+            through = min(end_date, (date.today() - timedelta(days=1)).isoformat(), f'{year}-12-31')
+            if through >= f'{year}-01-01':
+                self._season_delta(player_type, player_id, year, through)
+
+        df = self.store.query(start_date=start_date, end_date=min(end_date, today), **{player_type: player_id})
+        if end_date >= today:
+            df_today = self._statcast(player_type, player_id, today, end_date)
+            df = pd.concat([df_today.reindex(columns=df.columns), df], ignore_index=True)
+        return df
+
+    def _season_delta(self, player_type: str, player_id: int, year: int, through: str):
+        """tops up the player's season in the store with any days after its last pull up to `through`"""
+        covered = self.store.covered_through(player_type, player_id, year)
+        if covered is not None and covered >= through:
+            return
+
+        fetch_from = f'{year}-01-01' if covered is None else (date.fromisoformat(covered) + timedelta(days=1)).isoformat()
+        # days a league-wide pull (see ingest_league) already stored need no request of their own
+        ingested = self.store.ingested_dates(fetch_from, through)
+        missing = [day for day, _ in date_chunks(fetch_from, through, 1) if day not in ingested]
+        for run_start, run_end in self._runs(missing):
+            self.store.insert(self._statcast(player_type, player_id, run_start, run_end))
+        self.store.set_covered_through(player_type, player_id, year, through)
+
+    @staticmethod
+    def _runs(days: list):
+        """sorted iso days as (first, last) runs of consecutive days; december and january have no games, so
+        november 30th to february 1st counts as consecutive"""
+        runs = []
+        for day in days:
+            if runs:
+                gap = (date.fromisoformat(day) - date.fromisoformat(runs[-1][1])).days
+                if gap == 1 or (runs[-1][1][5:] == '11-30' and day[5:] == '02-01'):
+                    runs[-1][1] = day
+                    continue
+            runs.append([day, day])
+        return [tuple(run) for run in runs]
+
+    def ingest_league(self, start_date: str, end_date: str, workers: int = 4):
+        """stores every pitch of every game day in the range, one league-wide statcast search per day, so any
+        pitcher's or batter's days come from the store instead of a request per player. days already ingested and
+        today's unfinished games are skipped; returns {game_date: pitches} for the days pulled"""
+        if self.store is None:
+            raise ValueError('league ingestion needs a pitch store')
+        through = min(end_date, (date.today() - timedelta(days=1)).isoformat())
+        ingested = self.store.ingested_dates(start_date, through)
+        days = [day for day, _ in date_chunks(start_date, through, 1) if day not in ingested]
+
+        def pull(day):
+            df = self._statcast_day(day)
+            self.store.insert(df)
+            # marked only once its pitches are in, so an interrupted pull is simply pulled again
+            self.store.set_ingested(day, len(df))
+            return day, len(df)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(pool.map(pull, days))
+
+    def _statcast_day(self, game_date: str):
+        """every pitch thrown on the day"""
+        if self.replay_url is None:
+            import pybaseball as pyb
+            df = pyb.statcast(game_date, game_date, verbose=False)
+            return df if df is not None else pd.DataFrame()
+        text = self.get(self.LEAGUE_STATCAST_URL.format(game_date=game_date)).text
+        return pd.read_csv(StringIO(text)) if text.strip() else pd.DataFrame()
+
+    def statcast_chunks(self, player_type: str, player_id: int, start_date: str, end_date: str, days: int = None):
+        """statcast for the range one date chunk at a time, oldest chunk first; chunks without pitches are skipped"""
+        for chunk_start, chunk_end in date_chunks(start_date, end_date, days or config.stream_chunk_days):
+            df = self.statcast(player_type, player_id, chunk_start, chunk_end)
+            if not df.empty:
+                yield df
+
+    def statcast_pitcher(self, start_date: str, end_date: str, player_id: int):
+        return self.statcast('pitcher', player_id, start_date, end_date)
+
+    def statcast_batter(self, start_date: str, end_date: str, player_id: int):
+        return self.statcast('batter', player_id, start_date, end_date)
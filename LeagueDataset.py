@@ -0,0 +1,233 @@
+"""memory-mapped columnar copy of a season's processed pitches for league-wide analytics
+
+the dataset is a directory holding one .npy file per column, written twice: sorted by pitcher and sorted by batter.
+each order has an offset index, so one player's pitches are a contiguous row range in either order.
+columns are opened with mmap_mode='r', so every worker process maps the same files and shares their pages
+through the OS page cache instead of holding its own copy of the season.
+
+the pitch table colors each pitcher's numbers against league baselines per pitch type (league_pitch_type_stats):
+every render process maps the newest dataset under {cache_dir}/league and computes them from the shared columns.
+
+usage: python LeagueDataset.py --season 2025 --out ~/.cache/mlb-reports/league/2025
+"""
+import argparse
+import json
+import os
+import threading
+import numpy as np
+import pandas as pd
+import config
+
+ORDERS = ['pitcher', 'batter']
+
+# on-disk dtype per column; TEXT columns are stored as int16 codes into a per-column category list
+NUMERIC_DTYPES = {
+    'game_pk': np.int32, 'at_bat_number': np.int16, 'pitch_number': np.int16, 'game_year': np.int16,
+    'pitcher': np.int32, 'batter': np.int32, 'balls': np.int8, 'strikes': np.int8,
+    'zone': np.float32, 'release_speed': np.float32, 'release_spin_rate': np.float32,
+    'release_extension': np.float32, 'release_pos_x': np.float32, 'release_pos_z': np.float32,
+    'pfx_x': np.float32, 'pfx_z': np.float32, 'plate_x': np.float32, 'plate_z': np.float32,
+    'hc_x': np.float32, 'hc_y': np.float32, 'launch_speed': np.float32, 'launch_angle': np.float32,
+    'estimated_woba_using_speedangle': np.float32,
+    # derived in Report.process_df_base
+    'swing': np.bool_, 'whiff': np.bool_, 'in_zone': np.bool_, 'out_zone': np.bool_,
+    'chase': np.bool_, 'zone_swing': np.bool_, 'zone_whiff': np.bool_,
+}
+CATEGORICAL = ['player_name', 'home_team', 'away_team', 'p_throws', 'stand', 'pitch_type',
+               'description', 'events', 'type', 'bb_type']
+
+# the pitch table's colored metrics as (column, denominator): a mean of the column when the denominator is None,
+# otherwise the column's share of the denominator's pitches in percent, as PitchingReport.get_pitch_groupings does
+PITCH_TABLE_METRICS = {
+    'velo': ('release_speed', None), 'spin_rate': ('release_spin_rate', None),
+    'extension': ('release_extension', None), 'zone_pct': ('in_zone', 'pitches'),
+    'chase_pct': ('chase', 'out_zone'), 'whiff_pct': ('whiff', 'swing'),
+    'zone_whiff_pct': ('zone_whiff', 'zone_swing'), 'xwoba': ('estimated_woba_using_speedangle', None),
+}
+
+
+class LeagueDataset():
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.categories = self.meta['categories']
+        self._columns = {order: {} for order in ORDERS}
+        self._offsets = {}
+
+    @property
+    def columns(self):
+        return list(NUMERIC_DTYPES) + CATEGORICAL + ['game_date']
+
+    def __len__(self):
+        return self.meta['rows']
+
+    def column(self, name: str, order: str = 'pitcher'):
+        """the whole column as a read-only memory map"""
+        if name not in self._columns[order]:
+            self._columns[order][name] = np.load(os.path.join(self.path, order, f'{name}.npy'), mmap_mode='r')
+        return self._columns[order][name]
+
+    def _offset_index(self, order: str):
+        if order not in self._offsets:
+            ids = np.load(os.path.join(self.path, order, 'index_ids.npy'))
+            starts = np.load(os.path.join(self.path, order, 'index_starts.npy'))
+            self._offsets[order] = (ids, starts)
+        return self._offsets[order]
+
+    def rows(self, player_id: int, order: str = 'pitcher'):
+        """the [start, stop) row range holding the player's pitches in the given order"""
+        ids, starts = self._offset_index(order)
+        i = np.searchsorted(ids, player_id)
+        if i == len(ids) or ids[i] != player_id:
+            return 0, 0
+        return int(starts[i]), int(starts[i + 1])
+
+    def player_columns(self, player_id: int, order: str = 'pitcher', columns=None):
+        """{column: array} for one player; the arrays are zero-copy views into the memory maps"""
+        start, stop = self.rows(player_id, order)
+        return {name: self.column(name, order)[start:stop] for name in (columns or self.columns)}
+
+    def player_frame(self, player_id: int, order: str = 'pitcher', columns=None):
+        """one player's pitches as a DataFrame shaped like Report.process_df_base output (this copies the slice)"""
+        arrays = self.player_columns(player_id, order, columns)
+        data = {}
+        for name, values in arrays.items():
+            if name in CATEGORICAL:
+                data[name] = pd.Categorical.from_codes(np.asarray(values), self.categories[name]).astype(object)
+            elif name == 'game_date':
+                data[name] = np.datetime_as_string(values, unit='D')
+            else:
+                data[name] = np.asarray(values)
+        return pd.DataFrame(data)
+
+    def pitch_type_baseline(self, column: str):
+        """league mean and std of a column per pitch type, in one pass over the column with bincount"""
+        codes = np.asarray(self.column('pitch_type'))
+        values = np.asarray(self.column(column), dtype=np.float64)
+        valid = ~np.isnan(values) & (codes >= 0)
+        n_types = len(self.categories['pitch_type'])
+        count = np.bincount(codes[valid], minlength=n_types)
+        total = np.bincount(codes[valid], weights=values[valid], minlength=n_types)
+        total_sq = np.bincount(codes[valid], weights=values[valid] ** 2, minlength=n_types)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = total / count
+            std = np.sqrt(np.maximum(total_sq / count - mean ** 2, 0) * count / np.maximum(count - 1, 1))
+        return pd.DataFrame({'count': count, 'mean': mean, 'std': std}, index=self.categories['pitch_type'])
+
+    def pitcher_pitch_type_baselines(self, min_pitches: int = 100):
+        """{(metric, 'mean' or 'std'): {pitch_type: value}} in the shape of config.pitch_type_stats: every pitcher's
+        average or rate for each pitch type they threw at least min_pitches of, then the mean and std of those
+        across pitchers. one bincount per column over the pitcher-ordered columns"""
+        ids, starts = self._offset_index('pitcher')
+        types = self.categories['pitch_type']
+        codes = np.asarray(self.column('pitch_type')).astype(np.int64)
+        valid = codes >= 0
+        # one bin per (pitcher, pitch type); pitchers are contiguous runs in pitcher order
+        bins = (np.repeat(np.arange(len(ids)), np.diff(starts)) * len(types) + codes)[valid]
+        size = len(ids) * len(types)
+        pitches = np.bincount(bins, minlength=size)
+
+        def total(name):
+            values = np.asarray(self.column(name), dtype=np.float64)[valid]
+            known = ~np.isnan(values)
+            return (np.bincount(bins, weights=np.where(known, values, 0), minlength=size),
+                    np.bincount(bins, weights=known, minlength=size))
+
+        baselines = {}
+        for metric, (column, denominator) in PITCH_TABLE_METRICS.items():
+            sums, n = total(column)
+            if denominator is not None:
+                n = pitches if denominator == 'pitches' else total(denominator)[0]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                per_pitcher = sums / n * (100 if denominator is not None else 1)
+            per_pitcher[(n == 0) | (pitches < min_pitches)] = np.nan
+            per_pitcher = per_pitcher.reshape(len(ids), len(types))
+
+            qualified = (~np.isnan(per_pitcher)).sum(axis=0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = np.nansum(per_pitcher, axis=0) / qualified
+                std = np.sqrt(np.nansum((per_pitcher - mean) ** 2, axis=0) / (qualified - 1))
+            baselines[(metric, 'mean')] = {t: float(mean[i]) if qualified[i] else None for i, t in enumerate(types)}
+            baselines[(metric, 'std')] = {t: float(std[i]) if qualified[i] > 1 else None for i, t in enumerate(types)}
+        return baselines
+
+
+_baselines = None
+_baselines_lock = threading.Lock()
+
+
+def latest_dataset(root: str = None):
+    """the newest season's dataset under root ({cache_dir}/league by default), or None if none has been built"""
+    root = root or os.path.join(config.cache_dir, 'league')
+    seasons = sorted((int(name) for name in os.listdir(root) if name.isdigit()), reverse=True) \
+        if os.path.isdir(root) else []
+    for season in seasons:
+        if os.path.exists(os.path.join(root, str(season), 'meta.json')):
+            return LeagueDataset(os.path.join(root, str(season)))
+    return None
+
+
+def league_pitch_type_stats():
+    """config.pitch_type_stats with every pitch type the newest league dataset has baselines for replaced by them;
+    worked out once per process from the memory-mapped columns every process shares"""
+    global _baselines
+    with _baselines_lock:
+        if _baselines is None:
+            stats = {key: dict(values) for key, values in config.pitch_type_stats.items()}
+            dataset = latest_dataset()
+            if dataset is not None:
+                for key, values in dataset.pitcher_pitch_type_baselines().items():
+                    stats.setdefault(key, {}).update({t: v for t, v in values.items() if v is not None})
+            _baselines = stats
+        return _baselines
+
+
+def build(df: pd.DataFrame, path: str):
+    """writes processed pitches (Report.process_df_base output) as a LeagueDataset at path"""
+    categories = {}
+    codes = {}
+    for name in CATEGORICAL:
+        cat = pd.Categorical(df[name]) if name in df else pd.Categorical([None] * len(df))
+        categories[name] = [str(c) for c in cat.categories]
+        codes[name] = cat.codes.astype(np.int16)
+
+    for order in ORDERS:
+        os.makedirs(os.path.join(path, order), exist_ok=True)
+        sort = np.argsort(df[order].to_numpy(), kind='stable')
+
+        for name, dtype in NUMERIC_DTYPES.items():
+            values = df[name].to_numpy() if name in df else np.full(len(df), np.nan)
+            if np.issubdtype(dtype, np.integer):
+                values = np.nan_to_num(values.astype(np.float64), nan=-1)
+            np.save(os.path.join(path, order, f'{name}.npy'), values[sort].astype(dtype))
+        for name in CATEGORICAL:
+            np.save(os.path.join(path, order, f'{name}.npy'), codes[name][sort])
+        dates = pd.to_datetime(df['game_date']).to_numpy().astype('datetime64[D]')
+        np.save(os.path.join(path, order, 'game_date.npy'), dates[sort])
+
+        ids, starts = np.unique(df[order].to_numpy()[sort], return_index=True)
+        np.save(os.path.join(path, order, 'index_ids.npy'), ids.astype(np.int64))
+        np.save(os.path.join(path, order, 'index_starts.npy'), np.append(starts, len(df)).astype(np.int64))
+
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump({'rows': len(df), 'categories': categories}, f)
+    return LeagueDataset(path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='build a memory-mapped league dataset from the pitch store')
+    parser.add_argument('--season', type=int, required=True)
+    parser.add_argument('--out')
+    args = parser.parse_args()
+
+    from PitchStore import PitchStore
+    from Report import Report
+    from DataSource import DataSource
+
+    df = PitchStore.from_config().query(start_date=f'{args.season}-01-01', end_date=f'{args.season}-12-31')
+    df = Report(DataSource()).process_df_base(df)
+    out = args.out or os.path.join(config.cache_dir, 'league', str(args.season))
+    dataset = build(df, out)
+    print(f'wrote {len(dataset)} pitches to {out}')
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+
+class PitchGroups():
+    """everything the pitching panels aggregate, computed once per report: sums and counts per
+    (pitch_type, stand, count_state) cell plus location stats per (pitch_type, stand)"""
+
+    KEYS = ['pitch_type', 'stand', 'count_state']
+
+    # columns averaged by the panels; each cell keeps the sum and non-null count so means can be rolled up
+    MEAN_COLUMNS = ['release_speed', 'pfx_z', 'pfx_x', 'release_spin_rate', 'release_pos_x', 'release_pos_z',
+                    'release_extension', 'estimated_woba_using_speedangle']
+    FLAG_COLUMNS = ['whiff', 'zone_whiff', 'swing', 'zone_swing', 'in_zone', 'out_zone', 'chase']
+
+    def __init__(self, cells: pd.DataFrame, locations: pd.DataFrame, handedness: str):
+        self.cells = cells
+        self.locations = locations
+        self.handedness = handedness
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame):
+        """builds the groups from a PitchingReport.process_df frame"""
+        cells, locations = cls._aggregate(df, [])
+        handedness = df['p_throws'].iloc[0] if len(df) else None
+        return cls(cells, locations, handedness)
+
+    @classmethod
+    def split_by(cls, df: pd.DataFrame, column: str):
+        """{value: PitchGroups} for every value of column (e.g. one per player), from a single grouped pass over df"""
+        cells, locations = cls._aggregate(df, [column])
+        handedness = df.groupby(column, sort=False)['p_throws'].first()
+        locations_by = dict(list(locations.groupby(column, sort=False)))
+        return {
+            value: cls(group.drop(columns=column).reset_index(drop=True),
+                       locations_by[value].drop(columns=column).reset_index(drop=True),
+                       handedness[value])
+            for value, group in cells.groupby(column, sort=False)
+        }
+
+    @classmethod
+    def _aggregate(cls, df: pd.DataFrame, by: list):
+        aggs = {'pitch_count': ('pitch_type', 'size')}
+        for col in cls.MEAN_COLUMNS:
+            aggs[f'{col}_sum'] = (col, 'sum')
+            aggs[f'{col}_n'] = (col, 'count')
+        for col in cls.FLAG_COLUMNS:
+            aggs[col] = (col, 'sum')
+        cells = df.groupby(by + cls.KEYS).agg(**aggs).reset_index()
+
+        # sort=False keeps pitches in order of first appearance, which is the order the location plots draw them
+        locations = df.groupby(by + ['pitch_type', 'stand'], sort=False).agg(
+            count = ('plate_x', 'size'),
+            center_x = ('plate_x', 'median'),
+            center_z = ('plate_z', 'median'),
+            std_x = ('plate_x', 'std'),
+            std_z = ('plate_z', 'std'),
+        ).reset_index()
+        return cells, locations
+
+    @classmethod
+    def combine(cls, groups):
+        """one PitchGroups over several (e.g. per-season) groups; cell totals add up exactly, while location centers
+        and spreads are count-weighted averages of the parts"""
+        cells = pd.concat([g.cells for g in groups]).groupby(cls.KEYS, as_index=False).sum()
+
+        locations = pd.concat([g.locations for g in groups], ignore_index=True)
+        stats = ['center_x', 'center_z', 'std_x', 'std_z']
+        weighted = locations[stats].mul(locations['count'], axis=0).assign(
+            pitch_type=locations['pitch_type'], stand=locations['stand'], count=locations['count'])
+        locations = weighted.groupby(['pitch_type', 'stand'], sort=False).sum()
+        locations[stats] = locations[stats].div(locations['count'], axis=0)
+        locations = locations.reset_index()[['pitch_type', 'stand', 'count'] + stats]
+
+        handedness = next((g.handedness for g in groups if g.handedness is not None), None)
+        return cls(cells, locations, handedness)
+
+    def by_pitch(self):
+        """cells rolled up per pitch type: counts, flag sums and column means"""
+        sums = self.cells.drop(columns=['stand', 'count_state']).groupby('pitch_type').sum()
+        out = pd.DataFrame({'pitch_count': sums['pitch_count']})
+        for col in self.MEAN_COLUMNS:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                out[col] = sums[f'{col}_sum'] / sums[f'{col}_n'].where(sums[f'{col}_n'] > 0)
+        for col in self.FLAG_COLUMNS:
+            out[col] = sums[col]
+        return out.reset_index()
+
+    def usages(self):
+        """usage rate of each pitch per batter hand and count state (PitchingReport.find_usages)"""
+        df_usages = self.cells[self.KEYS + ['pitch_count']].rename(columns={'pitch_count': 'pitch_ct'})
+        totals = df_usages.groupby(['stand', 'count_state'])['pitch_ct'].transform('sum')
+        df_usages['usage_pct'] = (df_usages['pitch_ct'] / totals * 100).round(1)
+        return df_usages
+
+    def release_points(self):
+        """average release point per pitch type, for the arm angle lines on the movement plot"""
+        sums = self.cells.groupby('pitch_type')[['release_pos_x_sum', 'release_pos_x_n',
+                                                 'release_pos_z_sum', 'release_pos_z_n']].sum()
+        return pd.DataFrame({
+            'avg_x': sums['release_pos_x_sum'] / sums['release_pos_x_n'],
+            'avg_y': sums['release_pos_z_sum'] / sums['release_pos_z_n'],
+        })
+
+    def stand_locations(self, batter_hand: str):
+        """location stats of every pitch thrown to one batter hand, plus the total pitches to that hand"""
+        locations = self.locations[self.locations['stand'] == batter_hand]
+        return locations, int(locations['count'].sum())
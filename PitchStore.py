@@ -0,0 +1,140 @@
+import os
+import sqlite3
+import pandas as pd
+import config
+
+
+class PitchStore():
+    """embedded sqlite store of statcast pitches, indexed on the keys the reports slice by
+    (pitcher/batter + date, batter hand, pitcher hand, pitch type)"""
+
+    # the statcast columns the reports read; everything else in the search csv is dropped on the way in
+    COLUMNS = {
+        'game_pk': 'INTEGER', 'at_bat_number': 'INTEGER', 'pitch_number': 'INTEGER',
+        'game_date': 'TEXT', 'game_year': 'INTEGER', 'pitcher': 'INTEGER', 'batter': 'INTEGER',
+        'player_name': 'TEXT', 'home_team': 'TEXT', 'away_team': 'TEXT',
+        'p_throws': 'TEXT', 'stand': 'TEXT', 'balls': 'INTEGER', 'strikes': 'INTEGER',
+        'pitch_type': 'TEXT', 'description': 'TEXT', 'events': 'TEXT', 'type': 'TEXT', 'bb_type': 'TEXT',
+        'zone': 'REAL', 'release_speed': 'REAL', 'release_spin_rate': 'REAL', 'release_extension': 'REAL',
+        'release_pos_x': 'REAL', 'release_pos_z': 'REAL', 'pfx_x': 'REAL', 'pfx_z': 'REAL',
+        'plate_x': 'REAL', 'plate_z': 'REAL', 'hc_x': 'REAL', 'hc_y': 'REAL',
+        'launch_speed': 'REAL', 'launch_angle': 'REAL', 'estimated_woba_using_speedangle': 'REAL',
+    }
+
+    INDEXES = {
+        'pitches_pitcher_date': ['pitcher', 'game_date'],
+        'pitches_batter_date': ['batter', 'game_date'],
+        'pitches_pitcher_stand_type': ['pitcher', 'stand', 'pitch_type'],
+        'pitches_batter_throws': ['batter', 'p_throws'],
+        'pitches_date': ['game_date'],
+    }
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        columns = ', '.join(f'{name} {kind}' for name, kind in self.COLUMNS.items())
+        self._executescript(f"""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS pitches ({columns}, PRIMARY KEY (game_pk, at_bat_number, pitch_number));
+            CREATE TABLE IF NOT EXISTS coverage (
+                player_type TEXT, player_id INTEGER, season INTEGER, through TEXT,
+                PRIMARY KEY (player_type, player_id, season));
+            CREATE TABLE IF NOT EXISTS ingested (game_date TEXT PRIMARY KEY, pitches INTEGER);
+            {''.join(f'CREATE INDEX IF NOT EXISTS {name} ON pitches ({", ".join(cols)});' for name, cols in self.INDEXES.items())}
+        """)
+
+    @classmethod
+    def from_config(cls):
+        return cls(os.path.join(config.cache_dir, 'pitches.db'))
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=60)
+
+    def _executescript(self, script: str):
+        conn = self._connect()
+        try:
+            conn.executescript(script)
+        finally:
+            conn.close()
+
+    def _execute(self, sql: str, params=()):
+        conn = self._connect()
+        try:
+            with conn:
+                return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def insert(self, df: pd.DataFrame):
+        """adds statcast rows, ignoring pitches that are already stored"""
+        if df.empty:
+            return 0
+        columns = list(self.COLUMNS)
+        rows = df.reindex(columns=columns)
+        # pybaseball parses game_date into datetimes while the savant csv leaves it as text; stored as text either
+        # way so the date range filters compare like for like
+        rows['game_date'] = pd.to_datetime(rows['game_date']).dt.strftime('%Y-%m-%d')
+        rows = rows.astype(object)
+        rows = rows.where(rows.notna(), None)
+        sql = f'INSERT OR IGNORE INTO pitches ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})'
+        conn = self._connect()
+        try:
+            with conn:
+                return conn.executemany(sql, rows.itertuples(index=False, name=None)).rowcount
+        finally:
+            conn.close()
+
+    def query(self, columns=None, pitcher: int = None, batter: int = None, start_date: str = None,
+              end_date: str = None, **equals):
+        """returns the pitches matching every filter given; equals filters (stand, p_throws, pitch_type, events ...)
+        take a value or a list of values"""
+        where, params = [], []
+        if pitcher is not None:
+            where.append('pitcher = ?')
+            params.append(int(pitcher))
+        if batter is not None:
+            where.append('batter = ?')
+            params.append(int(batter))
+        if start_date is not None:
+            where.append('game_date >= ?')
+            params.append(start_date)
+        if end_date is not None:
+            where.append('game_date <= ?')
+            params.append(end_date)
+        for column, value in equals.items():
+            if column not in self.COLUMNS:
+                raise ValueError(f'unknown pitch column {column}')
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            where.append(f'{column} IN ({", ".join("?" * len(values))})')
+            params += values
+
+        select = ', '.join(columns or self.COLUMNS)
+        sql = f'SELECT {select} FROM pitches'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        # statcast hands pitches back newest first, keep that order
+        sql += ' ORDER BY game_date DESC, game_pk DESC, at_bat_number DESC, pitch_number DESC'
+
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(sql, conn, params=params)
+        finally:
+            conn.close()
+
+    def covered_through(self, player_type: str, player_id: int, season: int):
+        """the last date this player's season has been pulled through, or None"""
+        rows = self._execute('SELECT through FROM coverage WHERE player_type = ? AND player_id = ? AND season = ?',
+                             (player_type, int(player_id), season))
+        return rows[0][0] if rows else None
+
+    def set_covered_through(self, player_type: str, player_id: int, season: int, through: str):
+        self._execute('INSERT OR REPLACE INTO coverage VALUES (?, ?, ?, ?)', (player_type, int(player_id), season, through))
+
+    def ingested_dates(self, start_date: str, end_date: str):
+        """the days in [start_date, end_date] whose every pitch, league-wide, has been stored"""
+        rows = self._execute('SELECT game_date FROM ingested WHERE game_date >= ? AND game_date <= ?',
+                             (start_date, end_date))
+        return {row[0] for row in rows}
+
+    def set_ingested(self, game_date: str, pitches: int):
+        self._execute('INSERT OR REPLACE INTO ingested VALUES (?, ?)', (game_date, pitches))
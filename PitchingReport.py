@@ -4,36 +4,63 @@ import matplotlib.pyplot as plt
 import matplotlib.gridspec as gridspec
 from matplotlib.patches import Rectangle, Ellipse, Circle
 from matplotlib.axes import Axes
-import seaborn as sns
-import pybaseball as pyb
-import requests
-import config
 from Report import Report
+from tables import cell_table
+from PitchGroups import PitchGroups
+from LeagueDataset import league_pitch_type_stats
+from reportdata import PitchingData
+from streaming import PitchingStream
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict
 
 class PitchingReport(Report):
 
-    def construct_pitching_summary(self, pitcher_ids: Dict, start_date='2025-03-27', end_date='2025-10-01', season: int = None):
-        """assembles the entire pitching summary"""
+    # how pitching_panels are laid out, row by row, when shown one at a time
+    PANEL_ROWS = [['header'], ['stat_line'], ['short_form', 'usage_pies'], ['pitch_table'], ['loc_left', 'loc_right']]
 
-        mlbam_pitcher_id = pitcher_ids["mlbam_id"]
-        fangraphs_pitcher_id = pitcher_ids["fangraphs_id"]
-
-        df_player = pyb.statcast_pitcher(start_date, end_date, mlbam_pitcher_id)
-        df_player = self.process_df(df_player)
+    def construct_pitching_summary(self, pitcher_ids: Dict, start_date='2025-03-27', end_date='2025-10-01', season: int = None,
+                                   refresh: bool = False):
+        """assembles the entire pitching summary; concurrent identical requests share one build and one figure.
+        the data is cached (see pitching_data), refresh fetches it again"""
+        key = ('pitching', int(pitcher_ids['mlbam_id']), start_date, end_date, season)
+        fig, _ = self._inflight.do(key, self._construct_pitching_summary, pitcher_ids, start_date, end_date, season, refresh)
+        return fig
 
-        is_season_mode = season is not None
-        if season is None:
-            season = int(start_date[:4])
+    def _construct_pitching_summary(self, pitcher_ids: Dict, start_date: str, end_date: str, season: int = None,
+                                    refresh: bool = False):
+        return self.draw_pitching_summary(self.pitching_data(pitcher_ids, start_date, end_date, season, refresh))
+
+    def pitching_data(self, pitcher_ids: Dict, start_date: str, end_date: str, season: int = None, refresh: bool = False):
+        """the PitchingData behind a summary, from the cache unless refresh; the header, stat line and statcast
+        requests go out together"""
+        mlbam_pitcher_id = int(pitcher_ids["mlbam_id"])
+        key = ('pitching', mlbam_pitcher_id, start_date, end_date, season)
+
+        def compute():
+            date_span = {} if season is not None else {'start_date': start_date, 'end_date': end_date}
+            stat_season = season if season is not None else int(start_date[:4])
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                header = pool.submit(self.get_header, mlbam_pitcher_id)
+                stat_line = pool.submit(self.get_fangraphs_pitching_stats, pitcher_ids["fangraphs_id"], stat_season, **date_span)
+                df_player, groups = self.get_player_data(mlbam_pitcher_id, start_date, end_date)
+                return PitchingData(groups, df_player, mlbam_id=mlbam_pitcher_id, start_date=start_date, end_date=end_date,
+                                    season=season, header=header.result(), stat_line=stat_line.result())
+
+        return self.report_data(key, compute, refresh)
+
+    def draw_pitching_summary(self, data: PitchingData):
+        """lays out the pitching summary from its data alone"""
+        is_season_mode = data.season is not None
+        season = data.season if is_season_mode else int(data.start_date[:4])
 
         fig = plt.figure(figsize=(self.REPORT_WIDTH, self.REPORT_HEIGHT), dpi=300)
-
+        layout = ('pitching',)
 
         gs = gridspec.GridSpec(7, 4,
                             height_ratios=[0.25,12,5,31,32,24,3],
                             width_ratios=[0.25, 41.5, 41.5, 0.25]
                             )
-        
+
         # create margins along the side
         ax_header = fig.add_subplot(gs[0, 1:3])
         ax_left = fig.add_subplot(gs[:, 0])
@@ -42,7 +69,7 @@ class PitchingReport(Report):
 
         for ax in [ax_header, ax_left, ax_right, ax_footer]:
             ax.axis('off')
-        
+
         ax_header = fig.add_subplot(gs[1, 1:3])
         ax_stat_line = fig.add_subplot(gs[2, 1:3])
         ax_short_form = fig.add_subplot(gs[3, 1:2])
@@ -53,27 +80,137 @@ class PitchingReport(Report):
 
         # assign the axis values to their plots
         if is_season_mode:
-            self.plot_header(mlbam_pitcher_id, ax_header, season=season)
+            self.plot_header(data.mlbam_id, ax_header, season=season, header=data.header)
         else:
-            self.plot_header(mlbam_pitcher_id, ax_header, start_date=start_date, end_date=end_date)
-        if is_season_mode:
-            self.plot_stat_line(fangraphs_pitcher_id, season, ax_stat_line)
-        else:
-            self.plot_stat_line(fangraphs_pitcher_id, season, ax_stat_line, start_date=start_date, end_date=end_date)
-        self.plot_short_form(df_player, ax_short_form)
-        self.plot_usage_pies(df_player, ax_usage_pies)
-        self.plot_pitch_table(df_player, ax_pitch_table)
-        self.plot_pitch_locations(df_player, ax_loc_left, 'L')
-        self.plot_pitch_locations(df_player, ax_loc_right, 'R')
+            self.plot_header(data.mlbam_id, ax_header, start_date=data.start_date, end_date=data.end_date, header=data.header)
+        self.plot_stat_line(None, season, ax_stat_line, stat_line=data.stat_line)
+        self.plot_short_form(data.movement, ax_short_form, data.groups)
+        self.plot_usage_pies(None, ax_usage_pies, groups=data.groups)
+        self.plot_pitch_table(None, ax_pitch_table, data.groups)
+        self.plot_pitch_locations(None, ax_loc_left, 'L', data.groups)
+        self.plot_pitch_locations(None, ax_loc_right, 'R', data.groups)
+
+        # add footer text
+        ax_footer.text(0.25, 0.5, 'Made by Anthony Ciardelli', ha='center', va='center', fontsize=10)
+        ax_footer.text(0.75, 0.5, 'Data from MLB and Fangraphs', ha='center', va='center', fontsize=10)
+
+        self.layout_figure(fig, layout)
+
+        return fig
+
+    def get_player_data(self, mlbam_pitcher_id: int, start_date: str, end_date: str):
+        """the processed pitches and their PitchGroups; for long ranges the pitches are streamed in chunks and the
+        frame is a uniform sample"""
+        if self.streams(start_date, end_date):
+            stream = PitchingStream()
+            for chunk in self.source.statcast_chunks('pitcher', mlbam_pitcher_id, start_date, end_date):
+                stream.add(self.process_df(chunk))
+            return stream.sample(), stream.groups()
+        df_player = self.process_df(self.source.statcast_pitcher(start_date, end_date, mlbam_pitcher_id))
+        return df_player, PitchGroups.from_frame(df_player)
+
+    def pitching_panels(self, pitcher_ids: Dict, start_date: str, end_date: str, season: int = None):
+        """yields (panel, png) for each panel of the pitching summary as soon as it is drawn; the panels draw from
+        pitching_data, so the full report built after them finds its data in the cache and only draws"""
+        header_span = {'season': season} if season is not None else {'start_date': start_date, 'end_date': end_date}
+        stat_season = season if season is not None else int(start_date[:4])
+
+        with ThreadPoolExecutor(max_workers=self.PANEL_WORKERS) as pool:
+            data = pool.submit(self.pitching_data, pitcher_ids, start_date, end_date, season)
+
+            def with_data(figsize, plot):
+                return lambda: self.draw_panel(figsize, lambda ax: plot(data.result(), ax))
+
+            panels = {
+                'header': with_data((8.5, 1.25), lambda d, ax: self.plot_header(d.mlbam_id, ax, header=d.header, **header_span)),
+                'stat_line': with_data((8.5, 0.5), lambda d, ax: self.plot_stat_line(None, stat_season, ax, stat_line=d.stat_line)),
+                'short_form': with_data((4.25, 3.2), lambda d, ax: self.plot_short_form(d.movement, ax, d.groups)),
+                'usage_pies': with_data((4.25, 3.2), lambda d, ax: self.plot_usage_pies(None, ax, groups=d.groups)),
+                'pitch_table': with_data((8.5, 3.3), lambda d, ax: self.plot_pitch_table(None, ax, d.groups)),
+                'loc_left': with_data((4.25, 2.5), lambda d, ax: self.plot_pitch_locations(None, ax, 'L', d.groups)),
+                'loc_right': with_data((4.25, 2.5), lambda d, ax: self.plot_pitch_locations(None, ax, 'R', d.groups)),
+            }
+            yield from self.stream_panels(pool, panels)
+
+    def construct_pitching_career(self, pitcher_ids: Dict, seasons):
+        """assembles a season-by-season report over several seasons; concurrent identical requests share one build"""
+        seasons = sorted(seasons)
+        key = ('pitching-career', int(pitcher_ids['mlbam_id']), seasons[0], seasons[-1])
+        fig, _ = self._inflight.do(key, self._construct_pitching_career, pitcher_ids, seasons)
+        return fig
+
+    def _construct_pitching_career(self, pitcher_ids: Dict, seasons: list):
+
+        mlbam_pitcher_id = pitcher_ids["mlbam_id"]
+        fangraphs_pitcher_id = pitcher_ids["fangraphs_id"]
+
+        season_groups = self.season_aggregates('pitcher', mlbam_pitcher_id, seasons, PitchGroups.from_frame)
+        df_seasons = self.get_fangraphs_seasons(self.get_fangraphs_pitching_stats, fangraphs_pitcher_id, seasons)
+
+        fig = plt.figure(figsize=(8.5, 11), dpi=300)
+        layout = ('pitching-career', len(seasons))
+
+        season_lines_height = 3 + 2 * len(seasons)
+        gs = gridspec.GridSpec(7, 4,
+                            height_ratios=[0.25, 12, season_lines_height, 20, 14, 3, 0.25],
+                            width_ratios=[0.25, 41.5, 41.5, 0.25],
+        )
+
+        # create margins along the side
+        ax_left = fig.add_subplot(gs[:, 0])
+        ax_right = fig.add_subplot(gs[:, -1])
+        ax_footer = fig.add_subplot(gs[5, 1:3])
+        for ax in [ax_left, ax_right, ax_footer]:
+            ax.axis('off')
+
+        ax_header = fig.add_subplot(gs[1, 1:3])
+        ax_season_lines = fig.add_subplot(gs[2, 1:3])
+        ax_usage = fig.add_subplot(gs[3, 1])
+        ax_velocity = fig.add_subplot(gs[3, 2])
+        ax_pitch_table = fig.add_subplot(gs[4, 1:3])
+
+        self.plot_header(mlbam_pitcher_id, ax_header, report_type='pitching', start_date=str(seasons[0]), end_date=str(seasons[-1]))
+        self.plot_pitching_season_lines(df_seasons, ax_season_lines)
+        if season_groups:
+            trends = self.get_pitch_trends(season_groups)
+            self.plot_pitch_trends(trends, ax_usage, 'pitch_usage', 'Usage % by Season')
+            self.plot_pitch_trends(trends, ax_velocity, 'release_speed', 'Velocity by Season')
+            self.plot_pitch_table(None, ax_pitch_table, PitchGroups.combine(list(season_groups.values())))
 
         # add footer text
         ax_footer.text(0.25, 0.5, 'Made by Anthony Ciardelli', ha='center', va='center', fontsize=10)
         ax_footer.text(0.75, 0.5, 'Data from MLB and Fangraphs', ha='center', va='center', fontsize=10)
 
-        fig.tight_layout()
+        self.layout_figure(fig, layout)
 
         return fig
 
+    def get_pitch_trends(self, season_groups: Dict[int, PitchGroups]):
+        """per pitch type averages and usage for every season, one row per (season, pitch_type)"""
+        trends = []
+        for season, groups in season_groups.items():
+            by_pitch = groups.by_pitch()
+            by_pitch['pitch_usage'] = by_pitch['pitch_count'] / by_pitch['pitch_count'].sum() * 100
+            trends.append(by_pitch.assign(season=season))
+        return pd.concat(trends, ignore_index=True)
+
+    def plot_pitching_season_lines(self, df_seasons: pd.DataFrame, ax: Axes):
+        """plots one fangraphs stat line per season"""
+        stats = ['IP', 'WHIP', 'ERA', 'FIP', 'K%', 'BB%', 'K-BB%']
+        format_specs = {
+            'IP' : '.0f',
+            'WHIP' : '.2f',
+            'ERA' : '.2f',
+            'FIP' : '.2f',
+            'K%' : '.1f',
+            'BB%' : '.1f',
+            'K-BB%' : '.1f',
+        }
+        df_seasons = df_seasons.reindex(columns=['Season'] + stats)
+        df_seasons[['K%', 'BB%', 'K-BB%']] *= 100
+        self.plot_season_lines(df_seasons, ax, stats, format_specs, self.FANGRAPHS_PITCHING_STATS,
+                               invert_colors=['WHIP', 'ERA', 'FIP', 'BB%'])
+
     def process_df(self, df: pd.DataFrame):
         """Process the dataframe for pitching metrics"""
         df = self.process_df_base(df)
@@ -85,8 +222,12 @@ class PitchingReport(Report):
 
         return df
 
-    def get_fangraphs_pitching_stats(self, fangraphs_pitcher_id: int, season: int, start_date: str = None, end_date: str = None):
-        """fetches fangraphs pitching stats and returns them as a df"""
+    def get_fangraphs_pitching_stats(self, fangraphs_pitcher_id: int, season: int, start_date: str = None, end_date: str = None,
+                                     bulk: bool = True):
+        """fetches fangraphs pitching stats and returns them as a df; whole seasons come from the shared season
+        leaderboard unless bulk is off"""
+        if not (start_date and end_date) and bulk:
+            return self.leaderboards.player('pit', season, fangraphs_pitcher_id)
         if start_date and end_date:
             url = (f"https://www.fangraphs.com/api/leaders/major-league/data?age=&pos=all&stats=pit&lg=all"
                    f"&season={season}&season1={season}&players={fangraphs_pitcher_id}&ind=0&qual=0&type=8"
@@ -95,14 +236,17 @@ class PitchingReport(Report):
             url = (f"https://www.fangraphs.com/api/leaders/major-league/data?age=&pos=all&stats=pit&lg=all"
                    f"&season={season}&season1={season}&players={fangraphs_pitcher_id}&ind=0&qual=0&type=8"
                    f"&month=0&pageitems=500000")
-        data = requests.get(url).json()
+        data = self.source.get_json(url)
         df = pd.DataFrame(data=data['data'])
         return df
 
-    def plot_stat_line(self, fangraphs_pitcher_id: int, season: int, ax: Axes, start_date: str = None, end_date: str = None):
-        """plots the statline pulled from fangraphs for the given date range"""
+    def plot_stat_line(self, fangraphs_pitcher_id: int, season: int, ax: Axes, start_date: str = None, end_date: str = None,
+                       stat_line: pd.DataFrame = None):
+        """plots the statline pulled from fangraphs for the given date range, or the stat_line already pulled"""
         stats = ['IP', 'WHIP', 'ERA', 'FIP', 'K%', 'BB%', 'K-BB%']
-        df_fangraphs_pitcher = self.get_fangraphs_pitching_stats(fangraphs_pitcher_id, season=season, start_date=start_date, end_date=end_date)
+        if stat_line is None:
+            stat_line = self.get_fangraphs_pitching_stats(fangraphs_pitcher_id, season=season, start_date=start_date, end_date=end_date)
+        df_fangraphs_pitcher = stat_line.copy()
 
         df_fangraphs_pitcher['K%'] *= 100
         df_fangraphs_pitcher['BB%'] *= 100
@@ -125,8 +269,8 @@ class PitchingReport(Report):
                 df_formatted[col] = df_formatted[col].apply(
                     lambda x: '—' if pd.isna(x) else f"{x:{fmt}}")
 
-        table_fg = ax.table(cellText=df_formatted[stats].values, colLabels=stats, cellLoc='center',
-                        bbox=[0.00, 0.0, 1, 1])
+        table_fg = cell_table(ax, cellText=df_formatted[stats].values, colLabels=stats, cellLoc='center',
+                             bbox=[0.00, 0.0, 1, 1])
 
         invert_colors = ['WHIP', 'ERA', 'FIP', 'BB%']
         for col_idx in range(len(format_specs)):
@@ -157,38 +301,53 @@ class PitchingReport(Report):
         
         ax.axis('off')
 
-    def plot_short_form(self, df: pd.DataFrame, ax: Axes):
-        """short form movement plot of the player's pitches'"""
+    def plot_short_form(self, df: pd.DataFrame, ax: Axes, groups: PitchGroups = None, marker='o', linestyle='--',
+                        side_labels=True, density: bool = None, filled: bool = True):
+        """short form movement plot of the player's pitches'; marker, linestyle and side_labels let several
+        players share one plot. past DENSITY_THRESHOLD pitches (or with density) each pitch type is drawn as a
+        density, outlined in linestyle unless filled"""
+        import seaborn as sns
         sns.set_style("whitegrid")
+        groups = groups or PitchGroups.from_frame(df)
 
-        handedness = df['p_throws'].iloc[0]
-        df['pfx_x'] *= -1
+        handedness = groups.handedness
 
         # get arm angles
-        df_angles = df.groupby(['pitch_type']).agg(
-            avg_x = ('release_pos_x', 'mean'),
-            avg_y = ('release_pos_z', 'mean')
-        )
-        
-        df_sorted = df.sort_values('game_date', ascending=True)
-
-        sns.scatterplot(
-            data=df_sorted,
-            x='pfx_x',
-            y='pfx_z',
-            hue='pitch_type',
-            palette={p: self.PITCH_COLORS[p]['color'] for p in df['pitch_type'].unique()},
-            linewidth=0.1,
-            ax=ax,
-            s=10
-        )
+        df_angles = groups.release_points()
+
+        if density is None:
+            density = len(df) > self.DENSITY_THRESHOLD
+        if density:
+            # most thrown first, so the smaller clouds stay on top
+            for pitch in df['pitch_type'].value_counts().index:
+                pitches = df[df['pitch_type'] == pitch]
+                self.plot_density(ax, -pitches['pfx_x'].to_numpy(), pitches['pfx_z'].to_numpy(),
+                                  self.PITCH_COLORS[pitch]['color'], (-27.5, 27.5, -27.5, 27.5), filled=filled,
+                                  linestyle=linestyle)
+        else:
+            # plot oldest to newest from the pitcher's perspective; the frame is shared, so derive the
+            # flipped and reordered values instead of changing its columns
+            order = np.argsort(df['game_date'].to_numpy(), kind='stable')
+            pitch_types = df['pitch_type'].to_numpy()[order]
+
+            sns.scatterplot(
+                x=-df['pfx_x'].to_numpy()[order],
+                y=df['pfx_z'].to_numpy()[order],
+                hue=pitch_types,
+                palette={p: self.PITCH_COLORS[p]['color'] for p in df['pitch_type'].unique()},
+                linewidth=0.1,
+                marker=marker,
+                ax=ax,
+                s=10
+            )
+            ax.get_legend().remove()
 
         for pitch in df['pitch_type'].unique():
             rel_x = df_angles.loc[pitch, 'avg_x']
             rel_y = df_angles.loc[pitch, 'avg_y']
 
             ax.plot([0, rel_x * -20], [0, rel_y * 20],color=self.PITCH_COLORS[pitch]['color'], 
-                        linestyle='--', 
+                        linestyle=linestyle, 
                         linewidth=2,
                         alpha=1,
                         zorder=3)
@@ -207,10 +366,10 @@ class PitchingReport(Report):
         left_patch = Rectangle((-27.5, 22.5), 15, 5, fill=False, color='black', linewidth=1)
         right_patch = Rectangle((12.5, 22.5), 15, 5, fill=False, color='black', linewidth=1)
 
-        if handedness == 'L':
+        if side_labels and handedness == 'L':
             ax.text(-20, 25, "<- Arm Side", ha='center', va='center', fontsize=8, clip_on=True)
             ax.text(20, 25, "Glove Side ->", ha='center', va='center', fontsize=8, clip_on=True)
-        else:
+        elif side_labels:
             ax.text(-20, 25, "<- Glove Side", ha='center', va='center', fontsize=8, clip_on=True)
             ax.text(20, 25, "Arm Side ->", ha='center', va='center', fontsize=8, clip_on=True)
 
@@ -218,34 +377,22 @@ class PitchingReport(Report):
         ax.add_patch(left_patch)
         ax.add_patch(right_patch)
 
-        ax.get_legend().remove()
-        
         ax.grid(True, alpha=0.3)
 
-    def find_usages(self, df):
+    def find_usages(self, df, groups: PitchGroups = None):
         """finds usage rates based on the count_state being ahead, even, or behind"""
-        df_usages = df.groupby(['pitch_type', 'stand', 'count_state']).agg(
-           pitch_ct = ('pitch_type', 'count')
-        ).reset_index()
-        
-        df_usages['usage_pct'] = df_usages.groupby(['stand', 'count_state'])['pitch_ct'].transform(
-            lambda x: x / x.sum() * 100
-        )
+        groups = groups or PitchGroups.from_frame(df)
+        return groups.usages()
         
-        # Round the percentage to 1 decimal place
-        df_usages['usage_pct'] = df_usages['usage_pct'].round(1)
-        
-        return df_usages
-        
-    def plot_usage_pies(self, df: pd.DataFrame, ax: Axes, fontsize=10):
+    def plot_usage_pies(self, df: pd.DataFrame, ax: Axes, fontsize=10, groups: PitchGroups = None):
         """plots usage rates for behind, even, and head against lhb and rbh"""    
-        df_usages = self.find_usages(df)
+        df_usages = self.find_usages(df, groups)
         
         gs = gridspec.GridSpecFromSubplotSpec(2, 3, subplot_spec=ax.get_subplotspec(), 
                                              wspace=0.4, hspace=0.6)
         
         positions = [(0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (1, 2)]
-        sub_axes = [plt.subplot(gs[pos]) for pos in positions]
+        sub_axes = [ax.figure.add_subplot(gs[pos]) for pos in positions]
         
         conditions_and_titles = [
             ((df_usages['stand'] == 'L') & (df_usages['count_state'] == 'Behind'), "Vs Left\nBehind"),
@@ -292,39 +439,43 @@ class PitchingReport(Report):
                 
             ax_sub.set_aspect('equal')
 
-        plt.tight_layout()
-        
         ax.axis('off')
 
-    def get_pitch_groupings(self, df: pd.DataFrame):
+    def get_pitch_groupings(self, df: pd.DataFrame, groups: PitchGroups = None):
         """gets metrics based the specific pitch to see how well that pitch plays"""
-        df_group = df.groupby(['pitch_type']).agg(
-            pitch_count = ('pitch_type', 'count'),
-            rel_speed = ('release_speed', 'mean'),
-            ivb = ('pfx_z', 'mean'),
-            hb = ('pfx_x', 'mean'),
-            spin_rate = ('release_spin_rate', 'mean'),
-            rel_side = ('release_pos_x', 'mean'),
-            rel_height = ('release_pos_z', 'mean'),
-            extension = ('release_extension', 'mean'),
-            whiff = ('whiff', 'sum'),
-            zone_whiff = ('zone_whiff', 'sum'),
-            swing = ('swing', 'sum'),
-            zone_swing = ('zone_swing', 'sum'),
-            in_zone = ('in_zone', 'sum'),
-            out_zone = ('out_zone', 'sum'),
-            chase = ('chase', 'sum'),
-            xwoba = ('estimated_woba_using_speedangle', 'mean')
-        ).reset_index()
+        groups = groups or PitchGroups.from_frame(df)
+        by_pitch = groups.by_pitch()
+
+        df_group = pd.DataFrame({
+            'pitch_type': by_pitch['pitch_type'],
+            'pitch_count': by_pitch['pitch_count'],
+            'rel_speed': by_pitch['release_speed'],
+            'ivb': by_pitch['pfx_z'],
+            # horizontal break is shown from the pitcher's perspective, same as the movement plot
+            'hb': -by_pitch['pfx_x'],
+            'spin_rate': by_pitch['release_spin_rate'],
+            'rel_side': by_pitch['release_pos_x'],
+            'rel_height': by_pitch['release_pos_z'],
+            'extension': by_pitch['release_extension'],
+            'whiff': by_pitch['whiff'],
+            'zone_whiff': by_pitch['zone_whiff'],
+            'swing': by_pitch['swing'],
+            'zone_swing': by_pitch['zone_swing'],
+            'in_zone': by_pitch['in_zone'],
+            'out_zone': by_pitch['out_zone'],
+            'chase': by_pitch['chase'],
+            'xwoba': by_pitch['estimated_woba_using_speedangle'],
+        })
 
         total_pitches = df_group['pitch_count'].sum()
         df_group['pitch_usage'] = df_group['pitch_count'] / total_pitches * 100 if total_pitches > 0 else np.nan
-        
-        # Other rate calculations with safe division
-        df_group['whiff_rate'] = df_group.apply(lambda x: (x['whiff'] / x['swing'] * 100) if x['swing'] > 0 else np.nan, axis=1)
-        df_group['zone_rate'] = df_group.apply(lambda x: (x['in_zone'] / x['pitch_count'] * 100) if x['pitch_count'] > 0 else np.nan, axis=1)
-        df_group['chase_rate'] = df_group.apply(lambda x: (x['chase'] / x['out_zone'] * 100) if x['out_zone'] > 0 else np.nan, axis=1)
-        df_group['zone_whiff_rate'] = df_group.apply(lambda x: (x['zone_whiff'] / x['zone_swing'] * 100) if x['zone_swing'] > 0 else np.nan, axis=1)
+
+        # other rate calculations with safe division
+        with np.errstate(invalid='ignore', divide='ignore'):
+            df_group['whiff_rate'] = np.where(df_group['swing'] > 0, df_group['whiff'] / df_group['swing'] * 100, np.nan)
+            df_group['zone_rate'] = np.where(df_group['pitch_count'] > 0, df_group['in_zone'] / df_group['pitch_count'] * 100, np.nan)
+            df_group['chase_rate'] = np.where(df_group['out_zone'] > 0, df_group['chase'] / df_group['out_zone'] * 100, np.nan)
+            df_group['zone_whiff_rate'] = np.where(df_group['zone_swing'] > 0, df_group['zone_whiff'] / df_group['zone_swing'] * 100, np.nan)
 
         format_specs = {
             'pitch_count': '.0f', 
@@ -356,9 +507,9 @@ class PitchingReport(Report):
         
         return df_formatted
 
-    def plot_pitch_table(self, df: pd.DataFrame, ax: Axes):
+    def plot_pitch_table(self, df: pd.DataFrame, ax: Axes, groups: PitchGroups = None):
         """plots a table of every unique pitch the player threw and how well it did compared to average"""
-        df = self.get_pitch_groupings(df)
+        df = self.get_pitch_groupings(df, groups)
 
         column_mapping = {
             'pitch_type': 'Pitch',
@@ -384,11 +535,11 @@ class PitchingReport(Report):
         colWidths = [1.5] + [1] * (len(display_df.columns) - 1)
         rowHeights = [0.75] + [1] * (len(display_df))
 
-        table_plot = ax.table(cellText=display_df.values,
-                             colLabels=display_df.columns,
-                             cellLoc='center', 
-                             bbox=[0, 0, 1, 1],
-                             colWidths=colWidths)
+        table_plot = cell_table(ax, cellText=display_df.values,
+                                colLabels=display_df.columns,
+                                cellLoc='center',
+                                bbox=[0, 0, 1, 1],
+                                colWidths=colWidths)
 
         for i in range(len(display_df) + 1):
             for j in range(len(display_df.columns)):
@@ -414,6 +565,8 @@ class PitchingReport(Report):
             "xwoba": 12
         }
 
+        # league baselines from the shared league dataset when one has been built, else config.pitch_type_stats
+        pitch_type_stats = league_pitch_type_stats()
         for row_idx in range(len(df['pitch_type'].unique())):
             # Get pitch type
             pitch_type_cell = table_plot[row_idx + 1, 0]
@@ -428,8 +581,8 @@ class PitchingReport(Report):
                 metric_float = float(metric_value)
 
                 if not np.isnan(metric_float):
-                    metric_mean = config.pitch_type_stats[(metric, 'mean')][pitch_type]
-                    metric_std = config.pitch_type_stats[(metric, 'std')][pitch_type] 
+                    metric_mean = pitch_type_stats[(metric, 'mean')][pitch_type]
+                    metric_std = pitch_type_stats[(metric, 'std')][pitch_type]
                     metric_z_score = (metric_float - metric_mean) / metric_std
                     if metric == 'xwoba':
                         metric_color = self.get_color(metric_z_score, invert=True)
@@ -448,27 +601,24 @@ class PitchingReport(Report):
         # Remove axis
         ax.axis('off')
 
-    def plot_pitch_locations(self, df: pd.DataFrame, ax: Axes, batter_hand='R'):
+    def plot_pitch_locations(self, df: pd.DataFrame, ax: Axes, batter_hand='R', groups: PitchGroups = None,
+                             linestyle='-'):
         """Plot pitch location zones with size-scaled circles for usage"""
+        import seaborn as sns
         sns.set_style("white")
+        groups = groups or PitchGroups.from_frame(df)
+
+        locations, total_pitches = groups.stand_locations(batter_hand)
         
-        plot_df = df[df['stand'] == batter_hand]
-        pitch_types = plot_df['pitch_type'].unique()
-        total_pitches = len(plot_df)
-        
-        for pitch in pitch_types:
-            pitch_data = plot_df[plot_df['pitch_type'] == pitch]
+        for loc in locations.itertuples():
+            pitch = loc.pitch_type
             
-            if len(pitch_data) < 5:
+            if loc.count < 5:
                 continue
             
-            # Calculate center (median location)
-            center_x = pitch_data['plate_x'].median()
-            center_z = pitch_data['plate_z'].median()
-            
-            # Calculate spread (IQR or std for the "zone" size)
-            std_x = pitch_data['plate_x'].std()
-            std_z = pitch_data['plate_z'].std()
+            # center (median location) and spread (std for the "zone" size)
+            center_x, center_z = loc.center_x, loc.center_z
+            std_x, std_z = loc.std_x, loc.std_z
             
             # Draw ellipse showing pitch location spread (1 std dev)
             ellipse = Ellipse(
@@ -478,13 +628,14 @@ class PitchingReport(Report):
                 fill=False,
                 edgecolor=self.PITCH_COLORS[pitch]['color'],
                 linewidth=2,
+                linestyle=linestyle,
                 alpha=0.8,
                 zorder=5
             )
             ax.add_patch(ellipse)
             
             # Calculate usage percentage for circle size
-            usage = len(pitch_data) / total_pitches
+            usage = loc.count / total_pitches
             
             # Scale circle radius based on usage (adjust multiplier as needed)
             min_radius = 0.1
@@ -499,6 +650,7 @@ class PitchingReport(Report):
                 facecolor=self.PITCH_COLORS[pitch]['color'],
                 edgecolor='black',
                 linewidth=1,
+                linestyle=linestyle,
                 alpha=0.7,
                 zorder=6
             )
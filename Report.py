@@ -6,8 +6,18 @@ import matplotlib.pyplot as plt
 from matplotlib.patches import Rectangle, Polygon
 import matplotlib.colors as mcolors
 from io import BytesIO
-import requests
+from datetime import date
+import pickle
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from matplotlib.figure import Figure
 import config
+from DataSource import DataSource
+from leaderboards import Leaderboards
+from people import People
+from artifacts import ArtifactStore, season_range
+from singleflight import SingleFlight
+from reportdata import ReportData
+from tables import CellTable, cell_table
 
 
 class Report():
@@ -23,79 +33,216 @@ class Report():
 
     COL_HEADING_COLOR = '#1a1a2e'
 
+    # report builds in flight across every report object, keyed by report type, player and date range
+    _inflight = SingleFlight()
+    # subplot params tight_layout settled on for each report layout, shared like _inflight (see layout_figure)
+    _layouts = {}
+
+    # career reports fetch this many seasons at once
+    SEASON_WORKERS = 4
+    # threads building the panels of a progressive report (see stream_panels)
+    PANEL_WORKERS = 8
+    # bump when the per-season aggregates change shape so stale cache entries are ignored
+    AGGREGATE_VERSION = 1
+    # scatter panels with more points than this draw densities instead (see plot_density)
+    DENSITY_THRESHOLD = 1500
+
+    def __init__(self, source: DataSource = None, aggregates: ArtifactStore = None):
+        self.source = source if source is not None else DataSource.from_config()
+        # per-season aggregates are cached next to the rendered reports, except for replayed data
+        if aggregates is None and self.source.store is not None:
+            aggregates = ArtifactStore.from_config()
+        self.aggregates = aggregates
+        self.leaderboards = Leaderboards(self.source)
+        self.people = People(self.source)
+
+    def streams(self, start_date: str, end_date: str):
+        """whether the range is long enough to be fetched and reduced in date chunks instead of as one frame"""
+        return (date.fromisoformat(end_date) - date.fromisoformat(start_date)).days > config.stream_after_days
+
+    def season_aggregates(self, player_type: str, player_id: int, seasons, reduce):
+        """{season: reduce(processed season frame)} for every season the player has pitches in, fetched in parallel;
+        a season already reduced is read back from the aggregate cache instead of being fetched again"""
+        def load(season):
+            start_date, end_date = season_range(season)
+            key = (f'{player_type}-aggregates-v{self.AGGREGATE_VERSION}', player_id, start_date, end_date, season)
+            if self.aggregates is not None:
+                cached = self.aggregates.get(key, 'pkl')
+                if cached is not None:
+                    return pickle.loads(cached)
+
+            df = self.source.statcast(player_type, player_id, start_date, end_date)
+            aggregate = reduce(self.process_df(df)) if not df.empty else None
+            if self.aggregates is not None:
+                self.aggregates.put(key, {'pkl': pickle.dumps(aggregate)})
+            return aggregate
+
+        with ThreadPoolExecutor(max_workers=self.SEASON_WORKERS) as pool:
+            aggregates = list(pool.map(load, seasons))
+        return {season: aggregate for season, aggregate in zip(seasons, aggregates) if aggregate is not None}
+
+    def report_data(self, key: tuple, compute, refresh: bool = False):
+        """the ReportData for a (report_type, mlbam_id, start_date, end_date, season) key: compute() on a miss,
+        stored in the aggregate cache under the data version so later draws (restyled or not) skip the fetching"""
+        key = (f'{key[0]}-data-v{ReportData.VERSION}',) + tuple(key[1:])
+        if self.aggregates is not None and not refresh:
+            cached = self.aggregates.get(key, 'pkl')
+            if cached is not None:
+                return pickle.loads(cached)
+
+        data = compute()
+        if self.aggregates is not None:
+            self.aggregates.put(key, {'pkl': pickle.dumps(data)})
+        return data
+
+    def get_fangraphs_seasons(self, get_stats, fangraphs_player_id: int, seasons):
+        """one fangraphs stat line per season, fetched in parallel, with a Season column; a season without a line
+        (injured, or in the minors) gets a row with only its Season so the table shows it blank"""
+        def load(season):
+            # one player's line per season: a players= request is far smaller than each season's whole leaderboard
+            df = get_stats(fangraphs_player_id, season=season, bulk=False)
+            return df.assign(Season=season) if not df.empty else pd.DataFrame({'Season': [season]})
+
+        with ThreadPoolExecutor(max_workers=self.SEASON_WORKERS) as pool:
+            return pd.concat(list(pool.map(load, seasons)), ignore_index=True)
+
+    def plot_season_lines(self, df_seasons: pd.DataFrame, ax: Axes, stats: list, format_specs: dict,
+                          league_stats: dict, invert_colors: list):
+        """one stat line per season, each cell colored against the league like the single season stat line"""
+        df_formatted = df_seasons.copy()
+        for col, fmt in format_specs.items():
+            if col in df_formatted.columns:
+                df_formatted[col] = df_formatted[col].apply(
+                    lambda x: '—' if pd.isna(x) else f"{x:{fmt}}")
+
+        columns = ['Season'] + stats
+        table = cell_table(ax, cellText=df_formatted[columns].astype(str).values, colLabels=columns, cellLoc='center',
+                              bbox=[0.00, 0.0, 1, 1])
+
+        for col_idx, stat in enumerate(columns):
+            if stat in league_stats:
+                z_scores = (df_seasons[stat] - league_stats[stat]['mean']) / league_stats[stat]['std']
+                for row_idx, z_score in enumerate(z_scores, 1):
+                    if pd.notna(z_score):
+                        table[row_idx, col_idx].set_facecolor(self.get_color(z_score, stat in invert_colors))
+
+            header_cell = table[0, col_idx]
+            header_cell.get_text().set_weight('bold')
+            header_cell.set_facecolor(self.COL_HEADING_COLOR)
+            header_cell.get_text().set_color('#FFF')
+            header_cell.set_edgecolor('none')
+
+        ax.axis('off')
+
+    def plot_pitch_trends(self, trends: pd.DataFrame, ax: Axes, column: str, title: str):
+        """one line per pitch type of a metric across seasons; trends has a row per (season, pitch_type)"""
+        for pitch, df_pitch in trends.groupby('pitch_type', sort=False):
+            color = self.PITCH_COLORS[pitch]['color'] if pitch in self.PITCH_COLORS else 'gray'
+            ax.plot(df_pitch['season'], df_pitch[column], marker='o', markersize=4, linewidth=2,
+                    color=color, label=pitch)
+
+        ax.set_xticks(sorted(trends['season'].unique()))
+        ax.tick_params(axis='x', labelsize=7, rotation=45)
+        ax.tick_params(axis='y', labelsize=7)
+        ax.set_title(title, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+        ax.legend(loc='upper left', fontsize=6, ncol=4)
+
+    def render(self, fig, format: str = 'png', dpi: int = None):
+        """renders the figure to bytes"""
+        buf = BytesIO()
+        fig.savefig(buf, format=format, dpi=dpi, bbox_inches='tight')
+        return buf.getvalue()
+
+    def layout_figure(self, fig, layout: tuple):
+        """lays out a report figure. the first figure of each layout (the report type plus whatever changes its
+        grid, like the stat line height) runs tight_layout, and the subplot params it settles on are applied
+        straight to every later figure of that layout, skipping tight_layout's measuring pass"""
+        params = self._layouts.get(layout)
+        if params is None:
+            fig.tight_layout()
+            params = {name: getattr(fig.subplotpars, name) for name in ['left', 'right', 'bottom', 'top', 'wspace', 'hspace']}
+            Report._layouts[layout] = params
+        else:
+            # tight_layout measured the tables at the unadjusted axes sizes and their fitted font sizes only
+            # shrink, so fit them there too before the axes move, or the report would come out different
+            renderer = fig.canvas.get_renderer()
+            for ax in fig.axes:
+                for table in ax.get_children():
+                    if isinstance(table, CellTable):
+                        table.get_window_extent(renderer)
+            fig.subplots_adjust(**params)
+
+    def draw_panel(self, figsize: tuple, draw, dpi: int = 150):
+        """draws one panel onto a figure of its own and renders it to png; the figure never touches pyplot,
+        so panels can be drawn from several threads at once"""
+        fig = Figure(figsize=figsize)
+        draw(fig.add_subplot())
+        return self.render(fig, format='png', dpi=dpi)
+
+    def stream_panels(self, pool: ThreadPoolExecutor, panels: dict):
+        """runs {panel: draw} on the pool and yields (panel, png) in the order they finish"""
+        futures = {pool.submit(draw): panel for panel, draw in panels.items()}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
     def process_df_base(self, df: pd.DataFrame):
-        """clean the dataframe and setup new metrics for use"""
+        """clean the dataframe and setup new metrics for use; the input frame is left untouched, and panels treat
+        the returned frame as read-only so one processed frame can be shared between panels, threads and requests"""
         swing_desc = ['foul_bunt','foul','hit_into_play','swinging_strike', 'foul_tip',
                     'swinging_strike_blocked','missed_bunt','bunt_foul_tip']
         whiff_desc = ['swinging_strike', 'foul_tip', 'swinging_strike_blocked']
 
-        df['swing'] = (df['description'].isin(swing_desc))
-        df['whiff'] = (df['description'].isin(whiff_desc))
-        df['in_zone'] = (df['zone'] < 10)
-        df['out_zone'] = (df['zone'] > 10)
-        df['chase'] = (df.in_zone==False) & (df.swing == 1)
-        df['zone_swing'] = (df['in_zone']) & (df['swing'])
-        df['zone_whiff'] = (df['in_zone']) & (df['whiff'])
-
-        # Convert the pitch type to a categorical variable
-        df['pfx_z'] = df['pfx_z'] * 12
-        df['pfx_x'] = df['pfx_x'] * 12
-        return df[df['pitch_type'].notna() & (df['pitch_type'] != 'PO')]
+        df = df[df['pitch_type'].notna() & (df['pitch_type'] != 'PO')]
+
+        swing = df['description'].isin(swing_desc)
+        whiff = df['description'].isin(whiff_desc)
+        in_zone = df['zone'] < 10
+        return df.assign(
+            swing = swing,
+            whiff = whiff,
+            in_zone = in_zone,
+            out_zone = df['zone'] > 10,
+            chase = (in_zone == False) & (swing == 1),
+            zone_swing = in_zone & swing,
+            zone_whiff = in_zone & whiff,
+            # movement in inches
+            pfx_z = df['pfx_z'] * 12,
+            pfx_x = df['pfx_x'] * 12,
+        )
 
     def get_headshot(self, mlbam_player_id: int):
         """gets player headshot from mlbstatic"""
         url = f'https://img.mlbstatic.com/mlb-photos/image/'\
               f'upload/d_people:generic:headshot:67:current.png'\
               f'/w_640,q_auto:best/v1/people/{mlbam_player_id}/headshot/silo/current.png'
-        
-        response = requests.get(url)
-        
-        img = Image.open(BytesIO(response.content))
 
-        return img
+        return self.source.get_image(url)
 
     def get_bio(self, mlbam_player_id: int):
-        """gets player information from mlb stats api"""
-        url = f"https://statsapi.mlb.com/api/v1/people?personIds={mlbam_player_id}&hydrate=currentTeam"
-
-        data = requests.get(url).json()
-
-        player_name = data['people'][0]['fullName']
-        pitcher_hand = data['people'][0]['pitchHand']['code']
-        bat_side = data['people'][0]['batSide']['code']
-        age = data['people'][0]['currentAge']
-        height = data['people'][0]['height']
-        weight = data['people'][0]['weight']
-        team_link = data['people'][0]['currentTeam']['link']
-
-        return {
-            "player_name" : player_name,
-            "pitcher_hand" : pitcher_hand,
-            "bat_side" : bat_side,
-            "age" : age,
-            "height" : height,
-            "weight" : weight,
-            "team_link": team_link
-        }
+        """gets player information from mlb stats api, through the shared bio cache (see people.py)"""
+        return dict(self.people.bio(mlbam_player_id))
 
     def get_team_info(self, team_link: str):
-        """gets the logo image and team abbreviation for the team the player plays for"""
-        url_team = 'https://statsapi.mlb.com/' + team_link
-        data_team = requests.get(url_team).json()
-
-        team_abb = data_team['teams'][0]['abbreviation']
-        logo_url = self.MLB_TEAMS[team_abb]
-        response = requests.get(logo_url)
-
-        img = Image.open(BytesIO(response.content))
+        """gets the logo image and team abbreviation for the team the player plays for; the logo is None for a
+        player without a team (or one whose team has no logo)"""
+        team_abb = self.people.team_abbreviation(team_link)
+        logo_url = self.MLB_TEAMS.get(team_abb)
+        img = self.source.get_image(logo_url) if logo_url is not None else None
 
         return img, team_abb
 
-    def plot_header(self, mlbam_player_id: int, ax: Axes, report_type: str = 'pitching', season: int = None, start_date: str = None, end_date: str = None):
-        """constructs the header to be plotted"""
+    def get_header(self, mlbam_player_id: int):
+        """everything the header draws: {'bio', 'team_abb', 'headshot', 'logo'}"""
         bio = self.get_bio(mlbam_player_id)
-        headshot = self.get_headshot(mlbam_player_id)
         logo, team_abb = self.get_team_info(bio['team_link'])
+        return {'bio': bio, 'team_abb': team_abb, 'headshot': self.get_headshot(mlbam_player_id), 'logo': logo}
+
+    def plot_header(self, mlbam_player_id: int, ax: Axes, report_type: str = 'pitching', season: int = None, start_date: str = None, end_date: str = None,
+                    header: dict = None):
+        """constructs the header to be plotted; header is get_header's result, fetched here when not passed in"""
+        header = header or self.get_header(mlbam_player_id)
+        bio, headshot, logo, team_abb = header['bio'], header['headshot'], header['logo'], header['team_abb']
 
         team_colors = self.MLB_TEAM_COLORS.get(team_abb, {"primary": self.COL_HEADING_COLOR, "accent": "#4fc3f7"})
         primary_color = team_colors["primary"]
@@ -113,11 +260,12 @@ class Report():
         ax_headshot.imshow(headshot_outlined)
         ax_headshot.axis('off')
 
-        logo_outlined = self.add_outline(logo, outline_width=4)
-        logo_x = 1 - img_width - margin
-        ax_logo = ax.inset_axes([logo_x, 0.05, img_width, img_height])
-        ax_logo.imshow(logo_outlined)
-        ax_logo.axis('off')
+        if logo is not None:
+            logo_outlined = self.add_outline(logo, outline_width=4)
+            logo_x = 1 - img_width - margin
+            ax_logo = ax.inset_axes([logo_x, 0.05, img_width, img_height])
+            ax_logo.imshow(logo_outlined)
+            ax_logo.axis('off')
 
         # player name - bold and white for contrast
         ax.text(0.5, 0.95, bio["player_name"],
@@ -189,21 +337,46 @@ class Report():
         ax.set_aspect('equal')
         ax.axis('off')
 
-    def fix_labels(self, mylabels, tooclose=0.1, sepfactor=2):
-        """helper function used to fix the labels in plot_usage_pies whenever they get too close and overlap"""
-        vecs = np.zeros((len(mylabels), len(mylabels), 2))
-        dists = np.zeros((len(mylabels), len(mylabels)))
-        for i in range(0, len(mylabels)-1):
-            for j in range(i+1, len(mylabels)):
-                a = np.array(mylabels[i].get_position())
-                b = np.array(mylabels[j].get_position())
-                dists[i,j] = np.linalg.norm(a-b)
-                vecs[i,j,:] = a-b
-                if dists[i,j] < tooclose:
-                    mylabels[i].set_x(a[0] + sepfactor*vecs[i,j,0])
-                    mylabels[i].set_y(a[1] + sepfactor*vecs[i,j,1])
-                    mylabels[j].set_x(b[0] - sepfactor*vecs[i,j,0])
-                    mylabels[j].set_y(b[1] - sepfactor*vecs[i,j,1])
+    def fix_labels(self, mylabels, tooclose=0.1, sepfactor=2, max_iter=50):
+        """helper function used to fix the labels in plot_usage_pies whenever they get too close and overlap.
+        every pair closer than tooclose moves apart along the line between them, sepfactor times their offset
+        each way, all pairs at once; passes repeat until no pair is too close, or for at most max_iter passes"""
+        pos = np.array([label.get_position() for label in mylabels], dtype=float).reshape(-1, 2)
+        pairs = np.triu(np.ones((len(pos), len(pos)), dtype=bool), k=1)
+        for _ in range(max_iter):
+            vecs = pos[:, None, :] - pos[None, :, :]
+            dists = np.linalg.norm(vecs, axis=-1)
+            close = pairs & (dists < tooclose)
+            if not close.any():
+                break
+            # labels stacked on the same spot have no line between them, start them off side by side
+            vecs[close & (dists == 0)] = [tooclose / 100, 0]
+            push = np.where(close[..., None], sepfactor * vecs, 0)
+            pos += push.sum(axis=1) - push.sum(axis=0)
+
+        for label, xy in zip(mylabels, pos):
+            label.set_position(xy)
+
+    def plot_density(self, ax: Axes, x, y, color, extent: tuple, bins: int = 50, smooth: float = 1.5,
+                     filled: bool = True, linestyle='-', zorder: int = 2):
+        """draws where the points are dense instead of every point: a 2D histogram over extent (xmin, xmax, ymin,
+        ymax), smoothed by `smooth` bins, as contours at fixed fractions of its peak. filled shades the bands in
+        color, otherwise they are outlined in linestyle so several players can share the axes. the cost and the
+        size of the drawing follow the bins, not the number of points"""
+        from scipy.ndimage import gaussian_filter
+        counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins, range=[extent[:2], extent[2:]])
+        density = gaussian_filter(counts, sigma=smooth)
+        peak = density.max()
+        if peak == 0:
+            return
+        x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+        y_centers = (y_edges[:-1] + y_edges[1:]) / 2
+        levels = [0.1 * peak, 0.35 * peak, 0.65 * peak]
+        if filled:
+            ax.contourf(x_centers, y_centers, density.T, levels=levels + [np.inf], zorder=zorder,
+                        colors=[mcolors.to_rgba(color, alpha) for alpha in (0.25, 0.5, 0.8)])
+        ax.contour(x_centers, y_centers, density.T, levels=levels, colors=[color], linewidths=0.6,
+                   linestyles='solid' if filled else linestyle, zorder=zorder)
 
     _CUSTOM_CMAP = mcolors.LinearSegmentedColormap.from_list(
         'blue_white_red', ['#4a86c8', '#ffffff', '#cc4444'])
@@ -1,15 +1,23 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
 from datetime import date
-from PitchingReport import PitchingReport
-from BattingReport import BattingReport
-from helpers import get_pitcher_names, get_batter_names
-import io
-from matplotlib.backends.backend_pdf import PdfPages
+from helpers import get_pitcher_names, get_batter_names, render_report, stored_report, show_panels, log_request
 
-pr = PitchingReport()
-br = BattingReport()
+# the report modules pull in matplotlib, seaborn, scipy and pybaseball, so they're only
+# imported once a report of that type is actually requested
+@st.cache_resource
+def get_pitching_report():
+    from PitchingReport import PitchingReport
+    return PitchingReport()
+
+@st.cache_resource
+def get_batting_report():
+    from BattingReport import BattingReport
+    return BattingReport()
+
+@st.cache_resource
+def get_comparison_report():
+    from ComparisonReport import ComparisonReport
+    return ComparisonReport()
 
 st.title('MLB Reports')
 
@@ -21,13 +29,19 @@ report_type = st.selectbox(
 )
 
 if report_type is not None:
-    date_mode = st.radio("Date Range", ["Season", "Custom"], horizontal=True)
+    date_mode = st.radio("Date Range", ["Season", "Custom", "Career"], horizontal=True)
 
     if date_mode == "Season":
         season = st.selectbox("Season", list(range(2025, 2014, -1)), index=0)
         start_date = None
         end_date = None
         player_season = season
+    elif date_mode == "Career":
+        first_season, last_season = st.select_slider("Seasons", options=list(range(2015, 2026)), value=(2021, 2025))
+        start_date = None
+        end_date = None
+        season = None
+        player_season = last_season
     else:
         col1, col2 = st.columns(2)
         with col1:
@@ -37,24 +51,64 @@ if report_type is not None:
         season = None
         player_season = start_date.year
 
+    # comparisons cover a season or a custom range, not careers
+    compare = st.toggle("Compare players", disabled=date_mode == "Career") and date_mode != "Career"
+    # single player season and custom reports can be shown panel by panel while the full report is built
+    progressive = st.toggle("Show panels as they finish", value=True,
+                            disabled=compare or date_mode == "Career") and not compare and date_mode != "Career"
+
 if report_type == 'Pitching':
     df_pitcher_names = get_pitcher_names(season=player_season)
 
-    player_name = st.selectbox(
-        "Players",
-        (df_pitcher_names['PlayerName']),
-        index=None,
-        placeholder="Select a player",
-    )
+    if compare:
+        player_names = st.multiselect("Players", (df_pitcher_names['PlayerName']), max_selections=4,
+                                      placeholder="Select 2 to 4 players")
+        player_name = None
+    else:
+        player_name = st.selectbox(
+            "Players",
+            (df_pitcher_names['PlayerName']),
+            index=None,
+            placeholder="Select a player",
+        )
 
 if report_type == 'Batting':
     df_batter_names = get_batter_names(season=player_season)
 
-    player_name = st.selectbox(
-        "Players",
-        (df_batter_names['PlayerName']),
-        index=None,
-        placeholder="Select a player",
+    if compare:
+        player_names = st.multiselect("Players", (df_batter_names['PlayerName']), max_selections=4,
+                                      placeholder="Select 2 to 4 players")
+        player_name = None
+    else:
+        player_name = st.selectbox(
+            "Players",
+            (df_batter_names['PlayerName']),
+            index=None,
+            placeholder="Select a player",
+        )
+
+if report_type is not None and compare and len(player_names) >= 2:
+    df_names = df_pitcher_names if report_type == 'Pitching' else df_batter_names
+    kind = report_type.lower()
+
+    players = []
+    for name in player_names:
+        row = df_names[df_names['PlayerName'] == name]
+        players.append({"mlbam_id": row['xMLBAMID'].values[0], "fangraphs_id": row['playerid'].values[0]})
+
+    with st.spinner(f"Generating {kind} comparison..."):
+        cr = get_comparison_report()
+        if date_mode == "Season":
+            png, pdf = render_report(cr, f'{kind}-comparison', players, f'{season}-03-01', f'{season}-11-01', season=season)
+        else:
+            png, pdf = render_report(cr, f'{kind}-comparison', players, str(start_date), str(end_date))
+    st.image(png, width="stretch")
+
+    st.download_button(
+        label="Download Report (PDF)",
+        data=pdf,
+        file_name=f"{kind}_comparison.pdf",
+        mime="application/pdf"
     )
 
 if report_type == 'Pitching' and player_name:
@@ -66,23 +120,30 @@ if report_type == 'Pitching' and player_name:
         "fangraphs_id": fangraphs_player_id
     }
 
-    with st.spinner("Generating pitching report..."):
-        if date_mode == "Season":
-            fig = pr.construct_pitching_summary(player_ids, start_date=f'{season}-03-01', end_date=f'{season}-11-01', season=season)
-        else:
-            fig = pr.construct_pitching_summary(player_ids, start_date=str(start_date), end_date=str(end_date))
-    st.pyplot(fig)
+    log_request('pitching', player_ids, season)
 
-    # create pdf
-    pdf_buffer = io.BytesIO()
-    with PdfPages(pdf_buffer) as pdf:
-            pdf.savefig(fig, bbox_inches="tight")
-    pdf_buffer.seek(0)
+    pr = get_pitching_report()
+    if date_mode == "Season":
+        span = (f'{season}-03-01', f'{season}-11-01', season)
+    else:
+        span = (str(start_date), str(end_date), None)
+
+    # a stored report shows at once; otherwise the panels stream in while the full report is built for download
+    panels_shown = progressive and stored_report('pitching', player_ids, *span) is None
+    if panels_shown:
+        show_panels(pr.pitching_panels(player_ids, *span), pr.PANEL_ROWS)
 
+    with st.spinner("Preparing the PDF..." if panels_shown else "Generating pitching report..."):
+        if date_mode == "Career":
+            png, pdf = render_report(pr, 'pitching-career', player_ids, f'{first_season}-03-01', f'{last_season}-11-01')
+        else:
+            png, pdf = render_report(pr, 'pitching', player_ids, *span)
+    if not panels_shown:
+        st.image(png, width="stretch")
 
     st.download_button(
         label="Download Report (PDF)",
-        data=pdf_buffer,
+        data=pdf,
         file_name=f"pitching_report.pdf",
         mime="application/pdf"
     )
@@ -97,23 +158,30 @@ if report_type == 'Batting' and player_name:
         "fangraphs_id": fangraphs_player_id
     }
 
-    with st.spinner("Generating batting report..."):
-        if date_mode == "Season":
-            fig = br.construct_batting_summary(player_ids, start_date=f'{season}-03-01', end_date=f'{season}-11-01', season=season)
-        else:
-            fig = br.construct_batting_summary(player_ids, start_date=str(start_date), end_date=str(end_date))
-    st.pyplot(fig)
+    log_request('batting', player_ids, season)
+
+    br = get_batting_report()
+    if date_mode == "Season":
+        span = (f'{season}-03-01', f'{season}-11-01', season)
+    else:
+        span = (str(start_date), str(end_date), None)
 
-    # create pdf
-    pdf_buffer = io.BytesIO()
-    with PdfPages(pdf_buffer) as pdf:
-            pdf.savefig(fig, bbox_inches="tight")
-    pdf_buffer.seek(0)
+    # a stored report shows at once; otherwise the panels stream in while the full report is built for download
+    panels_shown = progressive and stored_report('batting', player_ids, *span) is None
+    if panels_shown:
+        show_panels(br.batting_panels(player_ids, *span), br.PANEL_ROWS)
 
+    with st.spinner("Preparing the PDF..." if panels_shown else "Generating batting report..."):
+        if date_mode == "Career":
+            png, pdf = render_report(br, 'batting-career', player_ids, f'{first_season}-03-01', f'{last_season}-11-01')
+        else:
+            png, pdf = render_report(br, 'batting', player_ids, *span)
+    if not panels_shown:
+        st.image(png, width="stretch")
 
     st.download_button(
         label="Download Report (PDF)",
-        data=pdf_buffer,
+        data=pdf,
         file_name=f"batting_report.pdf",
         mime="application/pdf"
     )
@@ -0,0 +1,117 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+import config
+
+
+class ArtifactStore():
+    """rendered reports on disk, keyed by report type, player (or players) and date range"""
+
+    def __init__(self, root: str, ttl_hours: float = 24):
+        self.root = root
+        self.ttl_hours = ttl_hours
+
+    @classmethod
+    def from_config(cls):
+        return cls(os.path.join(config.cache_dir, 'artifacts'), ttl_hours=config.artifact_ttl_hours)
+
+    def _path(self, key: tuple, ext: str):
+        report_type, mlbam_id, start_date, end_date, season = key
+        name = f'{start_date}_{end_date}' if season is None else f'{start_date}_{end_date}_season{season}'
+        return os.path.join(self.root, report_type, player_key(mlbam_id), f'{name}.{ext}')
+
+    def is_fresh(self, meta: dict):
+        """reports whose range ended before they were rendered never change, anything else expires after ttl_hours"""
+        if meta['end_date'] < meta['created'][:10]:
+            return True
+        age = datetime.now() - datetime.fromisoformat(meta['created'])
+        return age.total_seconds() < self.ttl_hours * 3600
+
+    def get(self, key: tuple, format: str = 'png'):
+        """returns the stored bytes for a (report_type, mlbam_id, start_date, end_date, season) key,
+        or None if nothing fresh has been stored"""
+        try:
+            with open(self._path(key, 'json')) as f:
+                meta = json.load(f)
+            if not self.is_fresh(meta):
+                return None
+            with open(self._path(key, format), 'rb') as f:
+                return f.read()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, key: tuple, artifacts: dict):
+        """stores {format: bytes}; each file is written to a temp name and renamed so readers never see partial files"""
+        report_type, mlbam_id, start_date, end_date, season = key
+        os.makedirs(os.path.dirname(self._path(key, 'json')), exist_ok=True)
+        for fmt, data in artifacts.items():
+            self._write(self._path(key, fmt), data)
+        meta = {'report_type': report_type, 'mlbam_id': player_key(mlbam_id), 'start_date': start_date, 'end_date': end_date,
+                'season': season, 'formats': list(artifacts), 'created': datetime.now().isoformat()}
+        # the metadata goes last, so a report only becomes visible once all its files are in place
+        self._write(self._path(key, 'json'), json.dumps(meta).encode())
+
+    def _write(self, path: str, data: bytes):
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+
+class RequestLog():
+    """counts report requests per player so the prefetcher knows who to warm first"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._execute('CREATE TABLE IF NOT EXISTS requests ('
+                      'ts REAL, report_type TEXT, mlbam_id INTEGER, fangraphs_id TEXT, season INTEGER)')
+        self._execute('CREATE INDEX IF NOT EXISTS requests_ts ON requests (ts)')
+
+    @classmethod
+    def from_config(cls):
+        return cls(os.path.join(config.cache_dir, 'requests.db'))
+
+    def _execute(self, sql: str, params=()):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def record(self, report_type: str, player_ids: dict, season: int = None):
+        # fangraphs ids are stored as text like Leaderboards.id_key, since players without an mlb id have ones like
+        # 'sa3012345'. logs created with an INTEGER column still take them: sqlite keeps text it can't convert
+        fangraphs_id = player_ids['fangraphs_id']
+        if isinstance(fangraphs_id, float) and fangraphs_id.is_integer():
+            fangraphs_id = int(fangraphs_id)
+        self._execute('INSERT INTO requests VALUES (?, ?, ?, ?, ?)',
+                      (time.time(), report_type, int(player_ids['mlbam_id']), str(fangraphs_id), season))
+
+    def top(self, report_type: str, n: int, days: int = 14):
+        """the n most requested players over the last `days` days as [(mlbam_id, fangraphs_id, count)]"""
+        since = time.time() - days * 86400
+        return self._execute('SELECT mlbam_id, fangraphs_id, COUNT(*) AS n FROM requests '
+                             'WHERE report_type = ? AND ts >= ? GROUP BY mlbam_id, fangraphs_id '
+                             'ORDER BY n DESC LIMIT ?', (report_type, since, n))
+
+
+def player_key(mlbam_id):
+    """the id as a string; comparison reports are keyed by a tuple of ids, joined with dashes"""
+    if isinstance(mlbam_id, (tuple, list)):
+        return '-'.join(str(int(i)) for i in mlbam_id)
+    return str(int(mlbam_id))
+
+
+def season_range(season: int):
+    """the date range the app uses for season reports"""
+    return f'{season}-03-01', f'{season}-11-01'
+
+
+def current_season():
+    today = date.today()
+    return today.year if today.month >= 3 else today.year - 1
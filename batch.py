@@ -0,0 +1,256 @@
+"""league-wide batch rendering spread over any number of machines
+
+a coordinator fills a job queue, a sqlite file on storage every node can reach, with one job per
+(report type, player, date range). workers on any node claim jobs under a lease, render them with the usual
+builders and write the results to the artifact store. point MLB_REPORTS_CACHE_DIR at the same shared
+storage on every node so they all read and write one store. a worker renews its lease while it renders. a job
+whose lease runs out (the worker died or the node went away) is handed to the next worker that asks, and a
+failed render is retried until it has been attempted --max-attempts times.
+
+usage:
+    python batch.py enqueue --season 2025                  # every pitcher and batter on the season leaderboards
+    python batch.py ingest --season 2025                   # optional: every game day's statcast once, league-wide
+    python batch.py work --processes 8                     # on each node; exits once the queue is drained
+    python batch.py status
+
+after a style change, `enqueue --requeue` and `work --redraw` redraw every report from its cached data without
+fetching anything.
+"""
+import argparse
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import config
+from artifacts import current_season, season_range
+
+
+class JobQueue():
+    """sqlite-backed queue of render jobs with leases and retries"""
+
+    def __init__(self, path: str, max_attempts: int = 3):
+        self.path = path
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # the default rollback journal rather than WAL: WAL needs shared memory, which network filesystems lack
+        self._execute('CREATE TABLE IF NOT EXISTS jobs ('
+                      'id INTEGER PRIMARY KEY, report_type TEXT, mlbam_id INTEGER, fangraphs_id INTEGER, '
+                      'start_date TEXT, end_date TEXT, season INTEGER, state TEXT, attempts INTEGER DEFAULT 0, '
+                      'worker TEXT, lease_expires REAL, error TEXT, '
+                      'UNIQUE (report_type, mlbam_id, start_date, end_date, season))')
+        self._execute('CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, lease_expires)')
+
+    @classmethod
+    def from_config(cls, max_attempts: int = 3):
+        return cls(os.path.join(config.cache_dir, 'jobs.db'), max_attempts)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=60, isolation_level=None)
+
+    def _execute(self, sql: str, params=()):
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            rows = conn.execute(sql, params).fetchall()
+            conn.execute('COMMIT')
+            return rows
+        finally:
+            conn.close()
+
+    def enqueue(self, jobs, requeue: bool = False):
+        """adds (report_type, mlbam_id, fangraphs_id, start_date, end_date, season) jobs; ones already queued are
+        left alone unless requeue, which resets them to pending. returns how many were added or reset"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            verb = 'INSERT OR REPLACE' if requeue else 'INSERT OR IGNORE'
+            count = conn.executemany(f"{verb} INTO jobs (report_type, mlbam_id, fangraphs_id, start_date, end_date, "
+                                     f"season, state) VALUES (?, ?, ?, ?, ?, ?, 'pending')", list(jobs)).rowcount
+            conn.execute('COMMIT')
+            return count
+        finally:
+            conn.close()
+
+    def claim(self, worker: str, lease_seconds: float):
+        """leases the oldest pending or expired job to worker; None when there is nothing to claim"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            # one write transaction at a time, so two workers can never lease the same job
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute("UPDATE jobs SET state = 'failed', worker = NULL, error = COALESCE(error, 'lease expired') "
+                         "WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?", (now, self.max_attempts))
+            row = conn.execute("SELECT id, report_type, mlbam_id, fangraphs_id, start_date, end_date, season FROM jobs "
+                               "WHERE state = 'pending' OR (state = 'leased' AND lease_expires < ?) "
+                               "ORDER BY id LIMIT 1", (now,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE jobs SET state = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1 "
+                             "WHERE id = ?", (worker, now + lease_seconds, row[0]))
+            conn.execute('COMMIT')
+            return row
+        finally:
+            conn.close()
+
+    def renew(self, job_id: int, worker: str, lease_seconds: float):
+        """extends the lease; False once the job is no longer this worker's"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            updated = conn.execute("UPDATE jobs SET lease_expires = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+                                   (time.time() + lease_seconds, job_id, worker)).rowcount
+            conn.execute('COMMIT')
+            return updated == 1
+        finally:
+            conn.close()
+
+    def complete(self, job_id: int, worker: str):
+        self._execute("UPDATE jobs SET state = 'done', worker = NULL, error = NULL WHERE id = ? AND worker = ?",
+                      (job_id, worker))
+
+    def fail(self, job_id: int, worker: str, error: str):
+        """puts the job back for another attempt, or marks it failed once it is out of attempts"""
+        self._execute("UPDATE jobs SET state = CASE WHEN attempts < ? THEN 'pending' ELSE 'failed' END, "
+                      "worker = NULL, error = ? WHERE id = ? AND worker = ?", (self.max_attempts, error, job_id, worker))
+
+    def counts(self):
+        """{state: jobs}"""
+        return dict(self._execute('SELECT state, COUNT(*) FROM jobs GROUP BY state'))
+
+    def pending_players(self):
+        """mlbam ids of every player with a job waiting"""
+        return [row[0] for row in self._execute("SELECT DISTINCT mlbam_id FROM jobs WHERE state = 'pending'")]
+
+    def failures(self, n: int = 20):
+        return self._execute("SELECT report_type, mlbam_id, attempts, error FROM jobs WHERE state = 'failed' "
+                             "ORDER BY id LIMIT ?", (n,))
+
+
+class Lease():
+    """renews a job's lease on a background thread while the job renders"""
+
+    def __init__(self, queue: JobQueue, job_id: int, worker: str, lease_seconds: float):
+        self.queue = queue
+        self.job_id = job_id
+        self.worker = worker
+        self.lease_seconds = lease_seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._renew, daemon=True)
+
+    def _renew(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            if not self.queue.renew(self.job_id, self.worker, self.lease_seconds):
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def league_jobs(season: int, report_types=('pitching', 'batting')):
+    """a season report job for everyone on the season leaderboards"""
+    from prefetch import leaderboard
+    start_date, end_date = season_range(season)
+    for report_type in report_types:
+        for mlbam_id, fangraphs_id, _ in leaderboard(report_type, season):
+            yield report_type, mlbam_id, fangraphs_id, start_date, end_date, season
+
+
+def work(queue_path: str, lease_seconds: float = 300, max_attempts: int = 3, wait: bool = False, poll_seconds: float = 10,
+         redraw: bool = False):
+    """claims and renders jobs until the queue has nothing left to claim (or forever with wait); redraw draws the
+    reports again from their cached data instead of fetching it. returns (rendered, failed)"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import rendering
+    from people import People
+    # interactive requests to the rate limited apis go ahead of the batch's
+    rendering.source.priority = 'batch'
+
+    queue = JobQueue(queue_path, max_attempts)
+    worker = f'{socket.gethostname()}:{os.getpid()}'
+    # the bios of everyone queued in a few multi-player requests, instead of one request per report. this only
+    # warms the cache: if it fails, each job fetches its own bio and a bad one fails just that job
+    try:
+        People(rendering.source).bios(queue.pending_players())
+    except Exception:
+        print(f'[{worker}] warming the bio cache failed, bios will be fetched per job')
+        traceback.print_exc()
+    rendered = failed = 0
+    while True:
+        job = queue.claim(worker, lease_seconds)
+        if job is None:
+            # leased jobs may still come back if their worker dies, so only stop once none are out
+            if not wait and not queue.counts().get('leased'):
+                return rendered, failed
+            time.sleep(poll_seconds)
+            continue
+
+        job_id, report_type, mlbam_id, fangraphs_id, start_date, end_date, season = job
+        t0 = time.perf_counter()
+        try:
+            with Lease(queue, job_id, worker, lease_seconds):
+                rendering.render_job(report_type, {'mlbam_id': mlbam_id, 'fangraphs_id': fangraphs_id},
+                                     start_date, end_date, season, refresh=not redraw, redraw=redraw)
+            queue.complete(job_id, worker)
+            rendered += 1
+            print(f'[{worker}] {report_type} {mlbam_id} rendered in {time.perf_counter() - t0:.1f}s')
+        except Exception as e:
+            queue.fail(job_id, worker, f'{type(e).__name__}: {e}')
+            failed += 1
+            print(f'[{worker}] {report_type} {mlbam_id} failed')
+            traceback.print_exc()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='render reports for a whole league across machines')
+    parser.add_argument('--queue', default=os.path.join(config.cache_dir, 'jobs.db'), help='path to the shared job queue')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue = commands.add_parser('enqueue', help='queue a season report for every leaderboard player')
+    enqueue.add_argument('--season', type=int)
+    enqueue.add_argument('--report', choices=['pitching', 'batting'], action='append')
+    enqueue.add_argument('--requeue', action='store_true', help='reset jobs that are already queued or done')
+
+    worker = commands.add_parser('work', help='claim and render jobs')
+    worker.add_argument('--processes', type=int, default=os.cpu_count())
+    worker.add_argument('--lease-seconds', type=float, default=300)
+    worker.add_argument('--max-attempts', type=int, default=3)
+    worker.add_argument('--wait', action='store_true', help='keep polling for new jobs instead of exiting when drained')
+    worker.add_argument('--redraw', action='store_true', help='draw from the cached report data, e.g. after a style change')
+
+    ingest = commands.add_parser('ingest', help="pull the season's statcast once per game day into the pitch store, "
+                                                "so workers read every player's pitches from it")
+    ingest.add_argument('--season', type=int)
+    ingest.add_argument('--workers', type=int, default=4, help='days pulled at a time')
+
+    commands.add_parser('status', help='jobs per state and the latest failures')
+    args = parser.parse_args()
+
+    if args.command == 'enqueue':
+        season = args.season or current_season()
+        added = JobQueue(args.queue).enqueue(league_jobs(season, args.report or ['pitching', 'batting']), args.requeue)
+        print(f'queued {added} jobs for {season}')
+    elif args.command == 'ingest':
+        from DataSource import DataSource
+        season = args.season or current_season()
+        pulled = DataSource.from_config().ingest_league(f'{season}-01-01', f'{season}-12-31', args.workers)
+        print(f'ingested {sum(pulled.values())} pitches over {len(pulled)} days of {season}')
+    elif args.command == 'work':
+        with ProcessPoolExecutor(max_workers=args.processes) as pool:
+            runs = [pool.submit(work, args.queue, args.lease_seconds, args.max_attempts, args.wait, redraw=args.redraw)
+                    for _ in range(args.processes)]
+            totals = [run.result() for run in runs]
+        print(f'rendered {sum(r for r, _ in totals)}, failed {sum(f for _, f in totals)}')
+    else:
+        queue = JobQueue(args.queue)
+        print(queue.counts())
+        for report_type, mlbam_id, attempts, error in queue.failures():
+            print(f'  {report_type} {mlbam_id} after {attempts} attempts: {error}')
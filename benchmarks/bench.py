@@ -0,0 +1,177 @@
+"""offline benchmarks for the report pipeline
+
+usage:
+    python -m benchmarks.bench                          # run every scenario, compare against the baseline
+    python -m benchmarks.bench --save-baseline          # record the current numbers as the baseline
+    python -m benchmarks.bench --scenario full_season --stage heatmap --threshold 1.5
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+from unittest import mock
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import matplotlib.gridspec as gridspec
+
+from benchmarks import fixtures
+from DataSource import DataSource
+from PitchingReport import PitchingReport
+from BattingReport import BattingReport
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_THRESHOLD = float(os.environ.get('BENCH_THRESHOLD', 1.25))
+
+
+@contextlib.contextmanager
+def replayed(recording: fixtures.Recording):
+    """routes every requests.get (ours and pybaseball's) to the recording"""
+    with mock.patch('requests.get', recording.get), contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def _axes(rows=1, cols=1):
+    fig = plt.figure(figsize=(8.5, 11), dpi=300)
+    gs = gridspec.GridSpec(rows, cols)
+    return fig, fig.add_subplot(gs[0, 0])
+
+
+def _render(fig):
+    buf = io.BytesIO()
+    fig.savefig(buf, format='pdf', bbox_inches='tight')
+    return buf
+
+
+def stages(recording: fixtures.Recording):
+    """(name, setup, run) for every stage; only run is timed, setup's result is passed to it"""
+    # no statcast cache, so every run fetches (from the recording) like a cold request
+    pr = PitchingReport(DataSource())
+    br = BattingReport(DataSource())
+    raw = recording.statcast()
+    manifest = recording.manifest
+    ids = manifest['player_ids']
+    span = dict(start_date=manifest['start_date'], end_date=manifest['end_date'], season=manifest.get('season'))
+
+    def pitching_df():
+        return pr.process_df(raw.copy())
+
+    def batting_df():
+        return br.process_df(raw.copy())
+
+    def with_axes(make_df):
+        return lambda: (make_df(),) + _axes()
+
+    return [
+        ('pitching.process_df', lambda: raw.copy(), pr.process_df),
+        ('pitching.get_pitch_groupings', pitching_df, pr.get_pitch_groupings),
+        ('pitching.plot_short_form', with_axes(pitching_df), lambda a: pr.plot_short_form(a[0], a[2])),
+        ('pitching.plot_usage_pies', with_axes(pitching_df), lambda a: pr.plot_usage_pies(a[0], a[2])),
+        ('pitching.plot_pitch_table', with_axes(pitching_df), lambda a: pr.plot_pitch_table(a[0], a[2])),
+        ('pitching.plot_pitch_locations', with_axes(pitching_df), lambda a: pr.plot_pitch_locations(a[0], a[2], 'R')),
+        ('pitching.construct_summary', lambda: None, lambda _: pr.construct_pitching_summary(ids, **span)),
+        ('pitching.render_pdf', lambda: pr.construct_pitching_summary(ids, **span), _render),
+        ('batting.process_df', lambda: raw.copy(), br.process_df),
+        ('batting.get_pitch_groupings', batting_df, br.get_pitch_groupings),
+        ('batting.plot_xwoba_heatmap', with_axes(batting_df), lambda a: br.plot_xwoba_heatmap(a[0], a[2], 'R')),
+        ('batting.plot_spray_chart', with_axes(batting_df), lambda a: br.plot_spray_chart(a[0], a[2])),
+        ('batting.plot_xwoba_by_month', with_axes(batting_df), lambda a: br.plot_xwoba_by_month(a[0], a[2])),
+        ('batting.construct_summary', lambda: None, lambda _: br.construct_batting_summary(ids, **span)),
+        ('batting.render_pdf', lambda: br.construct_batting_summary(ids, **span), _render),
+    ]
+
+
+def measure(setup, run, repeat: int):
+    """best wall time over `repeat` runs, then one traced run for peak memory"""
+    best = float('inf')
+    for _ in range(repeat):
+        arg = setup()
+        t0 = time.perf_counter()
+        run(arg)
+        best = min(best, time.perf_counter() - t0)
+        plt.close('all')
+
+    arg = setup()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    run(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    plt.close('all')
+
+    return {'time_s': round(best, 4), 'peak_mb': round(peak / 2**20, 2)}
+
+
+def run_benchmarks(scenarios, stage_filter=None, repeat=3):
+    results = {}
+    for name in scenarios:
+        recording = fixtures.ensure(name)
+        results[name] = {}
+        with replayed(recording):
+            for stage, setup, run in stages(recording):
+                if stage_filter and stage_filter not in stage:
+                    continue
+                results[name][stage] = measure(setup, run, repeat)
+                print(f"{name:<24}{stage:<34}{results[name][stage]['time_s']:>9.3f}s"
+                      f"{results[name][stage]['peak_mb']:>10.1f} MB", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """returns a message for every stage that got slower or hungrier than threshold x baseline"""
+    regressions = []
+    for name, stage_results in results.items():
+        for stage, current in stage_results.items():
+            base = baseline.get(name, {}).get(stage)
+            if base is None:
+                continue
+            for metric in ['time_s', 'peak_mb']:
+                if base[metric] > 0 and current[metric] > base[metric] * threshold:
+                    regressions.append(f'{name} {stage} {metric}: {current[metric]} vs baseline {base[metric]} '
+                                       f'({current[metric] / base[metric]:.2f}x > {threshold}x)')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='benchmark the report pipeline against recorded fixtures')
+    parser.add_argument('--scenario', choices=list(fixtures.SCENARIOS), action='append')
+    parser.add_argument('--stage', help='only run stages whose name contains this')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='fail when a stage exceeds threshold x its baseline time or peak memory')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--output', help='write the results as json here')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.scenario or list(fixtures.SCENARIOS), args.stage, args.repeat)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'saved baseline to {args.baseline}', file=sys.stderr)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print('no baseline to compare against, run with --save-baseline first', file=sys.stderr)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    for msg in regressions:
+        print(f'REGRESSION {msg}', file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
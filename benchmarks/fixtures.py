@@ -0,0 +1,281 @@
+import gzip
+import io
+import json
+import os
+from datetime import date, timedelta
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+import pandas as pd
+from PIL import Image, ImageDraw
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# scenario name -> shape of the recorded data
+SCENARIOS = {
+    'one_start': {
+        'pitches_per_day': 95, 'days': 1, 'seasons': [2025], 'pitch_types': ['FF', 'SL', 'CH', 'CU', 'SI'],
+        'start_date': '2025-04-12', 'end_date': '2025-04-12',
+    },
+    'one_month': {
+        'pitches_per_day': 95, 'days': 6, 'seasons': [2025], 'pitch_types': ['FF', 'SL', 'CH', 'CU', 'SI'],
+        'start_date': '2025-04-01', 'end_date': '2025-04-30',
+    },
+    'full_season': {
+        'pitches_per_day': 98, 'days': 32, 'seasons': [2025], 'pitch_types': ['FF', 'SL', 'CH', 'CU', 'SI', 'FC'],
+        'start_date': '2025-03-01', 'end_date': '2025-11-01', 'season': 2025,
+    },
+    'multi_season_reliever': {
+        'pitches_per_day': 17, 'days': 65, 'seasons': [2022, 2023, 2024, 2025], 'pitch_types': ['FF', 'ST'],
+        'start_date': '2022-03-01', 'end_date': '2025-11-01',
+    },
+}
+
+PLAYER_IDS = {'mlbam_id': 669373, 'fangraphs_id': 26076}
+
+# columns from the statcast search csv that the reports don't read, kept so frames have a realistic width
+_FILLER_COLUMNS = [
+    'spin_dir', 'spin_rate_deprecated', 'break_angle_deprecated', 'break_length_deprecated',
+    'hit_location', 'on_3b', 'on_2b', 'on_1b', 'outs_when_up', 'inning', 'vx0', 'vy0', 'vz0',
+    'ax', 'ay', 'az', 'sz_top', 'sz_bot', 'hit_distance_sc', 'launch_angle', 'effective_speed',
+    'release_pos_y', 'estimated_ba_using_speedangle', 'woba_value', 'woba_denom', 'babip_value',
+    'iso_value', 'launch_speed_angle', 'home_score', 'away_score', 'bat_score', 'fld_score',
+    'post_away_score', 'post_home_score', 'post_bat_score', 'post_fld_score', 'spin_axis',
+    'delta_home_win_exp', 'delta_run_exp', 'bat_speed', 'swing_length', 'fielder_2', 'fielder_3',
+    'fielder_4', 'fielder_5', 'fielder_6', 'fielder_7', 'fielder_8', 'fielder_9',
+]
+
+_DESCRIPTIONS = ['ball', 'called_strike', 'foul', 'hit_into_play', 'swinging_strike', 'blocked_ball',
+                 'foul_tip', 'swinging_strike_blocked', 'hit_by_pitch']
+_DESCRIPTION_P = [0.34, 0.16, 0.18, 0.17, 0.10, 0.02, 0.01, 0.015, 0.005]
+
+_EVENTS = ['field_out', 'single', 'double', 'triple', 'home_run', 'force_out', 'grounded_into_double_play']
+_EVENTS_P = [0.62, 0.18, 0.06, 0.01, 0.05, 0.05, 0.03]
+
+# rough per-pitch (velo, spin, pfx_x ft, pfx_z ft) so movement plots look like a real arsenal
+_PITCH_SHAPES = {
+    'FF': (95.0, 2350, -0.60, 1.30), 'SI': (94.0, 2200, -1.30, 0.70), 'FC': (89.5, 2400, 0.20, 0.60),
+    'SL': (86.0, 2450, 0.40, 0.10), 'ST': (82.0, 2600, 1.20, 0.00), 'CH': (86.0, 1800, -1.20, 0.40),
+    'CU': (79.5, 2600, 0.70, -0.80),
+}
+
+
+def _game_dates(spec: dict):
+    """spreads the scenario's game days evenly over each season"""
+    days_per_season = max(1, spec['days'] // len(spec['seasons']))
+    dates = []
+    for season in spec['seasons']:
+        if spec['days'] == 1:
+            return [date.fromisoformat(spec['start_date'])]
+        first = max(date(season, 3, 27), date.fromisoformat(spec['start_date']))
+        last = min(date(season, 9, 28), date.fromisoformat(spec['end_date']))
+        step = max(1, (last - first).days // days_per_season)
+        dates += [first + timedelta(days=i * step) for i in range(days_per_season)]
+    return dates
+
+
+def make_statcast(spec: dict, seed: int = 0):
+    """builds a statcast search frame with the shape described by the scenario"""
+    rng = np.random.default_rng(seed)
+    dates = _game_dates(spec)
+    n = spec['pitches_per_day'] * len(dates)
+
+    pitch_types = spec['pitch_types']
+    usage = rng.dirichlet(np.ones(len(pitch_types)) * 4)
+    pitch_type = rng.choice(pitch_types, size=n, p=usage)
+    shapes = np.array([_PITCH_SHAPES[p] for p in pitch_type])
+
+    description = rng.choice(_DESCRIPTIONS, size=n, p=_DESCRIPTION_P)
+    in_play = description == 'hit_into_play'
+    events = np.where(in_play, rng.choice(_EVENTS, size=n, p=_EVENTS_P), None)
+    is_hit = np.isin(events, ['single', 'double', 'triple', 'home_run'])
+
+    launch_speed = np.where(in_play, rng.normal(89, 13, n), np.nan)
+    xwoba = np.where(in_play, np.clip(rng.normal(0.37, 0.35, n), 0, 2), np.nan)
+    xwoba = np.where(np.isin(description, ['swinging_strike', 'called_strike']) & (rng.random(n) < 0.25), 0.0, xwoba)
+
+    game_date = np.repeat([d.isoformat() for d in dates], spec['pitches_per_day'])
+
+    df = pd.DataFrame({
+        'pitch_type': pitch_type,
+        'game_date': game_date,
+        'release_speed': shapes[:, 0] + rng.normal(0, 1.2, n),
+        'release_pos_x': rng.normal(-1.9, 0.15, n),
+        'release_pos_z': rng.normal(5.8, 0.12, n),
+        'player_name': 'Pitcher, Bench',
+        'batter': rng.integers(400000, 700000, n),
+        'pitcher': PLAYER_IDS['mlbam_id'],
+        'events': events,
+        'description': description,
+        'zone': rng.choice([1, 2, 3, 4, 5, 6, 7, 8, 9, 11, 12, 13, 14], size=n),
+        'des': None,
+        'game_type': 'R',
+        'stand': rng.choice(['L', 'R'], size=n, p=[0.45, 0.55]),
+        'p_throws': rng.choice(['L', 'R'], size=n, p=[0.3, 0.7]),
+        'home_team': 'DET',
+        'away_team': 'NYY',
+        'type': np.where(in_play, 'X', 'S'),
+        'bb_type': np.where(in_play, 'line_drive', None),
+        'balls': rng.integers(0, 4, n),
+        'strikes': rng.integers(0, 3, n),
+        'game_year': [int(d[:4]) for d in game_date],
+        'pfx_x': shapes[:, 2] + rng.normal(0, 0.15, n),
+        'pfx_z': shapes[:, 3] + rng.normal(0, 0.15, n),
+        'plate_x': rng.normal(0, 0.8, n),
+        'plate_z': rng.normal(2.4, 0.8, n),
+        'hc_x': np.where(is_hit, rng.normal(125, 40, n), np.nan),
+        'hc_y': np.where(is_hit, rng.normal(110, 40, n), np.nan),
+        'launch_speed': launch_speed,
+        'release_spin_rate': shapes[:, 1] + rng.normal(0, 90, n),
+        'release_extension': rng.normal(6.5, 0.2, n),
+        'game_pk': 776000 + np.repeat(np.arange(len(dates)), spec['pitches_per_day']),
+        'at_bat_number': np.tile(np.arange(spec['pitches_per_day']) // 4 + 1, len(dates)),
+        'pitch_number': np.tile(np.arange(spec['pitches_per_day']) % 4 + 1, len(dates)),
+        'estimated_woba_using_speedangle': xwoba,
+    })
+    for col in _FILLER_COLUMNS:
+        df[col] = rng.normal(0, 1, n)
+
+    # statcast returns newest pitches first
+    return df.iloc[::-1].reset_index(drop=True)
+
+
+def make_fangraphs_rows(stats: str, seed: int = 0):
+    """a leaderboard row with every stat the stat lines read"""
+    rng = np.random.default_rng(seed)
+    if stats == 'pit':
+        return [{
+            'PlayerName': 'Bench Pitcher', 'playerid': PLAYER_IDS['fangraphs_id'], 'xMLBAMID': PLAYER_IDS['mlbam_id'],
+            'IP': 190.1, 'WHIP': 0.89 + rng.random() * 0.3, 'ERA': 2.21 + rng.random(), 'FIP': 2.45 + rng.random(),
+            'K%': 0.31, 'BB%': 0.05, 'K-BB%': 0.26,
+        }]
+    return [{
+        'PlayerName': 'Bench Batter', 'playerid': PLAYER_IDS['fangraphs_id'], 'xMLBAMID': PLAYER_IDS['mlbam_id'],
+        'PA': 679, 'AVG': 0.331, 'OBP': 0.457, 'SLG': 0.688, 'OPS': 1.145,
+        'K%': 0.24 + rng.random() * 0.02, 'BB%': 0.18, 'wRC+': 204, 'HR': 53,
+    }]
+
+
+def _png(size: int, color):
+    img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    draw.ellipse([size * 0.15, size * 0.1, size * 0.85, size * 0.95], fill=color)
+    buf = io.BytesIO()
+    img.save(buf, format='PNG')
+    return buf.getvalue()
+
+
+def generate(name: str, fixture_dir: str = FIXTURE_DIR):
+    """writes a synthetic recording for the scenario in the same layout record_fixtures.py produces"""
+    spec = SCENARIOS[name]
+    path = os.path.join(fixture_dir, name)
+    os.makedirs(path, exist_ok=True)
+
+    with gzip.open(os.path.join(path, 'statcast.csv.gz'), 'wt') as f:
+        make_statcast(spec).to_csv(f, index=False)
+
+    for stats in ['pit', 'bat']:
+        with open(os.path.join(path, f'fangraphs_{stats}.json'), 'w') as f:
+            json.dump({'data': make_fangraphs_rows(stats)}, f)
+
+    with open(os.path.join(path, 'people.json'), 'w') as f:
+        json.dump({'people': [{
+            'id': PLAYER_IDS['mlbam_id'], 'fullName': 'Bench Player', 'pitchHand': {'code': 'L'},
+            'batSide': {'code': 'R'}, 'currentAge': 29, 'height': '6\' 3"', 'weight': 240,
+            'currentTeam': {'id': 116, 'link': '/api/v1/teams/116'},
+        }]}, f)
+    with open(os.path.join(path, 'team.json'), 'w') as f:
+        json.dump({'teams': [{'id': 116, 'abbreviation': 'DET'}]}, f)
+
+    with open(os.path.join(path, 'headshot.png'), 'wb') as f:
+        f.write(_png(640, (200, 170, 150, 255)))
+    with open(os.path.join(path, 'logo.png'), 'wb') as f:
+        f.write(_png(500, (12, 35, 64, 255)))
+
+    manifest = dict(spec, scenario=name, player_ids=PLAYER_IDS, source='synthetic')
+    with open(os.path.join(path, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return path
+
+
+def ensure(name: str, fixture_dir: str = FIXTURE_DIR):
+    """returns the scenario's recording, generating a synthetic one when nothing has been recorded"""
+    path = os.path.join(fixture_dir, name)
+    if not os.path.exists(os.path.join(path, 'manifest.json')):
+        generate(name, fixture_dir)
+    return Recording(path)
+
+
+class FakeResponse():
+    """the parts of requests.Response the report code touches"""
+
+    def __init__(self, content: bytes, status_code: int = 200):
+        self.content = content
+        self.status_code = status_code
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f'replayed response returned {self.status_code}')
+
+
+class Recording():
+    """a directory of recorded responses, resolved by the kind of request a url makes"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, 'manifest.json')) as f:
+            self.manifest = json.load(f)
+        self._statcast = None
+
+    def _read(self, filename: str):
+        with open(os.path.join(self.path, filename), 'rb') as f:
+            return f.read()
+
+    def statcast(self):
+        if self._statcast is None:
+            self._statcast = pd.read_csv(os.path.join(self.path, 'statcast.csv.gz'))
+        return self._statcast
+
+    def statcast_csv(self, start_date: str, end_date: str, player_type: str = 'pitcher'):
+        """the recorded statcast rows inside [start_date, end_date] as csv bytes. batter searches get the same
+        pitches with the ids swapped, so the rows belong to whoever the search was for"""
+        df = self.statcast()
+        df = df[(df['game_date'] >= start_date) & (df['game_date'] <= end_date)]
+        if player_type == 'batter':
+            df = df.assign(batter=df['pitcher'], pitcher=df['batter'], game_pk=df['game_pk'] + 1000000)
+        return df.to_csv(index=False).encode('utf-8')
+
+    def resolve(self, url: str):
+        """returns the recorded body for a url, or None if the recording has nothing for it"""
+        parsed = urlparse(url)
+        query = parse_qs(parsed.query)
+        host = parsed.netloc
+
+        if host == 'baseballsavant.mlb.com' and parsed.path.startswith('/statcast_search'):
+            return self.statcast_csv(query['game_date_gt'][0], query['game_date_lt'][0],
+                                     query.get('player_type', ['pitcher'])[0])
+        if host == 'www.fangraphs.com' and parsed.path.startswith('/api/leaders'):
+            return self._read(f"fangraphs_{query.get('stats', ['pit'])[0]}.json")
+        if host == 'statsapi.mlb.com' and '/people' in parsed.path:
+            return self._read('people.json')
+        if host == 'statsapi.mlb.com' and '/teams' in parsed.path:
+            return self._read('team.json')
+        if host == 'img.mlbstatic.com':
+            return self._read('headshot.png')
+        if host == 'a.espncdn.com':
+            return self._read('logo.png')
+        return None
+
+    def get(self, url: str, *args, **kwargs):
+        """drop-in replacement for requests.get"""
+        body = self.resolve(url)
+        if body is None:
+            raise RuntimeError(f'no recorded response for {url}')
+        return FakeResponse(body)
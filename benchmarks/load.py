@@ -0,0 +1,84 @@
+"""throughput and tail-latency test of the full report pipeline against the replay server
+
+usage: python -m benchmarks.load --scenario full_season --requests 40 --workers 4 --latency-ms 80 --error-rate 0.01
+"""
+import argparse
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+from benchmarks import fixtures
+from benchmarks.replay_server import ReplayConfig, serve
+from DataSource import DataSource
+
+_reports = {}
+
+
+def _init_worker(replay_url: str):
+    from PitchingReport import PitchingReport
+    from BattingReport import BattingReport
+    source = DataSource(replay_url=replay_url)
+    _reports['pitching'] = PitchingReport(source)
+    _reports['batting'] = BattingReport(source)
+
+
+def _render(report_type: str, manifest: dict):
+    """builds and renders one report, returning (seconds, error)"""
+    span = dict(start_date=manifest['start_date'], end_date=manifest['end_date'], season=manifest.get('season'))
+    t0 = time.perf_counter()
+    try:
+        if report_type == 'pitching':
+            fig = _reports['pitching'].construct_pitching_summary(manifest['player_ids'], **span)
+        else:
+            fig = _reports['batting'].construct_batting_summary(manifest['player_ids'], **span)
+        fig.savefig(io.BytesIO(), format='pdf', bbox_inches='tight')
+        plt.close(fig)
+        return time.perf_counter() - t0, None
+    except Exception as e:
+        plt.close('all')
+        return time.perf_counter() - t0, f'{type(e).__name__}: {e}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='load test report rendering against replayed data sources')
+    parser.add_argument('--scenario', choices=list(fixtures.SCENARIOS), default='full_season')
+    parser.add_argument('--report', choices=['pitching', 'batting'], default='pitching')
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    args = parser.parse_args(argv)
+
+    recording = fixtures.ensure(args.scenario)
+    server = serve(recording, replay=ReplayConfig(args.latency_ms, args.jitter_ms, args.error_rate))
+    replay_url = f'http://127.0.0.1:{server.server_address[1]}'
+
+    latencies, errors = [], []
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(replay_url,)) as pool:
+        futures = [pool.submit(_render, args.report, recording.manifest) for _ in range(args.requests)]
+        for future in as_completed(futures):
+            seconds, error = future.result()
+            latencies.append(seconds)
+            if error:
+                errors.append(error)
+    elapsed = time.perf_counter() - t0
+    server.shutdown()
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f'{args.requests} {args.report} reports in {elapsed:.1f}s with {args.workers} workers '
+          f'({args.requests / elapsed:.2f} reports/s)')
+    print(f'latency p50 {p50:.2f}s  p95 {p95:.2f}s  p99 {p99:.2f}s  max {max(latencies):.2f}s')
+    print(f'errors {len(errors)}/{args.requests}')
+    for error in sorted(set(errors)):
+        print(f'  {error}')
+
+
+if __name__ == '__main__':
+    main()
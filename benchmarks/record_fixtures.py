@@ -0,0 +1,67 @@
+"""records live statcast/fangraphs/statsapi responses into benchmarks/fixtures
+
+usage: python -m benchmarks.record_fixtures --mlbam-id 669373 --fangraphs-id 26076 [--scenario full_season]
+"""
+import argparse
+import gzip
+import json
+import os
+
+import pybaseball as pyb
+import requests
+
+import config
+from benchmarks.fixtures import FIXTURE_DIR, SCENARIOS
+
+
+def record(name: str, mlbam_id: int, fangraphs_id: int, fixture_dir: str = FIXTURE_DIR):
+    """pulls every response a report run needs for the scenario's date range"""
+    spec = SCENARIOS[name]
+    path = os.path.join(fixture_dir, name)
+    os.makedirs(path, exist_ok=True)
+
+    df = pyb.statcast_pitcher(spec['start_date'], spec['end_date'], mlbam_id)
+    with gzip.open(os.path.join(path, 'statcast.csv.gz'), 'wt') as f:
+        df.to_csv(f, index=False)
+
+    season = int(spec['start_date'][:4])
+    for stats in ['pit', 'bat']:
+        url = (f"https://www.fangraphs.com/api/leaders/major-league/data?age=&pos=all&stats={stats}&lg=all"
+               f"&season={season}&season1={season}&players={fangraphs_id}&ind=0&qual=0&type=8"
+               f"&month=0&pageitems=500000")
+        with open(os.path.join(path, f'fangraphs_{stats}.json'), 'wb') as f:
+            f.write(requests.get(url).content)
+
+    people = requests.get(f"https://statsapi.mlb.com/api/v1/people?personIds={mlbam_id}&hydrate=currentTeam").json()
+    with open(os.path.join(path, 'people.json'), 'w') as f:
+        json.dump(people, f)
+
+    team_link = people['people'][0]['currentTeam']['link']
+    team = requests.get('https://statsapi.mlb.com/' + team_link).json()
+    with open(os.path.join(path, 'team.json'), 'w') as f:
+        json.dump(team, f)
+
+    headshot_url = (f'https://img.mlbstatic.com/mlb-photos/image/upload/d_people:generic:headshot:67:current.png'
+                    f'/w_640,q_auto:best/v1/people/{mlbam_id}/headshot/silo/current.png')
+    with open(os.path.join(path, 'headshot.png'), 'wb') as f:
+        f.write(requests.get(headshot_url).content)
+
+    with open(os.path.join(path, 'logo.png'), 'wb') as f:
+        f.write(requests.get(config.mlb_teams[team['teams'][0]['abbreviation']]).content)
+
+    manifest = dict(spec, scenario=name, player_ids={'mlbam_id': mlbam_id, 'fangraphs_id': fangraphs_id},
+                    source='recorded')
+    with open(os.path.join(path, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='record report fixtures from the live data sources')
+    parser.add_argument('--mlbam-id', type=int, required=True)
+    parser.add_argument('--fangraphs-id', type=int, required=True)
+    parser.add_argument('--scenario', choices=list(SCENARIOS), action='append')
+    args = parser.parse_args()
+
+    for name in args.scenario or SCENARIOS:
+        print(f'recorded {name} -> {record(name, args.mlbam_id, args.fangraphs_id)}')
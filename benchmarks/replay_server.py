@@ -0,0 +1,99 @@
+"""local stand-in for fangraphs, statsapi, baseball savant and the image cdns
+
+serves a fixture recording at http://host:port/{original host}{original path}?{original query}, which is
+the layout DataSource uses when config.replay_url is set.
+
+usage:
+    python -m benchmarks.replay_server --scenario full_season --port 8765 --latency-ms 80 --jitter-ms 40 --error-rate 0.02
+    MLB_REPORTS_REPLAY_URL=http://localhost:8765 streamlit run app.py
+"""
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks import fixtures
+
+CONTENT_TYPES = {
+    'baseballsavant.mlb.com': 'text/csv',
+    'img.mlbstatic.com': 'image/png',
+    'a.espncdn.com': 'image/png',
+}
+
+
+class ReplayConfig():
+    """latency and fault injection applied to every replayed response"""
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0, error_status: int = 503,
+                 seed: int = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        with self._lock:
+            jitter = self._rng.expovariate(1 / self.jitter_ms) if self.jitter_ms > 0 else 0
+        return (self.latency_ms + jitter) / 1000
+
+    def should_fail(self):
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+
+def make_handler(recording: fixtures.Recording, replay: ReplayConfig):
+
+    class ReplayHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            host, _, rest = self.path.lstrip('/').partition('/')
+            url = f'https://{host}/{rest}'
+
+            time.sleep(replay.delay())
+
+            if replay.should_fail():
+                self.send_error(replay.error_status, 'injected failure')
+                return
+
+            body = recording.resolve(url)
+            if body is None:
+                self.send_error(404, f'nothing recorded for {url}')
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPES.get(host, 'application/json'))
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ReplayHandler
+
+
+def serve(recording: fixtures.Recording, port: int = 0, replay: ReplayConfig = None):
+    """starts the server on a background thread and returns it; server.server_address has the bound port"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(recording, replay or ReplayConfig()))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='serve recorded responses in place of the live data sources')
+    parser.add_argument('--scenario', choices=list(fixtures.SCENARIOS), default='full_season')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0, help='mean of the exponential jitter added to latency')
+    parser.add_argument('--error-rate', type=float, default=0, help='fraction of requests answered with --error-status')
+    parser.add_argument('--error-status', type=int, default=503)
+    args = parser.parse_args()
+
+    replay = ReplayConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.error_status)
+    server = serve(fixtures.ensure(args.scenario), args.port, replay)
+    print(f'replaying {args.scenario} on http://127.0.0.1:{server.server_address[1]}')
+    threading.Event().wait()
@@ -0,0 +1,57 @@
+"""cold-start benchmark for the streamlit app
+
+imports app.py in a fresh interpreter (streamlit bare mode, so the script runs up to the first selectbox),
+then fails if any of the heavy report libraries got loaded or the median import time is over budget.
+
+usage: python -m benchmarks.startup [--runs 5] [--max-seconds 2.0]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# libraries that should only load once a report is actually built
+HEAVY_MODULES = ['seaborn', 'pybaseball', 'scipy', 'matplotlib.pyplot', 'PitchingReport', 'BattingReport']
+
+_PROBE = f"""
+import json, sys, time
+t0 = time.perf_counter()
+import app
+elapsed = time.perf_counter() - t0
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def probe():
+    """one cold import of app.py in a fresh interpreter"""
+    out = subprocess.run([sys.executable, '-c', _PROBE], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='measure app.py cold start')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-seconds', type=float, default=float(os.environ.get('STARTUP_BUDGET_S', 2.0)))
+    args = parser.parse_args(argv)
+
+    results = [probe() for _ in range(args.runs)]
+    median = statistics.median(r['seconds'] for r in results)
+    loaded = sorted({m for r in results for m in r['loaded']})
+
+    print(f'app import median {median:.3f}s over {args.runs} runs (budget {args.max_seconds:.2f}s)', file=sys.stderr)
+    failed = False
+    if loaded:
+        print(f'REGRESSION heavy modules loaded at startup: {", ".join(loaded)}', file=sys.stderr)
+        failed = True
+    if median > args.max_seconds:
+        print(f'REGRESSION app import took {median:.3f}s, over the {args.max_seconds:.2f}s budget', file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
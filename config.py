@@ -1,3 +1,27 @@
+import os
+
+# point every data source at a replay server (benchmarks/replay_server.py) instead of the live services
+replay_url = os.environ.get('MLB_REPORTS_REPLAY_URL')
+request_timeout = float(os.environ.get('MLB_REPORTS_REQUEST_TIMEOUT', 30))
+
+# rendered reports, statcast pulls and the request log live here
+cache_dir = os.environ.get('MLB_REPORTS_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'mlb-reports'))
+artifact_ttl_hours = float(os.environ.get('MLB_REPORTS_ARTIFACT_TTL_HOURS', 24))
+
+# ranges longer than this many days are fetched and reduced a chunk at a time (see streaming.py)
+stream_after_days = int(os.environ.get('MLB_REPORTS_STREAM_AFTER_DAYS', 400))
+stream_chunk_days = int(os.environ.get('MLB_REPORTS_STREAM_CHUNK_DAYS', 31))
+
+# current-season fangraphs leaderboards are fetched again once they are this old (see leaderboards.py)
+leaderboard_ttl_minutes = float(os.environ.get('MLB_REPORTS_LEADERBOARD_TTL_MINUTES', 60))
+
+# client-side request limits per host as (requests per second, burst), shared by every process using cache_dir
+# (see ratelimit.py). MLB_REPORTS_RATE_LIMITS='fangraphs.com=2:5,statsapi.mlb.com=10:20' replaces them
+rate_limits = {'fangraphs.com': (2, 5), 'statsapi.mlb.com': (10, 20)}
+if os.environ.get('MLB_REPORTS_RATE_LIMITS'):
+    rate_limits = {host: tuple(float(x) for x in limit.split(':'))
+                   for host, limit in (entry.split('=') for entry in os.environ['MLB_REPORTS_RATE_LIMITS'].split(','))}
+
 mlb_team_colors = {
     "AZ":  {"primary": "#A71930", "accent": "#E3D4AD"},
     "ATH": {"primary": "#003831", "accent": "#EFB21E"},
@@ -1,11 +1,11 @@
-import requests
 import pandas as pd
 import streamlit as st
+from rendering import source, request_log, render_report, stored_report
 
 @st.cache_data(ttl=3600)
 def get_pitcher_names(season=2025):
     url = f"https://www.fangraphs.com/api/leaders/major-league/data?age=&pos=all&stats=pit&lg=all&season={season}&season1={season}&ind=0&qual=0&type=8&month=0&pageitems=500000"
-    data = requests.get(url).json()
+    data = source.get_json(url)
     df = pd.DataFrame(data=data['data'])
     columns = ['PlayerName', 'xMLBAMID', 'playerid']
     return df[columns]
@@ -13,7 +13,23 @@ def get_pitcher_names(season=2025):
 @st.cache_data(ttl=3600)
 def get_batter_names(season=2025):
     url = f"https://www.fangraphs.com/api/leaders/major-league/data?age=&pos=all&stats=bat&lg=all&season={season}&season1={season}&ind=0&qual=1&type=8&month=0&pageitems=500000"
-    data = requests.get(url).json()
+    data = source.get_json(url)
     df = pd.DataFrame(data=data['data'])
     columns = ['PlayerName', 'xMLBAMID', 'playerid']
     return df[columns]
+
+def log_request(report_type: str, player_ids: dict, season: int = None):
+    """records a report request once per session and selection (streamlit reruns the script on every interaction)"""
+    key = (report_type, int(player_ids['mlbam_id']), season)
+    if st.session_state.get('last_logged_request') != key:
+        request_log.record(report_type, player_ids, season)
+        st.session_state['last_logged_request'] = key
+
+def show_panels(panels, panel_rows):
+    """lays out an empty slot per panel the way the report does, then fills each slot as its panel finishes"""
+    slots = {}
+    for row in panel_rows:
+        for column, panel in zip(st.columns(len(row)), row):
+            slots[panel] = column.empty()
+    for panel, png in panels:
+        slots[panel].image(png, width="stretch")
@@ -0,0 +1,70 @@
+"""fangraphs season leaderboards, fetched once and shared by every report
+
+the season leaderboard (type=8) carries every stat the stat lines show, for every player at once. instead of a
+players= request per report, each (stats, season, split) leaderboard is fetched once per process and indexed by
+fangraphs id, so a batch run over a thousand players makes a handful of fangraphs calls. leaderboards of the
+current season are fetched again once they are config.leaderboard_ttl_minutes old; finished seasons are kept.
+"""
+import threading
+import time
+
+import pandas as pd
+
+import config
+from artifacts import current_season
+from singleflight import SingleFlight
+
+
+class Leaderboards():
+    """season leaderboards by fangraphs id (as a string, see id_key); the leaderboards themselves are shared by
+    every instance"""
+
+    URL = ('https://www.fangraphs.com/api/leaders/major-league/data?age=&pos=all&stats={stats}&lg=all'
+           '&season={season}&season1={season}&ind=0&qual=0&type=8&month={month}&pageitems=500000')
+    # fangraphs' month parameter doubles as the split
+    SPLITS = {'All': 0, 'vs L': 13, 'vs R': 14}
+
+    # {(replay_url, stats, season, split): (fetched at, leaderboard indexed by playerid)}
+    _boards = {}
+    _lock = threading.Lock()
+    _inflight = SingleFlight()
+
+    def __init__(self, source):
+        self.source = source
+
+    def get(self, stats: str, season: int, split: str = 'All'):
+        """the whole 'pit' or 'bat' leaderboard for the season and split, indexed by fangraphs id"""
+        key = (self.source.replay_url, stats, int(season), split)
+        with self._lock:
+            cached = self._boards.get(key)
+        if cached is not None and (season < current_season() or
+                                   time.time() - cached[0] < config.leaderboard_ttl_minutes * 60):
+            return cached[1]
+        board, _ = self._inflight.do(key, self._fetch, key)
+        return board
+
+    def _fetch(self, key: tuple):
+        _, stats, season, split = key
+        url = self.URL.format(stats=stats, season=season, month=self.SPLITS[split])
+        board = pd.DataFrame(data=self.source.get_json(url)['data'])
+        if not board.empty:
+            # fangraphs ids are mostly numbers, but players without an mlb id have ones like 'sa3012345'
+            board.index = board['playerid'].map(self.id_key).rename(None)
+        with self._lock:
+            self._boards[key] = (time.time(), board)
+        return board
+
+    @staticmethod
+    def id_key(fangraphs_id):
+        """the index key for a fangraphs id, numeric (26076, 26076.0, '26076') or not ('sa3012345')"""
+        if isinstance(fangraphs_id, float) and fangraphs_id.is_integer():
+            fangraphs_id = int(fangraphs_id)
+        return str(fangraphs_id)
+
+    def player(self, stats: str, season: int, fangraphs_id, split: str = 'All'):
+        """the player's row as a one-row frame, like a players= request returns; empty if they have no line"""
+        board = self.get(stats, season, split)
+        key = self.id_key(fangraphs_id)
+        if board.empty or key not in board.index:
+            return pd.DataFrame()
+        return board.loc[[key]].reset_index(drop=True)
@@ -0,0 +1,107 @@
+"""player bios and team abbreviations from statsapi, resolved in bulk and shared by every report
+
+statsapi's people endpoint takes a comma-separated personIds list, so bios are fetched CHUNK players per request
+and cached by id. a batch or roster run calls bios() with every id it is about to render up front, and each report's
+get_bio is then a cache hit. every major league team comes from one teams request. bios and teams are fetched
+again once they are older than the rendered reports they go into (config.artifact_ttl_hours).
+"""
+import threading
+import time
+
+import config
+from singleflight import SingleFlight
+
+
+class People():
+    """bios by mlbam id and team abbreviations by team id; the caches are shared by every instance"""
+
+    PEOPLE_URL = 'https://statsapi.mlb.com/api/v1/people?personIds={ids}&hydrate=currentTeam'
+    TEAMS_URL = 'https://statsapi.mlb.com/api/v1/teams?sportId=1'
+    # ids per people request, well inside url length limits
+    CHUNK = 100
+    # the abbreviation of players without a team
+    FREE_AGENT = 'FA'
+
+    # {(replay_url, mlbam_id): (fetched at, bio)} and {replay_url: (fetched at, {team_id: abbreviation})}
+    _bios = {}
+    _teams = {}
+    _lock = threading.Lock()
+    _inflight = SingleFlight()
+
+    def __init__(self, source):
+        self.source = source
+
+    def _fresh(self, cached):
+        return cached is not None and time.time() - cached[0] < config.artifact_ttl_hours * 3600
+
+    def bios(self, mlbam_ids):
+        """{mlbam_id: bio} for every id statsapi knows, fetching the ones not cached CHUNK at a time"""
+        mlbam_ids = list(dict.fromkeys(int(i) for i in mlbam_ids))
+        with self._lock:
+            cached = {i: self._bios.get((self.source.replay_url, i)) for i in mlbam_ids}
+        missing = [i for i in mlbam_ids if not self._fresh(cached[i])]
+        for start in range(0, len(missing), self.CHUNK):
+            chunk = tuple(missing[start:start + self.CHUNK])
+            self._inflight.do(('people', self.source.replay_url, chunk), self._fetch_bios, chunk)
+        with self._lock:
+            return {i: self._bios[(self.source.replay_url, i)][1] for i in mlbam_ids
+                    if (self.source.replay_url, i) in self._bios}
+
+    def _fetch_bios(self, mlbam_ids: tuple):
+        data = self.source.get_json(self.PEOPLE_URL.format(ids=','.join(str(i) for i in mlbam_ids)))
+        now = time.time()
+        # each person is parsed on their own, so one odd record can't keep the rest of the chunk out of the cache
+        bios = {}
+        for person in data['people']:
+            try:
+                bios[int(person['id'])] = self.parse_bio(person)
+            except (KeyError, TypeError, ValueError):
+                continue
+        with self._lock:
+            for mlbam_id, bio in bios.items():
+                self._bios[(self.source.replay_url, mlbam_id)] = (now, bio)
+
+    def bio(self, mlbam_id: int):
+        bio = self.bios([mlbam_id]).get(int(mlbam_id))
+        if bio is None:
+            raise ValueError(f'statsapi has no player {mlbam_id}')
+        return bio
+
+    @staticmethod
+    def parse_bio(person: dict):
+        """the bio get_bio returns; team_link is None for a player without a team (a free agent or retiree)"""
+        return {
+            "player_name" : person['fullName'],
+            "pitcher_hand" : person['pitchHand']['code'],
+            "bat_side" : person['batSide']['code'],
+            "age" : person['currentAge'],
+            "height" : person['height'],
+            "weight" : person['weight'],
+            "team_link": person.get('currentTeam', {}).get('link')
+        }
+
+    def teams(self):
+        """{team_id: abbreviation} for every major league team, from one request"""
+        with self._lock:
+            cached = self._teams.get(self.source.replay_url)
+        if self._fresh(cached):
+            return cached[1]
+        teams, _ = self._inflight.do(('teams', self.source.replay_url), self._fetch_teams)
+        return teams
+
+    def _fetch_teams(self):
+        teams = {int(team['id']): team['abbreviation'] for team in self.source.get_json(self.TEAMS_URL)['teams']}
+        with self._lock:
+            self._teams[self.source.replay_url] = (time.time(), teams)
+        return teams
+
+    def team_abbreviation(self, team_link: str):
+        """the abbreviation of the team at a statsapi team link; teams outside the majors (a player on a
+        minor league assignment) are looked up on their own, and no link (no team) is FREE_AGENT"""
+        if team_link is None:
+            return self.FREE_AGENT
+        team_id = int(team_link.rstrip('/').split('/')[-1])
+        abbreviation = self.teams().get(team_id)
+        if abbreviation is None:
+            abbreviation = self.source.get_json('https://statsapi.mlb.com/' + team_link)['teams'][0]['abbreviation']
+        return abbreviation
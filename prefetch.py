@@ -0,0 +1,108 @@
+"""warms the artifact store with season reports for the most requested and highest-usage players
+
+meant to run once a day after the previous night's games are in statcast, either from cron
+(`python prefetch.py --top 50`) or as a long-running process (`python prefetch.py --top 50 --daily-at 07:00`).
+rendering goes through the pitch store, so each player only pulls the games since their last refresh.
+"""
+import argparse
+import heapq
+import time
+import traceback
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import matplotlib
+matplotlib.use('Agg')
+
+from artifacts import current_season, season_range
+from leaderboards import Leaderboards
+from people import People
+import rendering
+
+USAGE_STAT = {'pitching': 'IP', 'batting': 'PA'}
+
+
+def leaderboard(report_type: str, season: int):
+    """the season leaderboard as [(mlbam_id, fangraphs_id, usage)] where usage is IP or PA"""
+    board = Leaderboards(rendering.source).get('pit' if report_type == 'pitching' else 'bat', season)
+    if board.empty:
+        return []
+    # jobs and the request log key players by numeric ids, so rows without both (a minor leaguer's 'sa...'
+    # fangraphs id, no mlbam id) are skipped rather than cast
+    mlbam_ids = pd.to_numeric(board['xMLBAMID'], errors='coerce')
+    fangraphs_ids = pd.to_numeric(board['playerid'], errors='coerce')
+    usage = pd.to_numeric(board[USAGE_STAT[report_type]], errors='coerce').fillna(0)
+    usable = (mlbam_ids.fillna(0) != 0) & fangraphs_ids.notna()
+    return [(int(mlbam_id), int(fangraphs_id), float(u))
+            for mlbam_id, fangraphs_id, u in zip(mlbam_ids[usable], fangraphs_ids[usable], usage[usable])]
+
+
+def prioritize(report_type: str, season: int, n: int):
+    """top n players to warm: anyone requested recently comes first by request count, then the leaderboard by usage"""
+    queue = []
+    seen = set()
+    for mlbam_id, fangraphs_id, count in rendering.request_log.top(report_type, n):
+        # a player logged under two fangraphs ids (numeric and text in older logs) is warmed once, by the likelier
+        if mlbam_id in seen:
+            continue
+        heapq.heappush(queue, ((0, -count), mlbam_id, fangraphs_id))
+        seen.add(mlbam_id)
+    for mlbam_id, fangraphs_id, usage in leaderboard(report_type, season):
+        if mlbam_id not in seen:
+            heapq.heappush(queue, ((1, -usage), mlbam_id, fangraphs_id))
+            seen.add(mlbam_id)
+    return [heapq.heappop(queue)[1:] for _ in range(min(n, len(queue)))]
+
+
+def run_once(n: int, report_types=('pitching', 'batting'), season: int = None):
+    """re-renders the season report for the top n players of each report type"""
+    season = season or current_season()
+    start_date, end_date = season_range(season)
+    for report_type in report_types:
+        report = rendering.get_report(report_type)
+        players = prioritize(report_type, season, n)
+        try:
+            # only warms the bio cache; each render still fetches (and can fail on) its own bio
+            People(rendering.source).bios([mlbam_id for mlbam_id, _ in players])
+        except Exception:
+            print(f'[{report_type}] warming the bio cache failed, bios will be fetched per player')
+            traceback.print_exc()
+        for i, (mlbam_id, fangraphs_id) in enumerate(players, 1):
+            t0 = time.perf_counter()
+            try:
+                rendering.render_report(report, report_type, {'mlbam_id': mlbam_id, 'fangraphs_id': fangraphs_id},
+                                        start_date, end_date, season=season, refresh=True)
+                print(f'[{report_type} {i}/{len(players)}] {mlbam_id} warmed in {time.perf_counter() - t0:.1f}s')
+            except Exception:
+                print(f'[{report_type} {i}/{len(players)}] {mlbam_id} failed')
+                traceback.print_exc()
+
+
+def seconds_until(at: str):
+    """seconds until the next HH:MM local time"""
+    now = datetime.now()
+    hour, minute = (int(x) for x in at.split(':'))
+    next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='pre-render season reports for popular players')
+    parser.add_argument('--top', type=int, default=50, help='players to warm per report type')
+    parser.add_argument('--report', choices=['pitching', 'batting'], action='append')
+    parser.add_argument('--season', type=int)
+    parser.add_argument('--daily-at', help='keep running and warm every day at this HH:MM local time')
+    args = parser.parse_args()
+
+    # warming waits behind interactive and batch requests to the rate limited apis
+    rendering.source.priority = 'prefetch'
+    report_types = args.report or ['pitching', 'batting']
+    if args.daily_at is None:
+        run_once(args.top, report_types, args.season)
+    else:
+        while True:
+            time.sleep(seconds_until(args.daily_at))
+            run_once(args.top, report_types, args.season)
@@ -0,0 +1,111 @@
+"""client-side rate limits for the apis the reports fetch from
+
+a batch run or a traffic spike would otherwise send unbounded parallel traffic to fangraphs and statsapi, get
+throttled, and slow every report down. each limited host gets a token bucket: requests go at `rate` per second,
+with bursts of up to `burst`. the buckets live in a sqlite file in the cache dir, so the app, the http service's
+workers, the prefetcher and batch workers pointed at the same MLB_REPORTS_CACHE_DIR all draw on one budget.
+
+requests waiting on a host queue by priority. interactive requests take the next token ahead of any batch or
+prefetch request, and those only go once nothing of higher priority is waiting; within a priority it is first
+come, first served. the waiting requests are the queue depth reported on /metrics.
+"""
+import os
+import sqlite3
+import time
+
+import config
+
+# highest first
+PRIORITIES = ('interactive', 'batch', 'prefetch')
+
+
+class RateLimiter():
+    """per-host token buckets, shared through sqlite, with a priority queue in front of each"""
+
+    # waiters re-register every poll; one that stops (its process died) is dropped after this many seconds
+    WAITER_TTL = 5.0
+
+    def __init__(self, path: str, limits: dict):
+        self.path = path
+        # {host: (requests per second, burst)}; subdomains share their host's bucket
+        self.limits = limits
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute('CREATE TABLE IF NOT EXISTS buckets (host TEXT PRIMARY KEY, tokens REAL, updated REAL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS waiters ('
+                         'id INTEGER PRIMARY KEY, host TEXT, priority INTEGER, expires REAL)')
+        finally:
+            conn.close()
+
+    @classmethod
+    def from_config(cls):
+        return cls(os.path.join(config.cache_dir, 'ratelimit.db'), config.rate_limits)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=60, isolation_level=None)
+
+    def bucket(self, host: str):
+        """the limited host that host's requests count against, or None when it is not limited"""
+        for limited in self.limits:
+            if host == limited or host.endswith('.' + limited):
+                return limited
+        return None
+
+    def acquire(self, host: str, priority: str = 'interactive'):
+        """blocks until a request to host may go; returns the seconds it waited"""
+        bucket = self.bucket(host)
+        if bucket is None:
+            return 0.0
+        rate, burst = self.limits[bucket]
+        rank = PRIORITIES.index(priority)
+        started = time.time()
+        waiter = None
+        conn = self._connect()
+        try:
+            while True:
+                now = time.time()
+                conn.execute('BEGIN IMMEDIATE')
+                conn.execute('DELETE FROM waiters WHERE expires < ?', (now,))
+                row = conn.execute('SELECT tokens, updated FROM buckets WHERE host = ?', (bucket,)).fetchone()
+                tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+                # a newcomer queues behind everyone already waiting at its priority
+                ahead = conn.execute('SELECT COUNT(*) FROM waiters WHERE host = ? AND '
+                                     '(priority < ? OR (priority = ? AND id < ?))',
+                                     (bucket, rank, rank, waiter if waiter is not None else 2 ** 62)).fetchone()[0]
+                if ahead == 0 and tokens >= 1:
+                    conn.execute('INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)', (bucket, tokens - 1, now))
+                    if waiter is not None:
+                        conn.execute('DELETE FROM waiters WHERE id = ?', (waiter,))
+                        waiter = None
+                    conn.execute('COMMIT')
+                    return now - started
+
+                if waiter is None:
+                    waiter = conn.execute('INSERT INTO waiters (host, priority, expires) VALUES (?, ?, ?)',
+                                          (bucket, rank, now + self.WAITER_TTL)).lastrowid
+                else:
+                    conn.execute('UPDATE waiters SET expires = ? WHERE id = ?', (now + self.WAITER_TTL, waiter))
+                conn.execute('COMMIT')
+                # roughly when this request's token comes up; a higher priority arrival just means another poll
+                time.sleep(min(max((ahead + 1 - tokens) / rate, 0.005), self.WAITER_TTL / 2))
+        finally:
+            if waiter is not None:
+                # interrupted while queued: leave the queue rather than hold it up until the entry expires
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                conn.execute('DELETE FROM waiters WHERE id = ?', (waiter,))
+            conn.close()
+
+    def depth(self):
+        """requests waiting, across every process sharing the limiter, as {(host, priority): count} for each
+        limited host and priority"""
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT host, priority, COUNT(*) FROM waiters WHERE expires >= ? '
+                                'GROUP BY host, priority', (time.time(),)).fetchall()
+        finally:
+            conn.close()
+        depth = {(host, priority): 0 for host in self.limits for priority in PRIORITIES}
+        depth.update({(host, PRIORITIES[rank]): count for host, rank, count in rows})
+        return depth
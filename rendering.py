@@ -0,0 +1,86 @@
+"""the render path shared by the app, the prefetcher and the http service: one data source, the artifact store,
+and render_report, which serves a stored report or builds and stores a new one"""
+from DataSource import DataSource
+from artifacts import ArtifactStore, RequestLog
+from singleflight import SingleFlight
+
+source = DataSource.from_config()
+artifacts = ArtifactStore.from_config()
+request_log = RequestLog.from_config()
+_renders = SingleFlight()
+_reports = {}
+
+def get_report(report_type: str):
+    """this process's report object for a report type; the report modules are only imported once needed"""
+    kind = report_type.split('-')[-1] if report_type.endswith('-comparison') else report_type.split('-')[0]
+    if kind not in _reports:
+        if kind == 'pitching':
+            from PitchingReport import PitchingReport
+            _reports[kind] = PitchingReport(source)
+        elif kind == 'batting':
+            from BattingReport import BattingReport
+            _reports[kind] = BattingReport(source)
+        else:
+            from ComparisonReport import ComparisonReport
+            _reports[kind] = ComparisonReport(source)
+    return _reports[kind]
+
+def report_key(report_type: str, player_ids, start_date: str, end_date: str, season: int = None):
+    if isinstance(player_ids, list):
+        mlbam_id = tuple(int(ids['mlbam_id']) for ids in player_ids)
+    else:
+        mlbam_id = int(player_ids['mlbam_id'])
+    return (report_type, mlbam_id, start_date, end_date, season)
+
+def stored_report(report_type: str, player_ids, start_date: str, end_date: str, season: int = None):
+    """(png, pdf) from the artifact store, or None if either is missing or stale"""
+    key = report_key(report_type, player_ids, start_date, end_date, season)
+    png, pdf = artifacts.get(key, 'png'), artifacts.get(key, 'pdf')
+    if png is None or pdf is None:
+        return None
+    return png, pdf
+
+def render_report(report, report_type: str, player_ids: dict, start_date: str, end_date: str, season: int = None,
+                  refresh: bool = False, redraw: bool = False):
+    """returns the report as (png, pdf) bytes from the artifact store, rendering it if nothing fresh is stored;
+    concurrent identical requests wait on one render. comparisons take a list of player ids. refresh renders
+    it again from freshly fetched data, redraw only draws it again (say after a style change) from the summary
+    data cached by the last render"""
+    key = report_key(report_type, player_ids, start_date, end_date, season)
+    if not (refresh or redraw):
+        stored = stored_report(report_type, player_ids, start_date, end_date, season)
+        if stored is not None:
+            return stored
+    (png, pdf), _ = _renders.do(key, _render_report, key, report, report_type, player_ids, start_date, end_date, season,
+                                refresh)
+    return png, pdf
+
+def _render_report(key, report, report_type, player_ids, start_date, end_date, season, refresh=False):
+    import matplotlib.pyplot as plt
+    if report_type == 'pitching':
+        fig = report.construct_pitching_summary(player_ids, start_date=start_date, end_date=end_date, season=season,
+                                                refresh=refresh)
+    elif report_type == 'batting':
+        fig = report.construct_batting_summary(player_ids, start_date=start_date, end_date=end_date, season=season,
+                                               refresh=refresh)
+    elif report_type == 'pitching-comparison':
+        fig = report.construct_pitching_comparison(player_ids, start_date=start_date, end_date=end_date, season=season)
+    elif report_type == 'batting-comparison':
+        fig = report.construct_batting_comparison(player_ids, start_date=start_date, end_date=end_date, season=season)
+    else:
+        # career reports cover every season from start_date's through end_date's
+        seasons = range(int(start_date[:4]), int(end_date[:4]) + 1)
+        if report_type == 'pitching-career':
+            fig = report.construct_pitching_career(player_ids, seasons)
+        else:
+            fig = report.construct_batting_career(player_ids, seasons)
+    png = report.render(fig, format='png', dpi=200)
+    pdf = report.render(fig, format='pdf')
+    plt.close(fig)
+    artifacts.put(key, {'png': png, 'pdf': pdf})
+    return png, pdf
+
+def render_job(report_type: str, player_ids, start_date: str, end_date: str, season: int = None, refresh: bool = False,
+               redraw: bool = False):
+    """render_report with this process's report objects; the entry point for worker processes"""
+    return render_report(get_report(report_type), report_type, player_ids, start_date, end_date, season, refresh, redraw)
@@ -0,0 +1,75 @@
+"""what a summary report draws, computed apart from the drawing
+
+the summary builders work in two steps: a compute step fetches and aggregates everything into a ReportData, and a
+draw step lays out the figure from it alone. the data is compact (aggregates, grids and samples instead of the pitch
+frame) and pickles small, so reports cache it and can be restyled or re-laid out without fetching anything again.
+"""
+from io import BytesIO
+import pandas as pd
+from PIL import Image
+from PitchGroups import PitchGroups
+from streaming import RollingStats
+
+
+class ReportData():
+    """the parts every summary draws: the header (bio, team, headshot and logo) and the fangraphs stat line"""
+
+    # bump when a field changes shape so data cached by older code is ignored
+    VERSION = 1
+
+    def __init__(self, report_type: str, mlbam_id: int, start_date: str, end_date: str, season: int,
+                 header: dict, stat_line: pd.DataFrame):
+        self.report_type = report_type
+        self.mlbam_id = mlbam_id
+        self.start_date = start_date
+        self.end_date = end_date
+        self.season = season
+        self.header = header
+        self.stat_line = stat_line
+
+    def __getstate__(self):
+        # images are pickled as png, a fraction of PIL's raw pixels
+        state = dict(self.__dict__)
+        state['header'] = {name: _png(value) if isinstance(value, Image.Image) else value
+                           for name, value in self.header.items()}
+        return state
+
+    def __setstate__(self, state):
+        state['header'] = {name: Image.open(BytesIO(value)) if name in ('headshot', 'logo') and value is not None
+                           else value for name, value in state['header'].items()}
+        self.__dict__.update(state)
+
+
+class PitchingData(ReportData):
+    """pitch groups (pitch table, usage, release and location stats) and the pitches for the movement plot"""
+
+    MOVEMENT_COLUMNS = ['game_date', 'pitch_type', 'pfx_x', 'pfx_z']
+
+    def __init__(self, groups: PitchGroups, movement: pd.DataFrame, **common):
+        super().__init__('pitching', **common)
+        self.groups = groups
+        self.movement = movement[self.MOVEMENT_COLUMNS].reset_index(drop=True)
+
+
+class BattingData(ReportData):
+    """pitch type totals and EV90 for the pitch table, the xwOBA heatmap grids, the hits for the spray chart and
+    the rolling stats"""
+
+    HIT_COLUMNS = ['events', 'hc_x', 'hc_y']
+
+    def __init__(self, totals: pd.DataFrame, ev90: pd.Series, heatmaps: dict, hits: pd.DataFrame,
+                 rolling: RollingStats, stadium: str, **common):
+        super().__init__('batting', **common)
+        self.totals = totals
+        self.ev90 = ev90
+        # {p_throws: (grid_x, grid_z, xwoba) or None when there are too few batted balls}
+        self.heatmaps = heatmaps
+        self.hits = hits[self.HIT_COLUMNS].reset_index(drop=True)
+        self.rolling = rolling
+        self.stadium = stadium
+
+
+def _png(img: Image.Image):
+    buf = BytesIO()
+    img.save(buf, format='PNG')
+    return buf.getvalue()
@@ -0,0 +1,273 @@
+"""http api serving rendered reports to other services
+
+    GET /report/pitching/{mlbam_id}?season=2025
+    GET /report/batting/{mlbam_id}?start=2025-04-01&end=2025-06-30&fangraphs_id=19755&format=pdf
+    GET /healthz
+    GET /metrics            (including mlb_reports_ratelimit_queue_depth, see ratelimit.py)
+
+stored reports are answered straight from the artifact store. anything else is rendered on a bounded pool of
+worker processes (matplotlib's pyplot is not thread-safe, so builds get a process each). at most
+workers + queue-size renders are admitted at a time; past that the service answers 503 with Retry-After.
+a render that outlives --timeout answers 504 but keeps running and still lands in the artifact store, so a retry
+is served from there. identical requests in flight share one render.
+
+usage: python service.py --port 8080 --workers 4 --queue-size 16 --timeout 60
+"""
+import argparse
+import json
+import multiprocessing
+import threading
+import time
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+import requests
+
+from artifacts import current_season, season_range
+from leaderboards import Leaderboards
+import rendering
+
+CONTENT_TYPES = {'png': 'image/png', 'pdf': 'application/pdf'}
+
+
+class Metrics():
+    """counters and gauges for /metrics, in the prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.cache_hits = 0
+        self.renders = 0
+        self.render_seconds = 0.0
+
+    def request(self, route: str, status: int):
+        with self._lock:
+            self.requests[(route, status)] = self.requests.get((route, status), 0) + 1
+
+    def cache_hit(self):
+        with self._lock:
+            self.cache_hits += 1
+
+    def rendered(self, seconds: float):
+        with self._lock:
+            self.renders += 1
+            self.render_seconds += seconds
+
+    def text(self, gauges: dict):
+        with self._lock:
+            lines = ['# TYPE mlb_reports_requests_total counter']
+            lines += [f'mlb_reports_requests_total{{route="{route}",status="{status}"}} {count}'
+                      for (route, status), count in sorted(self.requests.items())]
+            lines += ['# TYPE mlb_reports_cache_hits_total counter', f'mlb_reports_cache_hits_total {self.cache_hits}',
+                      '# TYPE mlb_reports_render_seconds summary',
+                      f'mlb_reports_render_seconds_count {self.renders}',
+                      f'mlb_reports_render_seconds_sum {self.render_seconds:.3f}']
+        for name, value in gauges.items():
+            lines += [f'# TYPE mlb_reports_{name} gauge']
+            # labelled gauges come as {'name="value",...': value}
+            if isinstance(value, dict):
+                lines += [f'mlb_reports_{name}{{{labels}}} {v}' for labels, v in sorted(value.items())]
+            else:
+                lines += [f'mlb_reports_{name} {value}']
+        return '\n'.join(lines) + '\n'
+
+
+class ReportService():
+    """admission control and in-flight dedup in front of the worker pool"""
+
+    def __init__(self, workers: int = 4, queue_size: int = 16, timeout: float = 60):
+        self.workers = workers
+        self.timeout = timeout
+        self.metrics = Metrics()
+        self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._inflight)
+
+    def submit(self, key: tuple, report_type: str, player_ids: dict, start_date: str, end_date: str, season: int = None):
+        """the render's future, or None when the pool and queue are full"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            if not self._slots.acquire(blocking=False):
+                return None
+            started = time.perf_counter()
+            future = self.pool.submit(rendering.render_job, report_type, player_ids, start_date, end_date, season)
+            self._inflight[key] = future
+
+        def done(f):
+            with self._lock:
+                self._inflight.pop(key, None)
+            self._slots.release()
+            if f.exception() is None:
+                self.metrics.rendered(time.perf_counter() - started)
+
+        future.add_done_callback(done)
+        return future
+
+    def gauges(self):
+        in_flight = self.in_flight()
+        return {'in_flight': in_flight, 'queue_depth': max(in_flight - self.workers, 0), 'workers': self.workers}
+
+    def metrics_gauges(self):
+        """gauges plus the fetches waiting on each rate limited host, from every process sharing the limiter"""
+        gauges = self.gauges()
+        if rendering.source.limiter is not None:
+            gauges['ratelimit_queue_depth'] = {f'host="{host}",priority="{priority}"': count for (host, priority), count
+                                               in rendering.source.limiter.depth().items()}
+        return gauges
+
+
+def fangraphs_id(report_type: str, mlbam_id: int, season: int):
+    """the player's fangraphs id from that season's leaderboard, as a string (see Leaderboards.id_key)"""
+    board = Leaderboards(rendering.source).get('pit' if report_type == 'pitching' else 'bat', season)
+    if not board.empty:
+        match = board.index[pd.to_numeric(board['xMLBAMID'], errors='coerce') == mlbam_id]
+        if len(match):
+            return match[0]
+    raise ValueError(f'no {season} {report_type} leaderboard entry for {mlbam_id}, pass fangraphs_id')
+
+
+def parse_report_request(path: str, query: dict):
+    """(report_type, player_ids, start_date, end_date, season, format) from /report/{type}/{mlbam_id}?...;
+    raises ValueError on anything malformed. fangraphs_id is None when the query leaves it out"""
+    parts = path.strip('/').split('/')
+    if len(parts) != 3 or parts[1] not in ('pitching', 'batting'):
+        raise ValueError('expected /report/{pitching|batting}/{mlbam_id}')
+    report_type, mlbam_id = parts[1], int(parts[2])
+
+    param = lambda name: query.get(name, [None])[0]
+    format = param('format') or 'png'
+    if format not in CONTENT_TYPES:
+        raise ValueError(f'format must be one of {", ".join(CONTENT_TYPES)}')
+
+    if param('start') or param('end'):
+        if not (param('start') and param('end')):
+            raise ValueError('start and end go together')
+        # checked here so a bad range answers 400 instead of failing in a worker
+        try:
+            start, end = date.fromisoformat(param('start')), date.fromisoformat(param('end'))
+        except ValueError:
+            raise ValueError('start and end must be YYYY-MM-DD dates')
+        if start > end:
+            raise ValueError('start must not be after end')
+        start_date, end_date, season = start.isoformat(), end.isoformat(), None
+    else:
+        season = int(param('season') or current_season())
+        start_date, end_date = season_range(season)
+
+    # the leaderboard lookup is left to render time, stored reports don't need it
+    # kept as given: fangraphs ids of players without an mlb id aren't numbers ('sa3012345')
+    fg_id = param('fangraphs_id') or None
+    player_ids = {'mlbam_id': mlbam_id, 'fangraphs_id': fg_id}
+    return report_type, player_ids, start_date, end_date, season, format
+
+
+def make_handler(service: ReportService):
+
+    class ReportHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/healthz':
+                self.respond('healthz', 200, json.dumps({'status': 'ok', **service.gauges()}).encode(),
+                             'application/json')
+            elif url.path == '/metrics':
+                self.respond('metrics', 200, service.metrics.text(service.metrics_gauges()).encode(),
+                             'text/plain; version=0.0.4')
+            elif url.path.startswith('/report/'):
+                self.report(url.path, parse_qs(url.query))
+            else:
+                self.fail('other', 404, 'not found')
+
+        def report(self, path: str, query: dict):
+            try:
+                report_type, player_ids, start_date, end_date, season, format = parse_report_request(path, query)
+            except ValueError as e:
+                self.fail('report', 400, str(e))
+                return
+
+            key = (report_type, player_ids['mlbam_id'], start_date, end_date, season)
+            body = rendering.artifacts.get(key, format)
+            if body is not None:
+                service.metrics.cache_hit()
+                self.respond('report', 200, body, CONTENT_TYPES[format])
+                return
+
+            try:
+                if player_ids['fangraphs_id'] is None:
+                    player_ids['fangraphs_id'] = fangraphs_id(report_type, player_ids['mlbam_id'], int(start_date[:4]))
+            except ValueError as e:
+                self.fail('report', 404, str(e))
+                return
+            except requests.RequestException as e:
+                self.fail('report', 502, f'fangraphs leaderboard lookup failed: {e}')
+                return
+
+            future = service.submit(key, report_type, player_ids, start_date, end_date, season)
+            if future is None:
+                self.fail('report', 503, 'render queue is full', {'Retry-After': str(max(int(service.timeout // 4), 1))})
+                return
+            try:
+                png, pdf = future.result(timeout=service.timeout)
+            except TimeoutError:
+                # the render carries on and is stored when it finishes
+                self.fail('report', 504, f'render took longer than {service.timeout:g}s, retry shortly')
+                return
+            except Exception as e:
+                self.fail('report', 500, f'render failed: {e}')
+                return
+            self.respond('report', 200, png if format == 'png' else pdf, CONTENT_TYPES[format])
+
+        def respond(self, route: str, status: int, body: bytes, content_type: str, headers: dict = None):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+            service.metrics.request(route, status)
+
+        def fail(self, route: str, status: int, message: str, headers: dict = None):
+            self.respond(route, status, json.dumps({'error': message}).encode(), 'application/json', headers)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ReportHandler
+
+
+def serve(service: ReportService, host: str = '127.0.0.1', port: int = 0):
+    """starts the server on a background thread and returns it; server.server_address has the bound port"""
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='serve rendered reports over http')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=4, help='render processes')
+    parser.add_argument('--queue-size', type=int, default=16, help='renders allowed to wait for a worker before 503s')
+    parser.add_argument('--timeout', type=float, default=60, help='seconds a request waits on its render before a 504')
+    args = parser.parse_args()
+
+    service = ReportService(args.workers, args.queue_size, args.timeout)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    server.daemon_threads = True
+    print(f'serving reports on http://{args.host}:{args.port}')
+    try:
+        server.serve_forever()
+    finally:
+        service.pool.shutdown(cancel_futures=True)
@@ -0,0 +1,222 @@
+"""running aggregates over a statcast range fetched in date chunks
+
+long ranges (careers) are pulled a chunk at a time, each chunk is processed and reduced into the aggregates the
+panels draw from, then dropped, so peak memory follows the chunk size instead of the length of the range.
+sums and counts are exact; anything that needs the raw points (locations, scatter plots, the xwOBA heatmap)
+is drawn from a fixed-size uniform sample.
+"""
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+from PitchGroups import PitchGroups
+
+
+def date_chunks(start_date: str, end_date: str, days: int = 31):
+    """[start_date, end_date] split into consecutive (start, end) ranges of at most `days` days,
+    skipping december and january when there are no games"""
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    while start <= end:
+        if start.month in (12, 1):
+            start = date(start.year + (start.month == 12), 2, 1)
+            continue
+        stop = min(start + timedelta(days=days - 1), end, date(start.year, 11, 30))
+        yield start.isoformat(), stop.isoformat()
+        start = stop + timedelta(days=1)
+
+
+class Reservoir():
+    """uniform sample of at most `size` rows out of every row added so far (algorithm R)"""
+
+    def __init__(self, size: int, seed: int = 0):
+        self.size = size
+        self.seen = 0
+        self._columns = None
+        self._rng = np.random.default_rng(seed)
+
+    def add(self, df: pd.DataFrame):
+        n = len(df)
+        if n == 0:
+            return
+        if self._columns is None:
+            self._columns = {c: df[c].to_numpy()[:0] for c in df.columns}
+
+        filled = min(self.seen, self.size)
+        take = min(self.size - filled, n)
+        if take:
+            for c in self._columns:
+                self._columns[c] = np.concatenate([self._columns[c], df[c].to_numpy()[:take]])
+
+        if n > take:
+            # row t (counting from the first row ever added) replaces a random slot with probability size / (t + 1);
+            # later rows overwrite earlier ones that drew the same slot
+            src = np.arange(take, n)
+            slots = (self._rng.random(n - take) * (self.seen + src + 1)).astype(np.int64)
+            keep = slots < self.size
+            for c in self._columns:
+                self._columns[c][slots[keep]] = df[c].to_numpy()[src[keep]]
+        self.seen += n
+
+    def frame(self):
+        return pd.DataFrame(self._columns if self._columns is not None else {})
+
+
+class RollingStats():
+    """trailing rates over several windows and metrics at once, appended to a batch of pitches at a time
+
+    each metric counts its own events: xwOBA averages the last `window` pitches that carry an xwOBA, hard hit %
+    the last `window` batted balls, whiff % the last `window` swings. a metric keeps a cumulative sum over its
+    events, so every window's rate is the difference of two of them and one pass over a batch serves every window.
+    only the last max(windows) sums are carried between batches, nothing already added is sorted or summed again.
+    batches have to come in game order; within a batch the pitches are put in order here"""
+
+    # metric: (value column, column flagging the metric's events, or None for the rows where the value is set)
+    METRICS = {
+        'xwoba': ('estimated_woba_using_speedangle', None),
+        'hard_hit': ('hard_hit', 'batted_ball'),
+        'whiff': ('whiff', 'swing'),
+    }
+    GAME_ORDER = ['game_date', 'at_bat_number', 'pitch_number']
+
+    def __init__(self, windows=(25, 50, 100), metrics=('xwoba', 'hard_hit', 'whiff')):
+        self.windows = tuple(windows)
+        self.metrics = tuple(metrics)
+        # the running total before any event, then after each of the latest max(windows) events
+        self._sums = {metric: np.zeros(1) for metric in self.metrics}
+        self._rates = {(metric, window): [] for metric in self.metrics for window in self.windows}
+
+    def add(self, df: pd.DataFrame):
+        """appends a batch of processed pitches played after everything added so far"""
+        if df.empty:
+            return
+        df = df.sort_values([c for c in self.GAME_ORDER if c in df.columns], kind='stable')
+        for metric in self.metrics:
+            column, flag = self.METRICS[metric]
+            values = df[column].to_numpy(dtype=np.float64)
+            events = ~np.isnan(values) if flag is None else df[flag].to_numpy(dtype=bool)
+            sums = self._sums[metric]
+            sums = np.concatenate([sums, sums[-1] + np.cumsum(values[events])])
+            # sums[i] covers the first i events counting from the oldest one kept; windows end at the new ones
+            new = len(self._sums[metric])
+            for window in self.windows:
+                first = max(new, window)
+                if first < len(sums):
+                    self._rates[metric, window].append((sums[first:] - sums[first - window:len(sums) - window]) / window)
+            self._sums[metric] = sums[-max(self.windows):]
+
+    def values(self, metric: str = 'xwoba', window: int = 50):
+        """the rate over every full window seen, oldest first"""
+        rates = self._rates[metric, window]
+        return np.concatenate(rates) if rates else np.empty(0)
+
+
+class Histogram():
+    """counts of values on a fixed grid; statcast reports exit velocity to 0.1 mph, so at that step quantiles are exact"""
+
+    def __init__(self, low: float = 0, high: float = 130, step: float = 0.1):
+        self.low = low
+        self.step = step
+        self.counts = np.zeros(int(round((high - low) / step)) + 1, dtype=np.int64)
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        bins = np.clip(np.rint((values - self.low) / self.step).astype(np.int64), 0, len(self.counts) - 1)
+        self.counts += np.bincount(bins, minlength=len(self.counts))
+
+    def merge(self, other: 'Histogram'):
+        self.counts += other.counts
+        return self
+
+    def quantile(self, q: float):
+        """linearly interpolated quantile, the same definition as pandas"""
+        n = self.counts.sum()
+        if n == 0:
+            return np.nan
+        position = (n - 1) * q
+        ends = np.cumsum(self.counts)
+        lo, hi = np.searchsorted(ends, [np.floor(position), np.ceil(position)], side='right')
+        lo_value, hi_value = self.low + lo * self.step, self.low + hi * self.step
+        return lo_value + (hi_value - lo_value) * (position - np.floor(position))
+
+
+class PitchingStream():
+    """everything the pitching panels read, reduced from PitchingReport.process_df chunks"""
+
+    MOVEMENT_COLUMNS = ['game_date', 'pitch_type', 'pfx_x', 'pfx_z']
+
+    def __init__(self, sample_size: int = 2000, seed: int = 0):
+        self.sample_size = sample_size
+        self.seed = seed
+        self.cells = None
+        self.handedness = None
+        self.movement = Reservoir(sample_size, seed)
+        # one location sample and an exact pitch count per (pitch_type, stand), in order of first appearance
+        self.locations = {}
+        self.location_counts = {}
+
+    def add(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        groups = PitchGroups.from_frame(df)
+        cells = groups.cells if self.cells is None else pd.concat([self.cells, groups.cells])
+        self.cells = cells.groupby(PitchGroups.KEYS, as_index=False).sum()
+        self.handedness = self.handedness or groups.handedness
+
+        self.movement.add(df[self.MOVEMENT_COLUMNS])
+        for key, loc in df.groupby(['pitch_type', 'stand'], sort=False)[['plate_x', 'plate_z']]:
+            reservoir = self.locations.setdefault(key, Reservoir(self.sample_size, self.seed))
+            reservoir.add(loc)
+            self.location_counts[key] = self.location_counts.get(key, 0) + len(loc)
+
+    def groups(self):
+        """the stream as PitchGroups; location centers and spreads come from the samples"""
+        rows = []
+        for (pitch_type, stand), reservoir in self.locations.items():
+            sample = reservoir.frame()
+            rows.append({
+                'pitch_type': pitch_type, 'stand': stand, 'count': self.location_counts[(pitch_type, stand)],
+                'center_x': sample['plate_x'].median(), 'center_z': sample['plate_z'].median(),
+                'std_x': sample['plate_x'].std(), 'std_z': sample['plate_z'].std(),
+            })
+        locations = pd.DataFrame(rows, columns=['pitch_type', 'stand', 'count', 'center_x', 'center_z', 'std_x', 'std_z'])
+        cells = self.cells if self.cells is not None else pd.DataFrame(columns=PitchGroups.KEYS)
+        return PitchGroups(cells, locations, self.handedness)
+
+    def sample(self):
+        """a uniform sample of the pitches for the movement plot"""
+        return self.movement.frame()
+
+
+class BattingStream():
+    """everything the batting panels read, reduced from BattingReport.process_df chunks"""
+
+    # the heatmap and spray chart only look at batted balls
+    BATTED_COLUMNS = ['game_date', 'p_throws', 'pitch_type', 'events', 'plate_x', 'plate_z',
+                      'hc_x', 'hc_y', 'launch_speed', 'estimated_woba_using_speedangle']
+
+    def __init__(self, report, sample_size: int = 2000, seed: int = 0):
+        self.report = report
+        self.totals = None
+        self.exit_velo = {}
+        self.batted = Reservoir(sample_size, seed)
+        self.rolling = RollingStats()
+
+    def add(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        aggregate = self.report.get_season_totals(df)
+        totals = aggregate['totals']
+        self.totals = totals if self.totals is None else pd.concat([self.totals, totals]).groupby(level=0).sum()
+        for pitch_type, hist in aggregate['exit_velo'].items():
+            self.exit_velo.setdefault(pitch_type, Histogram()).merge(hist)
+
+        batted = df['estimated_woba_using_speedangle'].notna() | df['hc_x'].notna()
+        self.batted.add(df.loc[batted, self.BATTED_COLUMNS])
+        self.rolling.add(df)
+
+    def ev90(self):
+        return pd.Series({pitch_type: hist.quantile(0.9) for pitch_type, hist in self.exit_velo.items()}, dtype=float)
+
+    def sample(self):
+        """a uniform sample of the batted balls for the heatmaps and spray chart"""
+        return self.batted.frame()
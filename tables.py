@@ -0,0 +1,214 @@
+"""a lighter stand-in for ax.table
+
+matplotlib's Table is one Rectangle patch plus one Text artist per cell. With auto font sizing on, it measures
+every cell's text again at every font size it tries. CellTable keeps the cells as plain values. All the
+fills are drawn as one PolyCollection and all the borders as another. The labels go through a single reused
+Text, whose layout matplotlib caches per string and font. Auto font sizing measures each distinct label once. Text width scales
+with font size, so the size that fits every cell is worked out from those widths instead of by trial.
+
+cells are indexed and colored like matplotlib's: table[row, col].set_facecolor(...),
+table[0, col].get_text().set_weight('bold'), with row 0 holding the column labels.
+"""
+import numpy as np
+from matplotlib import rcParams
+from matplotlib.artist import Artist, allow_rasterization
+from matplotlib.axes import Axes
+from matplotlib.collections import PolyCollection
+from matplotlib.font_manager import FontProperties
+from matplotlib.text import Text
+from matplotlib.transforms import Bbox
+
+
+class CellText():
+    """the label of one cell; the subset of matplotlib's Text the report panels use"""
+
+    def __init__(self, text):
+        self._text = '' if text is None else str(text)
+        self.color = rcParams['text.color']
+        self.weight = 'normal'
+
+    def get_text(self):
+        return self._text
+
+    def set_text(self, text):
+        self._text = '' if text is None else str(text)
+
+    def set_color(self, color):
+        self.color = color
+
+    def set_weight(self, weight):
+        self.weight = weight
+
+    set_fontweight = set_weight
+
+
+class Cell():
+
+    def __init__(self, text, width: float, height: float, facecolor='w', edgecolor='k'):
+        self._text = CellText(text)
+        self.width = width
+        self.height = height
+        self.facecolor = facecolor
+        self.edgecolor = edgecolor
+
+    def get_text(self):
+        return self._text
+
+    def set_facecolor(self, color):
+        self.facecolor = color
+
+    def set_edgecolor(self, color):
+        self.edgecolor = color
+
+    def get_width(self):
+        return self.width
+
+    def set_width(self, width):
+        self.width = width
+
+    def get_height(self):
+        return self.height
+
+    def set_height(self, height):
+        self.height = height
+
+
+class CellTable(Artist):
+    """a grid of cells filling bbox (in axes coordinates): column widths and row heights are relative,
+    taken from the first cell of each column and row"""
+
+    FONTSIZE = 10
+    PAD = 0.1
+
+    def __init__(self, ax: Axes, cells: list, bbox=(0, 0, 1, 1), loc: str = 'center'):
+        super().__init__()
+        self.axes = ax
+        self._cells = cells
+        self._bbox = bbox
+        self._loc = loc
+        self._fontsize = self.FONTSIZE
+        self._auto_fontsize = True
+        # label widths in points at FONTSIZE, measured once per (label, weight)
+        self._widths = {}
+        self._label = Text(clip_on=False, horizontalalignment=loc, verticalalignment='center')
+        self.set_clip_on(False)
+
+    def __getitem__(self, position):
+        row, col = position
+        return self._cells[row][col]
+
+    def set_figure(self, fig):
+        super().set_figure(fig)
+        self._label.set_figure(fig)
+
+    def auto_set_font_size(self, value: bool = True):
+        self._auto_fontsize = value
+        self.stale = True
+
+    def set_fontsize(self, size: float):
+        self._fontsize = size
+        self.stale = True
+
+    def get_fontsize(self):
+        return self._fontsize
+
+    def scale(self, xscale: float, yscale: float):
+        for row in self._cells:
+            for cell in row:
+                cell.width *= xscale
+                cell.height *= yscale
+
+    def _edges(self):
+        """column x and row y edges in axes coordinates, rows running top down"""
+        left, bottom, width, height = self._bbox
+        widths = np.array([cell.width for cell in self._cells[0]], dtype=float)
+        heights = np.array([row[0].height for row in self._cells], dtype=float)
+        x = left + width * np.concatenate([[0], np.cumsum(widths)]) / widths.sum()
+        y = bottom + height - height * np.concatenate([[0], np.cumsum(heights)]) / heights.sum()
+        return x, y
+
+    def _fit_fontsize(self, renderer):
+        """shrinks the font to the largest size, up to the current one, at which every label padded on both sides
+        fits its cell. like ax.table, labels are fitted against the column widths as given, before the table is
+        stretched to its bbox, and the size only ever shrinks, so a layout pass at a narrower width sticks"""
+        ax_width = self.axes.bbox.width
+        fontsize = self._fontsize
+        for row in self._cells:
+            for cell in row:
+                text = cell.get_text()
+                if not text.get_text():
+                    continue
+                key = (text.get_text(), text.weight)
+                if key not in self._widths:
+                    prop = FontProperties(size=self.FONTSIZE, weight=text.weight)
+                    width = renderer.get_text_width_height_descent(key[0], prop, ismath=False)[0]
+                    self._widths[key] = width / renderer.points_to_pixels(1.0)
+                required = self._widths[key] * renderer.points_to_pixels(1.0) * (1 + 2 * self.PAD) / self.FONTSIZE
+                if required > 0:
+                    fontsize = min(fontsize, max(np.floor(cell.width * ax_width / required), 1))
+        self._fontsize = fontsize
+
+    def get_window_extent(self, renderer=None):
+        # layout passes (tight_layout, bbox_inches='tight') fit the font here, as ax.table does
+        if renderer is not None and self._auto_fontsize:
+            self._fit_fontsize(renderer)
+        return Bbox.from_bounds(*self._bbox).transformed(self.axes.transAxes)
+
+    @allow_rasterization
+    def draw(self, renderer):
+        if not self.get_visible() or not self._cells:
+            return
+        renderer.open_group('table', gid=self.get_gid())
+        x, y = self._edges()
+        n_rows, n_cols = len(self._cells), len(self._cells[0])
+
+        # every background in one collection, drawn row by row like ax.table draws its cells. fills are not
+        # antialiased so neighbouring cells meet without a seam; the borders go on top, antialiased
+        x0, x1 = np.tile(x[:-1], n_rows), np.tile(x[1:], n_rows)
+        y0, y1 = np.repeat(y[1:], n_cols), np.repeat(y[:-1], n_cols)
+        verts = np.stack([np.column_stack([x0, y0]), np.column_stack([x1, y0]),
+                          np.column_stack([x1, y1]), np.column_stack([x0, y1])], axis=1)
+        cells = [cell for row in self._cells for cell in row]
+        fills = PolyCollection(verts, facecolors=[cell.facecolor for cell in cells], edgecolors='none',
+                               antialiaseds=False)
+        borders = PolyCollection(verts, facecolors='none', edgecolors=[cell.edgecolor for cell in cells],
+                                 linewidths=rcParams['patch.linewidth'])
+        for collection in (fills, borders):
+            collection.set(transform=self.axes.transAxes, clip_on=False, snap=True)
+            collection.set_figure(self.get_figure(root=True))
+            collection.draw(renderer)
+
+        if self._auto_fontsize:
+            self._fit_fontsize(renderer)
+        self._label.set_fontsize(self._fontsize)
+        pad = {'center': 0.5, 'left': self.PAD, 'right': 1 - self.PAD}[self._loc]
+        label_x = self.axes.transAxes.transform(np.column_stack([x[:-1] + (x[1:] - x[:-1]) * pad,
+                                                                 np.zeros(n_cols)]))[:, 0]
+        label_y = self.axes.transAxes.transform(np.column_stack([np.zeros(n_rows), (y[:-1] + y[1:]) / 2]))[:, 1]
+        for i, row in enumerate(self._cells):
+            for j, cell in enumerate(row):
+                text = cell.get_text()
+                if not text.get_text():
+                    continue
+                self._label.set_text(text.get_text())
+                self._label.set_color(text.color)
+                self._label.set_fontweight(text.weight)
+                self._label.set_position((label_x[j], label_y[i]))
+                self._label.draw(renderer)
+
+        renderer.close_group('table')
+        self.stale = False
+
+
+def cell_table(ax: Axes, cellText, colLabels=None, colWidths=None, cellLoc: str = 'center', bbox=(0, 0, 1, 1)):
+    """ax.table's signature for the arguments the reports use; returns the CellTable added to ax"""
+    rows = [list(row) for row in cellText]
+    if colLabels is not None:
+        rows = [list(colLabels)] + rows
+    n_cols = len(rows[0]) if rows else 0
+    if colWidths is None:
+        colWidths = [1 / n_cols] * n_cols
+    cells = [[Cell(text, colWidths[j], 1) for j, text in enumerate(row)] for row in rows]
+    table = CellTable(ax, cells, bbox, cellLoc)
+    ax.add_artist(table)
+    return table